@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""How big a bankroll has to be for a betting system.
+
+Thousands of bankrolls are played at once as numpy arrays, one per
+trajectory, a round at a time. Every round the betting system says how
+many units each one bets and the source says what every unit bet won:
+
+ - OutcomeDistribution: outcomes drawn from a distribution, like the
+   payouts of a Results store or the rounds of a VectorizedEngine.
+ - EngineStream: rounds played by a VectorizedEngine, a lane per
+   trajectory, with the true count of every shoe before the round.
+
+A bankroll is ruined when it can't bet the table minimum any more, and
+it stops playing then. At the end there are the risk of ruin, the median
+round of ruin and the quantiles of the worst drawdown:
+
+    simulator = BankrollSimulator(OutcomeDistribution.from_results(results),
+                                  FlatSpread(1), bankroll=100)
+    print simulator.run(10000)
+
+Usage:
+    python bankroll.py [bankroll] [rounds] [trajectories]
+"""
+import sys
+import numpy
+from cards import RANKS, HARD_VALUES, VALUE_RANKS, encode
+from counting import HI_LO
+from simulation import DEFAULT_BET
+
+DRAWDOWN_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+class OutcomeDistribution(object):
+    """What a unit bet wins in a round, drawn independently every round"""
+
+    def __init__(self, values, probabilities=None):
+        """:param values: every outcome, in units bet.
+           :param probabilities (optional): of every outcome, by default
+                they're all as likely."""
+        self.values = numpy.asarray(values, float)
+        if probabilities is None:
+            probabilities = numpy.ones(len(self.values))
+        probabilities = numpy.asarray(probabilities, float)
+        self.cumulative = numpy.cumsum(probabilities / probabilities.sum())
+
+    @classmethod
+    def from_nets(cls, nets, bet=DEFAULT_BET):
+        """The distribution of the net results of hands that bet bet"""
+        values, counts = numpy.unique(numpy.asarray(nets, float) / bet, return_counts=True)
+        return cls(values, counts)
+
+    @classmethod
+    def from_results(cls, results, bet=DEFAULT_BET):
+        """The distribution of the payouts of a results.Results store"""
+        return cls.from_nets(results["payout"], bet)
+
+    def mean(self):
+        probabilities = numpy.diff(numpy.concatenate(([0], self.cumulative)))
+        return float((self.values * probabilities).sum())
+
+    def draw(self, rng, trajectories):
+        """The outcome of every trajectory and no counts"""
+        index = numpy.searchsorted(self.cumulative, rng.random_sample(trajectories),
+                                   side="right")
+        return self.values[numpy.minimum(index, len(self.values) - 1)], None
+
+def value_tags(system):
+    """The tags of a counting.TagSystem by hard value, an ace is 1. The
+       ten valued ranks must have the same tag."""
+    tags = numpy.zeros(VALUE_RANKS, numpy.int32)
+    for rank in RANKS:
+        tags[HARD_VALUES[encode(rank)] - 1] = system.tags[encode(rank)]
+    return tags
+
+class EngineStream(object):
+    """Rounds of a vectorized.VectorizedEngine, one lane per trajectory"""
+
+    def __init__(self, engine, system=HI_LO):
+        """:param system: the tag system of the true counts."""
+        self.engine = engine
+        self.tags = value_tags(system)
+
+    def true_counts(self):
+        """The count of the cards dealt from every shoe per deck left"""
+        shoes = self.engine.shoes
+        running = (shoes.full - shoes.counts).dot(self.tags)
+        decks_left = numpy.maximum(shoes.left, 1) / 52.0
+        return running / decks_left
+
+    def draw(self, rng, trajectories):
+        if trajectories != self.engine.lanes:
+            raise ValueError("The engine must have a lane per trajectory")
+        #the shoes due to be shuffled are counted from scratch
+        engine = self.engine
+        true_counts = numpy.where(engine.shoes.penetration() >= engine.penetration,
+                                  0.0, self.true_counts())
+        return engine.play_round() / engine.bet, true_counts
+
+class BettingSystem(object):
+    """Base class for the betting systems of many bankrolls at once"""
+
+    def reset(self, trajectories):
+        """Every trajectory starts over"""
+        pass
+
+    def bet(self, bankroll, true_counts):
+        """ It must return the units every trajectory bets.
+            :param true_counts: None if the source doesn't count."""
+        raise NotImplementedError
+
+    def settle(self, outcomes, playing):
+        """The outcomes of the round, what the trajectories playing won
+           per unit bet"""
+        pass
+
+class FlatSpread(BettingSystem):
+    """It always bets the same"""
+
+    def __init__(self, units=1):
+        self.units = units
+
+    def bet(self, bankroll, true_counts):
+        return numpy.full(len(bankroll), float(self.units))
+
+class CountSpread(BettingSystem):
+    """It bets more the higher the true count, by a ramp"""
+
+    def __init__(self, ramp, low=1):
+        """:param ramp: (true count, units) pairs, from that true count on
+                the units are bet.
+           :param low: the units bet under the first true count."""
+        self.ramp = sorted(ramp)
+        self.low = low
+
+    def bet(self, bankroll, true_counts):
+        units = numpy.full(len(bankroll), float(self.low))
+        if true_counts is None:
+            return units
+        for true_count, bet in self.ramp:
+            units[true_counts >= true_count] = bet
+        return units
+
+class Progression(BettingSystem):
+    """It goes one step further after every loss, or every win, and back
+       to the first step otherwise, like a Martingale"""
+
+    def __init__(self, steps, on_win=False):
+        """:param steps: the units of every step, the last one is kept.
+           :param on_win: it goes further after a win instead."""
+        self.steps = numpy.asarray(steps, float)
+        self.on_win = on_win
+        self.step = numpy.zeros(0, int)
+
+    @classmethod
+    def martingale(cls, doubles=6):
+        return cls([2 ** step for step in range(doubles + 1)])
+
+    def reset(self, trajectories):
+        self.step = numpy.zeros(trajectories, int)
+
+    def bet(self, bankroll, true_counts):
+        return self.steps[self.step]
+
+    def settle(self, outcomes, playing):
+        further = (outcomes > 0) if self.on_win else (outcomes < 0)
+        step = numpy.where(further, numpy.minimum(self.step + 1, len(self.steps) - 1), 0)
+        self.step = numpy.where(playing & (outcomes != 0), step, self.step)
+
+class BankrollReport(object):
+    """What happened to the bankrolls"""
+
+    def __init__(self, bankrolls, ruined_at, drawdowns, rounds):
+        self.bankrolls = bankrolls
+        self.ruined_at = ruined_at
+        self.drawdowns = drawdowns
+        self.rounds = rounds
+
+    def risk_of_ruin(self):
+        return float((self.ruined_at >= 0).mean())
+
+    def median_time_to_ruin(self):
+        """The median round of ruin of the ruined ones, None if none was"""
+        ruined = self.ruined_at[self.ruined_at >= 0]
+        if not len(ruined):
+            return None
+        return float(numpy.median(ruined))
+
+    def drawdown_quantiles(self, quantiles=DRAWDOWN_QUANTILES):
+        return dict(zip(quantiles, numpy.percentile(self.drawdowns,
+                                                    [100 * q for q in quantiles])))
+
+    def __repr__(self):
+        median = self.median_time_to_ruin()
+        quantiles = self.drawdown_quantiles()
+        return ("BankrollReport(%d trajectories of %d rounds, risk of ruin %.4f, "
+                "median ruin %s, drawdown %s, median bankroll %.1f)" % (
+                    len(self.bankrolls), self.rounds, self.risk_of_ruin(),
+                    "never" if median is None else "%.0f" % median,
+                    ", ".join("%d%% %.1f" % (100 * q, quantiles[q]) for q in sorted(quantiles)),
+                    numpy.median(self.bankrolls)))
+
+class BankrollSimulator(object):
+    """ It plays many bankrolls with a betting system at once."""
+
+    def __init__(self, source, betting, bankroll=100, trajectories=10000, min_bet=1,
+                 seed=None):
+        """:param source: an OutcomeDistribution, an EngineStream or
+                anything with their draw.
+           :param betting: the BettingSystem.
+           :param bankroll: the units every trajectory starts with.
+           :param min_bet: the table minimum, a bankroll under it is ruined.
+                Bets are never over the bankroll left."""
+        self.source = source
+        self.betting = betting
+        self.bankroll = bankroll
+        self.trajectories = trajectories
+        self.min_bet = min_bet
+        self.rng = numpy.random.RandomState(seed)
+
+    def run(self, rounds):
+        """It returns a BankrollReport of the rounds"""
+        bankrolls = numpy.full(self.trajectories, float(self.bankroll))
+        peaks = bankrolls.copy()
+        drawdowns = numpy.zeros(self.trajectories)
+        ruined_at = numpy.full(self.trajectories, -1, int)
+        self.betting.reset(self.trajectories)
+        for played in xrange(rounds):
+            playing = ruined_at < 0
+            if not playing.any():
+                break
+            outcomes, true_counts = self.source.draw(self.rng, self.trajectories)
+            bets = numpy.minimum(self.betting.bet(bankrolls, true_counts), bankrolls)
+            bankrolls += numpy.where(playing, bets * outcomes, 0)
+            self.betting.settle(outcomes, playing)
+            numpy.maximum(peaks, bankrolls, out=peaks)
+            numpy.maximum(drawdowns, peaks - bankrolls, out=drawdowns)
+            ruined_at[playing & (bankrolls < self.min_bet)] = played
+        return BankrollReport(bankrolls, ruined_at, drawdowns, rounds)
+
+if __name__ == '__main__':
+    from vectorized import VectorizedEngine
+    bankroll = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    trajectories = int(sys.argv[3]) if len(sys.argv) > 3 else 10000
+    engine = VectorizedEngine(lanes=100000, seed=0)
+    distribution = OutcomeDistribution.from_nets(engine.play_round(), engine.bet)
+    for name, betting in (("Flat", FlatSpread(1)),
+                          ("Martingale", Progression.martingale()),
+                          ("Paroli", Progression([1, 2, 4], on_win=True))):
+        simulator = BankrollSimulator(distribution, betting, bankroll, trajectories)
+        print name, simulator.run(rounds)
+    engine = VectorizedEngine(lanes=trajectories, seed=1)
+    simulator = BankrollSimulator(EngineStream(engine), CountSpread([(2, 2), (3, 4), (4, 8)]),
+                                  bankroll, trajectories)
+    print "Hi-Lo spread", simulator.run(rounds)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Decisions of many tables taken together, in batches.
+
+A policy that works on whole arrays, like a numpy model, costs about the
+same for one hand as for a thousand, so asking it hand by hand wastes
+nearly all the time. Here every table plays in its own thread and its
+bots ask a DecisionScheduler instead: the table waits until every table
+still playing is waiting too, then the policy is called once with all
+of their hands and each one gets its answer back.
+
+A policy is called with two arrays, one row per decision:
+
+ - features: the columns in FEATURES, see features.
+ - allowed: how many of the options, settings.OPTION_*, can be played.
+
+and it must return the option of every row. An option that can't be
+played stands, as a remote player that answers nonsense does.
+
+Usage:
+    python batching.py [rounds] [tables] [players]
+"""
+import sys
+import time
+import random
+import threading
+import numpy
+import settings
+from cards import HARD_VALUES
+from simulation import Simulation, Statistics
+from strategies import Strategy, StrategyTable
+
+#score is the best one and pair the value of the cards if it can be
+#split, 0 otherwise. The upcard goes by its hard value.
+FEATURES = ("score", "hard", "soft", "pair", "cards", "upcard")
+
+def features(player, game):
+    """The row of the active hand of the player"""
+    hand = player.get_active_hand()
+    pair = HARD_VALUES[hand.cards[0]] if hand.can_do_split() else 0
+    return (hand.get_score(), hand.hard, int(hand.is_soft()), pair, len(hand.cards),
+            HARD_VALUES[game.dealer.upcard()])
+
+class TablePolicy(object):
+    """What a StrategyTable says, looked up for the whole batch at once"""
+
+    def __init__(self, table):
+        self.options = numpy.frombuffer(table.options, numpy.uint8)
+
+    def __call__(self, features, allowed):
+        score, soft, pair, upcard = (features[:, FEATURES.index(name)]
+                                     for name in ("score", "soft", "pair", "upcard"))
+        section = numpy.where(pair > 0, StrategyTable.PAIR, soft)
+        score = numpy.where(pair > 0, pair, score)
+        return self.options[(section * StrategyTable.SCORES + score) *
+                            StrategyTable.UPCARDS + upcard]
+
+class Decision(object):
+    """A hand waiting for its option"""
+
+    def __init__(self, features, allowed):
+        self.features = features
+        self.allowed = allowed
+        self.option = None
+        self.error = None
+
+class DecisionScheduler(object):
+    """It gathers the decisions of the tables playing and calls the
+       policy once for all of them."""
+
+    def __init__(self, policy, max_batch=None):
+        """:param policy: it chooses the options of a batch, see above.
+           :param max_batch (optional): the most decisions of a batch, by
+                default all the tables waiting."""
+        self.policy = policy
+        self.max_batch = max_batch
+        self.condition = threading.Condition()
+        self.pending = []
+        self.playing = 0
+        self.batches = 0
+        self.decisions = 0
+
+    def join(self):
+        """A table starts playing, its decisions are waited for"""
+        with self.condition:
+            self.playing += 1
+
+    def leave(self):
+        """A table is done, the rest don't wait for it anymore"""
+        with self.condition:
+            self.playing -= 1
+            self._dispatch()
+
+    def decide(self, features, allowed):
+        """It blocks until the option of the hand is known
+            :param features: the row of the hand, see features.
+            :param allowed: how many options can be played."""
+        decision = Decision(features, allowed)
+        with self.condition:
+            self.pending.append(decision)
+            self._dispatch()
+            while decision.option is None and decision.error is None:
+                self.condition.wait()
+        if decision.error is not None:
+            raise decision.error
+        return decision.option
+
+    def _dispatch(self):
+        """The policy is called while every table is waiting, or when a
+           batch is full. The condition must be held."""
+        full = self.max_batch and len(self.pending) >= self.max_batch
+        if not self.pending or not (full or len(self.pending) >= self.playing):
+            return
+        batch = self.pending[:self.max_batch or len(self.pending)]
+        del self.pending[:len(batch)]
+        try:
+            options = self.policy(numpy.array([d.features for d in batch], numpy.intp),
+                                  numpy.array([d.allowed for d in batch], numpy.intp))
+            for decision, option in zip(batch, options):
+                option = int(option)
+                if not 0 <= option < decision.allowed:
+                    option = settings.OPTION_STAND
+                decision.option = option
+        except Exception as error:
+            for decision in batch:
+                decision.error = error
+        self.batches += 1
+        self.decisions += len(batch)
+        self.condition.notify_all()
+
+    def batch_size(self):
+        if not self.batches:
+            return 0.0
+        return float(self.decisions) / self.batches
+
+class BatchedStrategy(Strategy):
+    """It leaves the decision to the scheduler"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def choose(self, player, game):
+        return self.scheduler.decide(features(player, game),
+                                     len(player.allowed_actions()))
+
+class BatchedTables(object):
+    """Simulations playing at the same time, each one in its thread, with
+       their bots deciding through the same scheduler."""
+
+    def __init__(self, scheduler, simulations):
+        """:param simulations: their players should play a BatchedStrategy
+                of the scheduler."""
+        self.scheduler = scheduler
+        self.simulations = simulations
+        self.elapsed = 0.0
+
+    @classmethod
+    def create(cls, policy, tables, players=1, decks=None, seed=0, max_batch=None):
+        """Tables of bots betting the same, each one shuffling with its
+           own seed, drawn from the seed"""
+        scheduler = DecisionScheduler(policy, max_batch)
+        rng = random.Random(seed)
+        simulations = [Simulation.create(players, strategy=BatchedStrategy(scheduler),
+                                         decks=decks,
+                                         rng=random.Random(rng.getrandbits(64)))
+                       for _ in range(tables)]
+        return cls(scheduler, simulations)
+
+    def _play(self, simulation, rounds, errors):
+        try:
+            simulation.run(rounds)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            self.scheduler.leave()
+
+    def run(self, rounds):
+        """Every table plays the rounds, it returns the statistics of all"""
+        start = time.time()
+        errors = []
+        threads = [threading.Thread(target=self._play, args=(simulation, rounds, errors))
+                   for simulation in self.simulations]
+        #all of them join before anyone can ask, so nobody goes alone
+        for thread in threads:
+            self.scheduler.join()
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed += time.time() - start
+        if errors:
+            raise errors[0]
+        return self.stats()
+
+    def stats(self):
+        return reduce(Statistics.merge, [simulation.stats for simulation in self.simulations],
+                      Statistics())
+
+    def hands_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.stats().hands / self.elapsed
+
+if __name__ == '__main__':
+    from solver import Solver
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    tables = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    players = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    batched = BatchedTables.create(TablePolicy(Solver().solve()), tables, players, decks=6)
+    print batched.run(rounds)
+    print "%d tables: %.0f hands/sec, %.1f decisions per policy call" % (
+        tables, batched.hands_per_second(), batched.scheduler.batch_size())
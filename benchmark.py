@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Timings of the hot paths of the game, to catch them getting slower.
+
+Every benchmark is the median of several runs, in seconds per call. Every
+run starts from a fresh setup, so they all time the same work, and it's
+measured against a calibration of plain Python, so a machine going
+faster or slower than when the baseline was taken doesn't count. The
+results are printed as JSON and compared with a baseline written by an
+earlier run: anything slower than the baseline by more than the
+tolerance is a regression, and the exit status is 1.
+
+Usage:
+    python benchmark.py [baseline] [tolerance]
+
+If the baseline doesn't exist the results are saved to it. It only makes
+sense to compare timings taken on the same machine, so it isn't kept in
+the repository: the first run on a machine takes it, delete it to take a
+new one.
+"""
+import os
+import sys
+import json
+import random
+import timeit
+from cards import encode
+from game import Deck, Game, ContinuousDeck
+from participants import Hand, Player
+from renderers import NullBackend
+from simulation import Simulation
+
+BASELINE = "benchmark_baseline.json"
+CALIBRATION = "calibration"
+CALIBRATION_CALLS = 2000
+TOLERANCE = 0.25
+REPEAT = 9
+
+def bench_calibration():
+    """Plain Python that nothing in the game changes, it tells how fast
+       the machine is going"""
+    values = range(200)
+    return lambda: sum(value * value for value in values if value & 1)
+
+def bench_create(decks):
+    return lambda: Deck.create(decks, backend=NullBackend())
+
+def bench_shuffle():
+    deck = Deck.create(6, random.Random(0), NullBackend())
+    return deck.shuffle
+
+def bench_get_card():
+    deck = Deck.create(8, random.Random(0), NullBackend())
+    deck.shuffle()
+    def get_card():
+        if deck.is_empty():
+            deck.position = 0
+        deck.get_card()
+    return get_card
+
+def bench_continuous_get_card(decks):
+    deck = ContinuousDeck(decks, rng=random.Random(0), backend=NullBackend())
+    def get_card():
+        if deck.penetration() > 0.5:
+            deck.discard()
+        deck.get_card()
+    return get_card
+
+def hand_of(*representations):
+    hand = Hand(backend=NullBackend())
+    for representation in representations:
+        hand.add_card(encode(representation))
+    return hand
+
+def bench_get_score():
+    return hand_of("A", "5", "9").get_score
+
+def bench_can_do_split():
+    return hand_of("8", "8").can_do_split
+
+def bench_blackjack_or_busted():
+    player = Player("Player", 100, backend=NullBackend())
+    game = Game([player], backend=NullBackend())
+    player.hands = [hand_of("10", "7")]
+    player.set_active_hand(player.hands[0])
+    return lambda: game.blackjack_or_busted(player, game.dealer)
+
+def bench_rounds(players):
+    simulation = Simulation.create(players, decks=6, rng=random.Random(0))
+    return simulation.play_round
+
+#name, function that returns what is timed, calls per run
+BENCHMARKS = [("deck_create_1", lambda: bench_create(1), 2000),
+              ("deck_create_6", lambda: bench_create(6), 1000),
+              ("deck_create_8", lambda: bench_create(8), 1000),
+              ("deck_shuffle", bench_shuffle, 200),
+              ("deck_get_card", bench_get_card, 100000),
+              ("continuous_get_card_1", lambda: bench_continuous_get_card(1), 100000),
+              ("continuous_get_card_8", lambda: bench_continuous_get_card(8), 100000),
+              ("hand_get_score", bench_get_score, 100000),
+              ("hand_can_do_split", bench_can_do_split, 100000),
+              ("game_blackjack_or_busted", bench_blackjack_or_busted, 100000)]
+BENCHMARKS += [("round_%d_players" % players, lambda players=players: bench_rounds(players),
+                2000 // players)
+               for players in range(1, 8)]
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+def run(benchmarks=BENCHMARKS, repeat=REPEAT, scale=1.0):
+    """It returns the seconds per call of every benchmark, by name, and
+       of the calibration.
+        :param scale: it multiplies the calls per run, to take quick
+            but rough timings."""
+    calibrate = timeit.Timer(bench_calibration())
+    calibrations = []
+    timings = dict((name, []) for name, _, _ in benchmarks)
+    #the runs of a benchmark are spread over the whole session, one round
+    #of all of them at a time, and every run is taken relative to the
+    #calibration right before it, so the machine going slower for a while
+    #slows down both. The median leaves out the runs it got in the way
+    #of anyway, and the few lucky ones.
+    for _ in range(repeat):
+        for name, setup, number in benchmarks:
+            number = max(1, int(number * scale))
+            calls = max(1, int(CALIBRATION_CALLS * scale))
+            reference = calibrate.timeit(calls) / calls
+            calibrations.append(reference)
+            timings[name].append(timeit.Timer(setup()).timeit(number) / number / reference)
+    speed = median(calibrations)
+    results = dict((name, median(runs) * speed) for name, runs in timings.items())
+    results[CALIBRATION] = speed
+    return results
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """The benchmarks slower than in the baseline, as a list of
+       (name, baseline, result) sorted by name. The ones missing from
+       either of them are left out. If both have the calibration, the
+       baseline is scaled by how much slower or faster the machine is
+       going now, and that's the one returned."""
+    speed = 1.0
+    if CALIBRATION in results and CALIBRATION in baseline:
+        speed = results[CALIBRATION] / baseline[CALIBRATION]
+    regressions = []
+    for name in sorted(results):
+        if name == CALIBRATION or name not in baseline:
+            continue
+        expected = baseline[name] * speed
+        if results[name] > expected * (1 + tolerance):
+            regressions.append((name, expected, results[name]))
+    return regressions
+
+def load(path):
+    with open(path) as baseline:
+        return json.load(baseline)
+
+def save(results, path):
+    with open(path, "w") as baseline:
+        json.dump(results, baseline, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else BASELINE
+    tolerance = float(sys.argv[2]) if len(sys.argv) > 2 else TOLERANCE
+    results = run()
+    print json.dumps(results, indent=2, sort_keys=True)
+    if not os.path.exists(path):
+        save(results, path)
+        print "Baseline saved to %s" % path
+        sys.exit(0)
+    regressions = compare(results, load(path), tolerance)
+    for name, before, after in regressions:
+        print "%s: %.3g s -> %.3g s (%+.0f%%)" % (name, before, after,
+                                                  100 * (after / before - 1))
+    sys.exit(1 if regressions else 0)
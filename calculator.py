@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Exact expected values of a hand, for the cards actually left.
+
+Unlike the solver, every card drawn is taken out of the composition, so
+the values change as the shoe goes down. The rules are the solver's, see
+solver.py, and expected values are in units of the initial bet.
+
+Every subproblem, (composition, hard total, soft, upcard), is kept in an
+LRU cache, and so are the dealer's. Cards only go out of a shoe, so the
+next query in the middle of it finds most of its subproblems already
+solved by the previous ones:
+
+    calculator = EVCalculator()
+    calculator.options(hand, game.dealer.upcard(), unseen(game))
+"""
+from collections import OrderedDict
+import settings
+from cards import SOFT_BONUS, HARD_VALUES, is_hidden, reveal
+from probabilities import DealerTable, BUST
+from rules import DEFAULT_RULES
+
+CACHE_SIZE = 200000
+
+class LRUCache(object):
+    """A dict that forgets the least recently used keys once it holds
+       more than size of them."""
+
+    def __init__(self, size=CACHE_SIZE):
+        """:param size: how many keys it holds, None for no limit."""
+        self.size = size
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.items.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        self.items[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.items.pop(key, None)
+        self.items[key] = value
+        if self.size is not None and len(self.items) > self.size:
+            self.items.popitem(last=False)
+            self.evictions += 1
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(list(self.items))
+
+    def __delitem__(self, key):
+        del self.items[key]
+
+    def clear(self):
+        self.items.clear()
+
+def unseen(game):
+    """The composition of the cards a player hasn't seen: the ones left in
+       the deck and the hidden ones."""
+    counts = list(game.deck.composition())
+    for participant in game.players + [game.dealer]:
+        for hand in participant.hands:
+            for card in hand.cards:
+                if is_hidden(card):
+                    counts[HARD_VALUES[reveal(card)] - 1] += 1
+    return tuple(counts)
+
+class EVCalculator(object):
+    """ It works out the expected value of hitting, standing and
+        splitting a hand against an upcard for a composition."""
+
+    def __init__(self, size=CACHE_SIZE, dealer=None, rules=None):
+        """:param size: the subproblems kept, for the player and for the
+                dealer each, None to keep them all.
+           :param dealer (optional): the DealerTable with the dealer's
+                rules, it should have a cache of its own.
+           :param rules (optional): the Ruleset of the game, see rules.py,
+                its payouts are the ones of the values."""
+        self.rules = rules or DEFAULT_RULES
+        self.cache = LRUCache(size)
+        self.dealer = dealer or DealerTable(cache=LRUCache(size), rules=self.rules)
+        self.blackjack = self.dealer.blackjack
+        #what a win and a blackjack add to the bet, a loss takes it all
+        self.win = self.rules.payout - 1
+        self.blackjack_win = self.rules.blackjack_payout - 1
+
+    def score(self, hard, soft):
+        if soft and hard + SOFT_BONUS <= self.blackjack:
+            return hard + SOFT_BONUS
+        return hard
+
+    def is_blackjack(self, hard, soft):
+        """Whether a hand of two cards scoring that is a blackjack"""
+        return self.rules.cards_for_blackjack == 2 and self.score(hard, soft) == self.blackjack
+
+    def stand(self, hard, soft, upcard, composition):
+        score = self.score(hard, soft)
+        value = 0.0
+        for total, probability in self.dealer.final_totals(upcard, composition).iteritems():
+            if total == BUST or total <= score:
+                value += probability * self.win
+            else:
+                value -= probability
+        return value
+
+    def hit(self, hard, soft, upcard, composition, single=False):
+        """:param single (optional): the hand has a single card, the one
+                drawn may make a blackjack."""
+        left = float(sum(composition))
+        counts = list(composition)
+        value = 0.0
+        for index, count in enumerate(composition):
+            if not count:
+                continue
+            card = index + 1
+            if hard + card > self.blackjack:
+                value -= count / left
+                continue
+            if single and self.is_blackjack(hard + card, soft or card == 1):
+                value += count / left * self.blackjack_win
+                continue
+            counts[index] -= 1
+            value += count / left * self.value(hard + card, soft or card == 1, upcard,
+                                               tuple(counts))
+            counts[index] += 1
+        return value
+
+    def split(self, card, upcard, composition):
+        """Like the solver, both hands are played from the same cards"""
+        soft = card == 1
+        first = self.hit(card, soft, upcard, composition, True)
+        second = max(self.stand(card, soft, upcard, composition), first)
+        return 0.5 * first + 0.5 * second
+
+    def value(self, hard, soft, upcard, composition):
+        """The expected value of the hand playing the best option"""
+        key = (composition, hard, soft, upcard)
+        value = self.cache.get(key)
+        if value is None:
+            value = max(self.stand(hard, soft, upcard, composition),
+                        self.hit(hard, soft, upcard, composition))
+            self.cache[key] = value
+        return value
+
+    def options(self, hand, upcard, composition):
+        """The expected value of every option of the hand, by option.
+            :param hand: a Hand of a player.
+            :param upcard: the code of the dealer's upcard.
+            :param composition: the cards the player hasn't seen, see
+                unseen and cards.composition."""
+        upcard = HARD_VALUES[upcard]
+        hard, soft = hand.hard, hand.aces > 0
+        values = {settings.OPTION_HIT: self.hit(hard, soft, upcard, composition),
+                  settings.OPTION_STAND: self.stand(hard, soft, upcard, composition)}
+        if hand.can_do_split():
+            values[settings.OPTION_SPLIT] = self.split(hard / 2, upcard, composition)
+        return values
+
+    def best(self, hand, upcard, composition):
+        values = self.options(hand, upcard, composition)
+        return max(sorted(values), key=values.get)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Cards encoded as small integers.
+
+The code of a card is rank * 4 + suit, so a deck is 0..51 and can be
+stored as an array of bytes. A hidden card has the HIDDEN bit set and
+it's worth 0 until it's revealed, so the value of any code, hidden or
+not, is just VALUES[code].
+
+An ace is worth its value in settings.DECK_CONF while the hand doesn't
+go over the blackjack, HARD_VALUES counts it as 1 and SOFT_BONUS is
+what it adds when it's soft."""
+from array import array
+import settings
+from renderers import DEFAULT_BACKEND
+
+RANKS = ("A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K")
+SUITS = tuple(sorted(settings.DECK_CONF['suits']))
+HIDDEN = 0x40
+DECK_SIZE = len(RANKS) * len(SUITS)
+
+def encode(representation, suit=SUITS[0]):
+    """The code of a card.
+        :param representation: the rank as in settings.DECK_CONF
+        :param suit: the name of the suit as in settings.DECK_CONF"""
+    return RANKS.index(representation) << 2 | SUITS.index(suit)
+
+def rank_of(code):
+    return (code & ~HIDDEN) >> 2
+
+def suit_of(code):
+    return code & 3
+
+def hide(code):
+    return code | HIDDEN
+
+def reveal(code):
+    return code & ~HIDDEN
+
+def is_hidden(code):
+    return code & HIDDEN != 0
+
+def _value(code):
+    if code & HIDDEN or code >= DECK_SIZE:
+        return 0
+    return settings.DECK_CONF['cards'][RANKS[rank_of(code)]]
+
+def _is_ace(code):
+    return _value(code) != 0 and RANKS[rank_of(code)] == "A"
+
+#every code with the hidden bit fits in 7 bits
+VALUES = array('B', [_value(code) for code in range(HIDDEN << 1)])
+ACES = array('B', [_is_ace(code) for code in range(HIDDEN << 1)])
+SOFT_BONUS = settings.DECK_CONF['cards']["A"] - 1
+HARD_VALUES = array('B', [VALUES[code] - SOFT_BONUS * ACES[code]
+                          for code in range(HIDDEN << 1)])
+DECK = array('B', range(DECK_SIZE))
+#tens, jacks, queens and kings are the same for the score
+VALUE_RANKS = 10
+
+def composition(codes):
+    """How many cards of each value there are, from the ace to the tens"""
+    counts = [0] * VALUE_RANKS
+    for code in codes:
+        counts[HARD_VALUES[reveal(code)] - 1] += 1
+    return tuple(counts)
+
+class Card(object):
+    """It represents a card of a suit.
+        A card can be hidden, which means that the user can't see either
+        the value or the representation.
+        Cards can't be changed and there's only one of each, see FACES,
+        the hands keep whether theirs are hidden in the codes."""
+
+    __slots__ = ("code", "suit", "representation", "_value")
+
+    @classmethod
+    def from_code(cls, code):
+        """The card of an encoded one, hidden if the code is."""
+        return FACES[code]
+
+    def __init__(self, code):
+        set_attribute = super(Card, self).__setattr__
+        set_attribute("code", code)
+        set_attribute("suit", settings.DECK_CONF['suits'][SUITS[suit_of(code)]])
+        set_attribute("representation", RANKS[rank_of(code)])
+        set_attribute("_value", VALUES[reveal(code)])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("A card can't be changed")
+
+    def render(self, renderer=None):
+        """:param renderer (optional): the card renderer of a backend, the
+                one of the default backend if there isn't any."""
+        (renderer or DEFAULT_BACKEND.card()).render(self)
+
+    @property
+    def hidden(self):
+        """This method returns whether the card is visible or not."""
+        return is_hidden(self.code)
+
+    @property
+    def value(self):
+        """This method returns the card's value."""
+        if self.hidden:
+            return 0
+        return self._value
+
+    def __repr__(self):
+        return "Card(%s)" % ("hidden" if self.hidden else
+                             "%s of %s" % (self.representation, SUITS[suit_of(self.code)]))
+
+#the card of every code, hidden or not
+FACES = tuple(Card(code) if reveal(code) < DECK_SIZE else None
+              for code in range(HIDDEN << 1))
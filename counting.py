@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Card counting, as a player at the table would do it.
+
+Every card is counted once it's seen: when it's dealt face up, or when
+it's revealed if it was dealt hidden, like the dealer's hole card. So the
+cards left are the ones in the shoe plus the hidden ones.
+
+A tag system gives every rank a tag, the running count is the sum of the
+tags of the cards seen since the shoe was shuffled and the true count is
+the running count per deck left. Everything is updated card by card, so
+asking for the counts costs nothing:
+
+    counter = CardCounter([HI_LO, OMEGA_II])
+    game.observers.append(counter)
+    ...
+    counter.true_count(HI_LO)
+"""
+from array import array
+import settings
+from cards import RANKS, SUITS, DECK_SIZE, HIDDEN, VALUE_RANKS, HARD_VALUES, \
+    encode, rank_of, is_hidden
+from game import Observer
+
+class TagSystem(object):
+    """The tag of every rank, the ones left out are 0"""
+
+    def __init__(self, name, tags):
+        """:param tags: a dict with the tag of each rank, by its
+                representation as in settings.DECK_CONF."""
+        self.name = name
+        self.tags = array('b', [0] * (HIDDEN << 1))
+        for representation, tag in tags.iteritems():
+            for suit in SUITS:
+                self.tags[encode(representation, suit)] = tag
+
+    def is_balanced(self):
+        """Whether a whole deck counts 0"""
+        return sum(self.tags[:DECK_SIZE]) == 0
+
+    def __repr__(self):
+        return "TagSystem(%r)" % self.name
+
+def _tens(tag):
+    return dict((representation, tag) for representation in ("10", "J", "Q", "K"))
+
+HI_LO = TagSystem("Hi-Lo", dict({"A": -1, "2": 1, "3": 1, "4": 1, "5": 1, "6": 1},
+                                **_tens(-1)))
+HI_OPT_I = TagSystem("Hi-Opt I", dict({"3": 1, "4": 1, "5": 1, "6": 1}, **_tens(-1)))
+OMEGA_II = TagSystem("Omega II", dict({"2": 1, "3": 1, "4": 2, "5": 2, "6": 2, "7": 1,
+                                       "9": -1}, **_tens(-2)))
+KO = TagSystem("KO", dict({"A": -1, "2": 1, "3": 1, "4": 1, "5": 1, "6": 1, "7": 1},
+                          **_tens(-1)))
+
+class CardCounter(Observer):
+    """It counts the cards of a game with one or more tag systems. It
+       starts over every time the shoe is shuffled."""
+
+    def __init__(self, systems=None):
+        """:param systems: the tag systems to count with, Hi-Lo by default."""
+        self.systems = list(systems or [HI_LO])
+        self.decks = 0
+        self.running = [0] * len(self.systems)
+        self.ranks = [0] * len(RANKS)
+        self.left = 0
+
+    def event(self, game, event, hand, value):
+        if event == settings.EVENT_HIT:
+            if not is_hidden(value):
+                self.see(value)
+        elif event == settings.EVENT_REVEAL:
+            self.see(value)
+        elif event == settings.EVENT_SHUFFLE:
+            self.reset(len(game.deck) // DECK_SIZE)
+            #the cards still in play weren't shuffled, the visible ones are seen
+            for participant in game.players + [game.dealer]:
+                for played in participant.hands:
+                    for card in played.cards:
+                        if not is_hidden(card):
+                            self.see(card)
+
+    def reset(self, decks):
+        """Nothing seen of a full shoe"""
+        self.decks = decks
+        self.running = [0] * len(self.systems)
+        self.ranks = [len(SUITS) * decks] * len(RANKS)
+        self.left = DECK_SIZE * decks
+
+    def see(self, code):
+        """A card is shown"""
+        self.ranks[rank_of(code)] -= 1
+        self.left -= 1
+        running = self.running
+        for index, system in enumerate(self.systems):
+            running[index] += system.tags[code]
+
+    def running_count(self, system=None):
+        """:param system: one of the systems counted with, the first one
+                by default."""
+        return self.running[self.systems.index(system) if system else 0]
+
+    def decks_left(self):
+        return float(self.left) / DECK_SIZE
+
+    def true_count(self, system=None):
+        """The running count per deck left"""
+        if not self.left:
+            return float(self.running_count(system))
+        return self.running_count(system) / self.decks_left()
+
+    def remaining(self, representation):
+        """The cards of a rank not seen yet"""
+        return self.ranks[RANKS.index(representation)]
+
+    def composition(self):
+        """The cards not seen yet by value, see cards.composition"""
+        counts = [0] * VALUE_RANKS
+        for rank, count in enumerate(self.ranks):
+            counts[HARD_VALUES[rank << 2] - 1] += count
+        return tuple(counts)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Evaluations that stop as soon as the answer is clear.
+
+Rounds are played in batches and after every batch the confidence
+interval of the mean is checked against a stopping rule. Looking at the
+results many times would make a false answer far more likely, so the
+error allowed, alpha, is spent little by little (Lan-DeMets with an
+O'Brien-Fleming spending function): the first looks need overwhelming
+evidence and the last ones about the usual one. The chance of any false
+answer stays under alpha however the looks go.
+
+ - DifferenceEvaluation: is an arm of an Experiment better or worse than
+   the baseline, or the same within a margin?
+ - IntervalEvaluation: is the expected value per hand of a Simulation
+   inside a target interval or outside of it?
+
+Usage:
+    python evaluation.py [max rounds] [batch]
+"""
+import sys
+import math
+import settings
+
+BETTER = "better"
+WORSE = "worse"
+EQUIVALENT = "equivalent"
+INSIDE = "inside"
+OUTSIDE = "outside"
+INCONCLUSIVE = "inconclusive"
+
+def normal_cdf(z):
+    return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+def normal_quantile(p):
+    """The z with normal_cdf(z) == p, by bisection"""
+    low, high = -40.0, 40.0
+    for _ in range(100):
+        middle = (low + high) / 2
+        if normal_cdf(middle) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+class AlphaSpending(object):
+    """How much of alpha each look can use, for a run of up to
+       max_rounds rounds"""
+
+    def __init__(self, alpha=0.05, max_rounds=1000000):
+        self.alpha = alpha
+        self.max_rounds = max_rounds
+        self.spent = 0.0
+        self.z = normal_quantile(1 - alpha / 2)
+
+    def spending(self, rounds):
+        """The alpha spent in total once that many rounds are played"""
+        fraction = min(1.0, float(rounds) / self.max_rounds)
+        if not fraction:
+            return 0.0
+        return 2 - 2 * normal_cdf(self.z / math.sqrt(fraction))
+
+    def look(self, rounds):
+        """The z of the interval of a look after that many rounds, it
+           spends the alpha of the rounds since the last look"""
+        spent = self.spending(rounds)
+        alpha, self.spent = spent - self.spent, spent
+        if alpha <= 0:
+            return float("inf")
+        return normal_quantile(1 - alpha / 2)
+
+class Result(object):
+    """What an evaluation found"""
+
+    def __init__(self, decision, rounds, mean, interval, looks):
+        self.decision = decision
+        self.rounds = rounds
+        self.mean = mean
+        self.interval = interval
+        self.looks = looks
+
+    def __repr__(self):
+        return "Result(%s after %d rounds and %d looks, mean %+.4f in [%+.4f, %+.4f])" % (
+            self.decision, self.rounds, self.looks, self.mean,
+            self.interval[0], self.interval[1])
+
+class Evaluation(object):
+    """It plays batches of rounds until the rule decides or the rounds
+       run out, or until playing doesn't add any. Subclasses play the
+       rounds and decide."""
+
+    def __init__(self, batch=1000, max_rounds=1000000, alpha=0.05):
+        """:param batch: rounds played between looks.
+           :param max_rounds: the most rounds played, alpha is spent
+                along them.
+           :param alpha: the chance of a wrong answer allowed."""
+        self.batch = batch
+        self.max_rounds = max_rounds
+        self.alpha = alpha
+
+    def play(self, rounds):
+        """ It must play that many more rounds"""
+        raise NotImplementedError
+
+    def rounds(self):
+        """ It must return the rounds played so far"""
+        raise NotImplementedError
+
+    def estimate(self):
+        """ It must return the samples, their mean and their variance"""
+        raise NotImplementedError
+
+    def decide(self, low, high):
+        """ It must return the decision for the interval, None if it
+            isn't clear yet"""
+        raise NotImplementedError
+
+    def run(self):
+        spending = AlphaSpending(self.alpha, self.max_rounds)
+        looks = 0
+        decision = None
+        mean, interval = 0.0, (0.0, 0.0)
+        while decision is None and self.rounds() < self.max_rounds:
+            played = self.rounds()
+            self.play(min(self.batch, self.max_rounds - self.rounds()))
+            #the rounds ran out before max_rounds, like a table where
+            #everybody went bankrupt without rebuying
+            if self.rounds() == played:
+                break
+            looks += 1
+            samples, mean, variance = self.estimate()
+            z = spending.look(self.rounds())
+            #too early to spend anything, nothing can be decided yet
+            if z == float("inf") or samples < 2:
+                interval = (float("-inf"), float("inf"))
+                continue
+            margin = z * math.sqrt(variance / samples)
+            interval = (mean - margin, mean + margin)
+            decision = self.decide(*interval)
+        return Result(decision or INCONCLUSIVE, self.rounds(), mean, interval, looks)
+
+class DifferenceEvaluation(Evaluation):
+    """Whether an arm of an Experiment does better than the baseline, the
+       difference is per round."""
+
+    def __init__(self, experiment, arm=1, margin=None, **kwargs):
+        """:param arm: the arm compared with the first one.
+           :param margin (optional): a difference smaller than it either
+                way makes them equivalent, without it they're only told
+                apart."""
+        super(DifferenceEvaluation, self).__init__(**kwargs)
+        self.experiment = experiment
+        self.difference = experiment.differences[arm - 1]
+        self.margin = margin
+
+    def play(self, rounds):
+        self.experiment.run(rounds)
+
+    def rounds(self):
+        return self.experiment.rounds
+
+    def estimate(self):
+        difference = self.difference
+        return difference.samples, difference.mean, difference.variance()
+
+    def decide(self, low, high):
+        if low > 0:
+            return BETTER
+        if high < 0:
+            return WORSE
+        if self.margin is not None and -self.margin < low and high < self.margin:
+            return EQUIVALENT
+        return None
+
+class IntervalEvaluation(Evaluation):
+    """Whether the expected value per hand of a Simulation is in a target
+       interval."""
+
+    def __init__(self, simulation, target, **kwargs):
+        """:param target: the (lowest, highest) expected value."""
+        super(IntervalEvaluation, self).__init__(**kwargs)
+        self.simulation = simulation
+        self.target = target
+
+    def play(self, rounds):
+        self.simulation.run(rounds)
+
+    def rounds(self):
+        return self.simulation.rounds
+
+    def estimate(self):
+        stats = self.simulation.stats
+        return stats.hands, stats.mean, stats.variance()
+
+    def decide(self, low, high):
+        if self.target[0] <= low and high <= self.target[1]:
+            return INSIDE
+        if high < self.target[0] or low > self.target[1]:
+            return OUTSIDE
+        return None
+
+if __name__ == '__main__':
+    from experiment import Arm, Experiment
+    from solver import Solver
+    from strategies import StandOnStrategy, TableStrategy
+    max_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    arms = [Arm("Dealer", StandOnStrategy()),
+            Arm("Basic strategy", TableStrategy(Solver().solve()))]
+    experiment = Experiment(arms, decks=settings.SHOE_DECKS)
+    print DifferenceEvaluation(experiment, batch=batch, max_rounds=max_rounds).run()
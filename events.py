@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""An audit trail of every round, as fixed width binary records.
+
+Every record is the round, what happened, the seat (DEALER for the
+dealer), the hand of that seat and a value:
+
+ - ROUND: the round starts, the value is 0.
+ - SHUFFLE: the shoe was shuffled with the seed in the value.
+ - BET: the value is the bet of a new hand.
+ - HIT: the value is the code of the card dealt, see cards.py.
+ - STAND: the value is 0.
+ - SPLIT: the value is the new hand of the seat.
+ - STATE: the game is in the state of the value, see settings.STATE_*,
+   and the seat is the winner's.
+ - SETTLE: the value is what the seat won or lost in the round.
+
+A round is written to a buffer and the buffer to the file every batch of
+rounds. Replaying a round rebuilds its hands without a game, so nothing
+is dealt, asked or rendered."""
+import struct
+import settings
+from game import Observer
+from participants import Hand
+from renderers import NullBackend
+
+ROUND = 0
+SHUFFLE = 1
+BET = 2
+HIT = 3
+STAND = 4
+SPLIT = 5
+STATE = 6
+SETTLE = 7
+
+DEALER = 255
+NOBODY = 254
+
+#the value is a double, what a seat wins can have a fraction of a chip
+RECORD = struct.Struct("<IBBBxd")
+
+class EventRecorder(Observer):
+    """It writes what happens in a game to a file.
+        game.observers.append(EventRecorder(path))"""
+
+    def __init__(self, path, batch=1000):
+        """:param path: the log, new records are appended to it and
+                their rounds go on from the last one in it.
+           :param batch: rounds kept in memory before writing them."""
+        self.file = open(path, "ab")
+        self.batch = batch
+        self.buffer = bytearray()
+        self.round = self.last_round(path)
+        self.rounds = 0
+        self.seed = None
+        self.hands = {}
+        self.seats = {}
+        self.money = {}
+
+    @staticmethod
+    def last_round(path):
+        """The round of the last record of the log, -1 if it's empty"""
+        with open(path, "rb") as log:
+            log.seek(0, 2)
+            size = log.tell() - log.tell() % RECORD.size
+            if not size:
+                return -1
+            log.seek(size - RECORD.size)
+            return RECORD.unpack(log.read(RECORD.size))[0]
+
+    def write(self, event, seat=NOBODY, hand=0, value=0):
+        self.buffer += RECORD.pack(self.round, event, seat, hand, value)
+
+    def seat(self, game, hand):
+        """The seat and the number of the hand in this round"""
+        seat = self.hands.get(id(hand))
+        if seat is None:
+            if hand in game.dealer.hands:
+                owner = DEALER
+            else:
+                owner = [i for i, player in enumerate(game.players)
+                         if hand in player.hands][0]
+            seat = self.new_hand(owner, hand)
+        return seat
+
+    def new_hand(self, owner, hand):
+        number = self.seats.get(owner, 0)
+        self.seats[owner] = number + 1
+        self.hands[id(hand)] = (owner, number)
+        return owner, number
+
+    def update(self, game):
+        winner = NOBODY
+        if game.winner == game.dealer:
+            winner = DEALER
+        elif game.winner in game.players:
+            winner = game.players.index(game.winner)
+        self.write(STATE, winner, 0, game.state)
+
+    def event(self, game, event, hand, value):
+        if event == settings.EVENT_ROUND:
+            self.start_round(game)
+        elif event == settings.EVENT_ROUND_OVER:
+            self.finish_round(game)
+        elif event == settings.EVENT_HIT:
+            seed = getattr(game.deck, "seed", None)
+            if seed != self.seed:
+                self.seed = seed
+                self.write(SHUFFLE, value=seed)
+            self.write(HIT, *self.seat(game, hand), value=value)
+        elif event == settings.EVENT_STAND:
+            self.write(STAND, *self.seat(game, hand))
+        elif event == settings.EVENT_SPLIT:
+            owner, number = self.seat(game, hand)
+            self.write(SPLIT, owner, number, self.new_hand(owner, value)[1])
+        elif event == settings.EVENT_BET:
+            self.write(BET, *self.seat(game, hand), value=value)
+
+    def start_round(self, game):
+        self.round += 1
+        self.hands.clear()
+        self.seats.clear()
+        self.money = [player.get_money() for player in game.players]
+        self.write(ROUND)
+
+    def finish_round(self, game):
+        for seat, player in enumerate(game.players):
+            if seat in self.seats:
+                self.write(SETTLE, seat, 0, player.get_money() - self.money[seat])
+        self.rounds += 1
+        if self.rounds % self.batch == 0:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer = bytearray()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+class Round(object):
+    """The final state of a replayed round"""
+
+    def __init__(self, number):
+        self.number = number
+        self.seeds = []
+        self.hands = {}
+        self.dealer = None
+        self.states = []
+        self.net = {}
+
+    def get_hands(self, seat):
+        """The hands of a seat, in the order they were played"""
+        return [hand for _, hand in sorted(self.hands.get(seat, {}).items())]
+
+class EventLog(object):
+    """It reads a log written by an EventRecorder. Only the position of
+       every round is kept, so any of them can be replayed right away."""
+
+    def __init__(self, path):
+        with open(path, "rb") as log:
+            self.data = log.read()
+        self.rounds = {}
+        for offset in xrange(0, len(self.data), RECORD.size):
+            number, event = RECORD.unpack_from(self.data, offset)[:2]
+            if event == ROUND:
+                self.rounds[number] = offset
+
+    def __len__(self):
+        return len(self.rounds)
+
+    def records(self, number):
+        """Every record of the round"""
+        offset = self.rounds[number]
+        while offset < len(self.data):
+            record = RECORD.unpack_from(self.data, offset)
+            if record[0] != number:
+                break
+            yield record[1:]
+            offset += RECORD.size
+
+    def replay(self, number):
+        """It returns the Round with its final state"""
+        backend = NullBackend()
+        result = Round(number)
+        hands = result.hands
+        for event, seat, index, value in self.records(number):
+            if event == BET:
+                hands.setdefault(seat, {})[index] = Hand(value, backend=backend)
+            elif event == HIT:
+                #the dealer doesn't bet
+                if index not in hands.setdefault(seat, {}):
+                    hands[seat][index] = Hand(backend=backend)
+                hands[seat][index].add_card(int(value))
+            elif event == STAND:
+                hands[seat][index].stand(_Replay)
+            elif event == SPLIT:
+                hands[seat][int(value)] = hands[seat][index].split(_Replay)
+            elif event == STATE:
+                result.states.append((int(value), seat))
+            elif event == SETTLE:
+                result.net[seat] = value
+            elif event == SHUFFLE:
+                result.seeds.append(int(value))
+        result.dealer = hands.pop(DEALER, {}).get(0)
+        if settings.STATE_DEALER_TURN in [state for state, _ in result.states]:
+            result.dealer.reveal()
+        return result
+
+class _Replay(object):
+    """It stands for the game when the hands are replayed"""
+
+    @staticmethod
+    def notify(*args):
+        pass
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Strategies compared on the same cards.
+
+Every strategy, or arm, plays its own table, but all the tables get the
+same shoe every round (common random numbers): the shoe is shuffled
+before every round with the same seed for every table. So the luck of
+the cards is mostly the same for all of them and the difference of their
+results is much less noisy than the results themselves.
+
+With antithetic shoes every round is played twice, the second time with
+every rank swapped for its opposite, an ace for a king, a two for a
+queen and so on. A shoe full of tens becomes one full of small cards and
+the average of both is less noisy still.
+
+Usage:
+    python experiment.py [rounds] [decks] [antithetic]
+"""
+import sys
+import math
+import random
+from array import array
+import settings
+from cards import RANKS, DECK_SIZE, rank_of, suit_of
+from game import Deck, Shoe
+from participants import Player
+from renderers import NullBackend
+from simulation import Simulation, DEFAULT_BET
+from strategies import StandOnStrategy, FlatBetting
+
+#the card with the opposite rank and the same suit, for every code
+OPPOSITES = array('B', [(len(RANKS) - 1 - rank_of(code)) << 2 | suit_of(code)
+                        for code in range(DECK_SIZE)])
+
+class AntitheticDeck(Deck):
+    """A deck shuffled like any other one with the same seed, but with
+       the opposite of every card"""
+
+    def new_deck(self):
+        #it's kept with the opposite of every card of the other deck
+        cards = super(AntitheticDeck, self).new_deck()
+        self._swap(cards)
+        return cards
+
+    def _shuffle(self, cards):
+        #the cards are put back in the order the other deck has before
+        #shuffling them, or every second shuffle would undo the one before
+        self._swap(cards)
+        super(AntitheticDeck, self)._shuffle(cards)
+        self._swap(cards)
+
+    @staticmethod
+    def _swap(cards):
+        """Every card for its opposite"""
+        for index, card in enumerate(cards):
+            cards[index] = OPPOSITES[card]
+
+class Arm(object):
+    """One of the ways of playing that are compared"""
+
+    def __init__(self, name, strategy=None, betting=None):
+        """:param strategy (optional): by default the players play like
+                the dealer.
+           :param betting (optional): by default they bet DEFAULT_BET."""
+        self.name = name
+        self.strategy = strategy or StandOnStrategy()
+        self.betting = betting or FlatBetting(DEFAULT_BET)
+
+    def simulation(self, players, decks, seed, deck=Deck):
+        """A table shuffled before every round, so it uses exactly one
+           seed per round whatever the players do"""
+        users = [Player("Bot %d" % (i + 1), settings.PLAYER_CHIPS, None,
+                        self.strategy, self.betting)
+                 for i in range(players)]
+        game = Shoe(users, decks, 0, backend=NullBackend())
+        game.deck = deck.create(decks, random.Random(seed), game.backend)
+        return Simulation(game)
+
+class Difference(object):
+    """The running mean and variance of the paired difference of the
+       results of two arms, and of each of them alone"""
+
+    def __init__(self):
+        self.samples = 0
+        self.means = [0.0, 0.0, 0.0]
+        self.m2 = [0.0, 0.0, 0.0]
+
+    def add(self, arm, baseline):
+        self.samples += 1
+        for index, value in enumerate((arm - baseline, arm, baseline)):
+            delta = value - self.means[index]
+            self.means[index] += delta / self.samples
+            self.m2[index] += delta * (value - self.means[index])
+
+    def variance(self, index=0):
+        if self.samples < 2:
+            return 0.0
+        return self.m2[index] / (self.samples - 1)
+
+    @property
+    def mean(self):
+        return self.means[0]
+
+    def confidence_interval(self, z=1.96):
+        """The interval of the mean difference per round, 95% by default"""
+        if not self.samples:
+            return (0.0, 0.0)
+        margin = z * math.sqrt(self.variance() / self.samples)
+        return (self.mean - margin, self.mean + margin)
+
+    def reduction(self):
+        """How many times fewer rounds it takes for the same precision
+           than comparing independent runs"""
+        if not self.variance():
+            return float("inf")
+        return (self.variance(1) + self.variance(2)) / self.variance()
+
+class Experiment(object):
+    """It plays every arm on the same shoes and compares all of them with
+       the first one."""
+
+    def __init__(self, arms, players=1, decks=settings.SHOE_DECKS, seed=0,
+                 antithetic=False):
+        """:param arms: the Arms, the first one is the baseline.
+           :param players: the players at every table, all playing the same.
+           :param seed: the seed of the shoes.
+           :param antithetic: every round is played on the antithetic shoe too."""
+        self.arms = arms
+        self.antithetic = antithetic
+        decks_types = [Deck, AntitheticDeck] if antithetic else [Deck]
+        self.tables = [[arm.simulation(players, decks, seed, deck) for deck in decks_types]
+                       for arm in arms]
+        self.differences = [Difference() for _ in arms[1:]]
+        self.rounds = 0
+
+    def play_round(self):
+        """It returns the net result of every arm"""
+        results = []
+        for simulations in self.tables:
+            net = 0
+            for simulation in simulations:
+                before = simulation.stats.net
+                simulation.play_round()
+                net += simulation.stats.net - before
+            results.append(float(net) / len(simulations))
+        for difference, result in zip(self.differences, results[1:]):
+            difference.add(result, results[0])
+        self.rounds += 1
+        return results
+
+    def run(self, rounds):
+        for _ in xrange(rounds):
+            self.play_round()
+        return self
+
+    def report(self):
+        """The difference of every arm with the baseline"""
+        lines = []
+        for arm, difference in zip(self.arms[1:], self.differences):
+            low, high = difference.confidence_interval()
+            lines.append("%s - %s: %+.4f per round, 95%% CI [%+.4f, %+.4f], "
+                         "%.1f times fewer rounds than independent runs" %
+                         (arm.name, self.arms[0].name, difference.mean, low, high,
+                          difference.reduction()))
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+    from solver import Solver
+    from strategies import TableStrategy
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    decks = int(sys.argv[2]) if len(sys.argv) > 2 else settings.SHOE_DECKS
+    antithetic = len(sys.argv) > 3 and sys.argv[3] not in ("0", "no", "false")
+    arms = [Arm("Dealer", StandOnStrategy()),
+            Arm("Basic strategy", TableStrategy(Solver().solve()))]
+    experiment = Experiment(arms, decks=decks, antithetic=antithetic).run(rounds)
+    print experiment.report()
@@ -7,95 +7,276 @@ __email__ = "hola@flopezluis"
 
 import settings
 import random
+from array import array
+from cards import FACES, DECK, DECK_SIZE, composition
 from participants import Dealer, Player
-from renderers import CardTextRender, DeckTextRender, GameTextRender
-
-class Card(object):
-    """It represents a card of a suit.
-        A card can be hidden, which means that the user can't see either
-        the value or the representation."""
-
-    def __init__(self, suit, representation, value, renderer = None):
-        """
-        :param suit: suit to what it belongs.
-        :param representaion: how to depict the card.
-        :param value: real.
-        """
-        self.suit = suit
-        self._value = value
-        self.representation = representation
-        self._hidden = False
-        self.renderer = renderer or CardTextRender()
-
-    def render(self):
-        self.renderer.render(self)
-
-    @property
-    def hidden(self):
-        """This method returns whether the card is visible or not."""
-        return self._hidden
-
-    @hidden.setter
-    def hidden(self, value):
-        self._hidden = value
-
-    @property
-    def value(self):
-        """This method returns the card's value."""
-        if self.hidden:
-            return 0
-        return self._value
+from renderers import DEFAULT_BACKEND
+from rules import DEFAULT_RULES
 
 class Deck(object):
-    """ It represents a deck. The type of deck is set by conf"""
+    """ It represents a deck. The type of deck is set by conf.
+        The cards are stored encoded, see cards.py, and they're never
+        removed: the ones before position have already been dealt and
+        the first discarded of them are out of play."""
 
     @classmethod
-    def create(cls, decks = 1):
-        deck = Deck()
+    def create(cls, decks = 1, rng = None, backend = None):
+        deck = cls(rng=rng, backend=backend)
         for _ in range(decks):
             deck.__create_deck()
         return deck
 
-    def __init__(self, renderer = None):
-        self.deck = []
-        self.renderer = renderer or DeckTextRender()
+    def __init__(self, renderer = None, rng = None, backend = None):
+        """:param rng (optional): the random.Random to shuffle with, the
+                random module by default.
+           :param backend (optional): it creates the renderers of the deck
+                and its cards, see renderers.py"""
+        self.deck = array('B')
+        self.rng = rng or random
+        self.seed = None
+        self.shuffles = 0
+        self.backend = backend or DEFAULT_BACKEND
+        self.position = 0
+        self.discarded = 0
+        #the decks added when every card was in play, see open_deck
+        self.opened = 0
+        self.renderer = renderer or self.backend.deck()
 
     def __create_deck(self):
-        for _, repre in settings.DECK_CONF['suits'].iteritems():
-            self.deck.extend([Card(repre, *conf) for conf in settings.DECK_CONF['cards'].items()])
+        self.deck.extend(self.new_deck())
+
+    def new_deck(self):
+        """The cards of a deck as it comes, before any shuffle"""
+        return array('B', DECK)
 
     def shuffle(self):
-        random.shuffle(self.deck)
+        """All the cards are shuffled and ready to be dealt again, the
+           decks opened are put away"""
+        if self.opened:
+            decks = len(self.deck) // DECK_SIZE - self.opened
+            self.deck = array('B')
+            for _ in range(decks):
+                self.__create_deck()
+            self.opened = 0
+        self._shuffle(self.deck)
+        self.position = 0
+        self.discarded = 0
+
+    def get_card(self):
+        if self.is_empty():
+            if self.discarded:
+                self.reshuffle_discards()
+            else:
+                self.open_deck()
+        card = self.deck[self.position]
+        self.position += 1
+        return card
+
+    def discard(self):
+        """Every card dealt so far is out of play"""
+        self.discarded = self.position
+
+    def reshuffle_discards(self):
+        """The discards are shuffled and put back to be dealt, but the
+           cards still in play are kept aside."""
+        in_play = self.deck[self.discarded:self.position]
+        discards = self.deck[:self.discarded]
+        self._shuffle(discards)
+        self.deck[:len(in_play)] = in_play
+        self.deck[len(in_play):self.position] = discards
+        self.position = len(in_play)
+        self.discarded = 0
+
+    def open_deck(self):
+        """Every card is in play, so a new deck is shuffled and added
+           until the next shuffle"""
+        cards = self.new_deck()
+        self._shuffle(cards)
+        self.deck.extend(cards)
+        self.opened += 1
+
+    def _shuffle(self, cards):
+        """Every shuffle has its own seed, so it can be told and repeated"""
+        self.seed = self.rng.getrandbits(32)
+        self.shuffles += 1
+        random.Random(self.seed).shuffle(cards)
+
+    def penetration(self):
+        """The fraction of the cards already dealt"""
+        return float(self.position) / len(self.deck)
+
+    def is_empty(self):
+        return self.position >= len(self.deck)
+
+    def __len__(self):
+        """The cards of the deck, dealt or not"""
+        return len(self.deck)
+
+    def composition(self):
+        """The cards left to deal by value, see cards.composition"""
+        return composition(self.deck[self.position:])
+
+    def get_cards(self):
+        return [FACES[code] for code in self.deck[self.position:]]
+
+    def render(self):
+        self.renderer.render(self)
+
+class ContinuousDeck(object):
+    """ A continuous shuffling machine: the cards dealt go back in and
+        every card is drawn at random from the ones inside, so nothing is
+        ever shuffled. Only how many of each card there are is kept, in a
+        Fenwick tree, so a draw costs the same for any number of decks."""
+
+    #a power of two with room for every code
+    TREE_SIZE = 64
+
+    def __init__(self, decks=1, renderer=None, rng=None, backend=None):
+        """:param decks: number of decks in the machine.
+           :param rng (optional): the random.Random to draw with."""
+        self.decks = decks
+        self.rng = rng or random
+        self.seed = None
+        self.shuffles = 0
+        self.backend = backend or DEFAULT_BACKEND
+        self.counts = array('l', [decks] * DECK_SIZE)
+        self.tree = [0] * (self.TREE_SIZE + 1)
+        for code in range(DECK_SIZE):
+            self._add(code, decks)
+        self.left = DECK_SIZE * decks
+        self.dealt = array('B')
+        #the decks put in when every card was out, see open_deck
+        self.opened = 0
+        self.renderer = renderer or self.backend.deck()
+
+    def _add(self, code, count):
+        index = code + 1
+        while index <= self.TREE_SIZE:
+            self.tree[index] += count
+            index += index & -index
+
+    def _find(self, position):
+        """The code of the card at that position, counting every card
+           inside in the order of the codes"""
+        index = 0
+        step = self.TREE_SIZE
+        while step:
+            if self.tree[index + step] <= position:
+                index += step
+                position -= self.tree[index]
+            step >>= 1
+        return index
 
     def get_card(self):
-        return self.deck.pop()
+        if not self.left:
+            self.open_deck()
+        card = self._find(self.rng.randrange(self.left))
+        self._add(card, -1)
+        self.counts[card] -= 1
+        self.left -= 1
+        self.dealt.append(card)
+        return card
+
+    def open_deck(self):
+        """Every card is out of the machine, so a new deck goes in until
+           the cards dealt go back"""
+        self._add_decks(1)
+        self.opened += 1
+        self.shuffles += 1
+
+    def _add_decks(self, decks):
+        for code in range(DECK_SIZE):
+            self._add(code, decks)
+            self.counts[code] += decks
+        self.left += DECK_SIZE * decks
+        self.decks += decks
+
+    def discard(self):
+        """The cards dealt so far go back in, and the decks opened come out"""
+        for card in self.dealt:
+            self._add(card, 1)
+            self.counts[card] += 1
+        self.left += len(self.dealt)
+        self.dealt = array('B')
+        self._add_decks(-self.opened)
+        self.opened = 0
+        self.shuffles += 1
+
+    def shuffle(self):
+        self.discard()
+
+    def penetration(self):
+        return float(len(self.dealt)) / len(self)
 
     def is_empty(self):
-        return len(self.deck) == 0
+        return not self.left
+
+    def __len__(self):
+        return DECK_SIZE * self.decks
+
+    def composition(self):
+        return composition(code for code in DECK for _ in range(self.counts[code]))
+
+    def get_cards(self):
+        """The cards inside, in the order of their codes"""
+        return [FACES[code] for code in DECK for _ in range(self.counts[code])]
 
     def render(self):
         self.renderer.render(self)
 
+class Observer(object):
+    """Something that follows a game, it's told about every new state and
+       every event, see settings.EVENT_*"""
+
+    def update(self, game):
+        pass
+
+    def event(self, game, event, hand, value):
+        """:param hand: the hand it happened to, if any.
+           :param value: the card dealt, the bet, the new hand of a split..."""
+        pass
+
 class Game(object):
 
-    def __init__(self, players, renderer=None):
+    def __init__(self, players, renderer=None, backend=None, rules=None):
+        """:param players: the players at the table.
+           :param renderer (optional): the type of render to draw it.
+           :param backend (optional): it creates the renderers of the game,
+                the dealer and every hand and card, see renderers.py.
+                Players get it too if it's given.
+           :param rules (optional): the Ruleset of the table, see rules.py,
+                the one in settings by default. Players play by it."""
         self.players = players
-        self.dealer = Dealer(settings.DEALER_NAME, settings.DEALER_CHIPS)
+        self.backend = backend or DEFAULT_BACKEND
+        self.rules = rules or DEFAULT_RULES
+        for player in players:
+            player.rules = self.rules
+            if backend:
+                player.set_backend(backend)
+        self.dealer = Dealer(settings.DEALER_NAME, settings.DEALER_CHIPS,
+                             backend=self.backend, rules=self.rules)
         self.winner = None
-        self.renderer = renderer or GameTextRender()
+        self.shuffles = 0
+        self.renderer = renderer or self.backend.game()
+        #they're told about every new state and event, see Observer
+        self.observers = []
 
     def set_current_player(self, player):
         self.current_player = player
 
     def ask_bet(self, player):
         valid_bet = False
-        print "Player %s has %d chips" % (player, player.money)
         while not valid_bet:
-            bet = int(input("How much do you want to bet? \n"))
+            bet = player.betting.bet(player, self)
             valid_bet = player.make_bet(bet)
+        self.notify(settings.EVENT_BET, player.hands[-1], bet)
 
     def init_game(self):
+        self.notify(settings.EVENT_ROUND)
         for player in self.players:
+            #a bankrupt player can't bet, so the round goes on without them
+            if player.is_bankrupt():
+                continue
             self.ask_bet(player)
             player.hit(self)
             player.hit(self)
@@ -105,7 +286,12 @@ class Game(object):
         self.dealer.hit(self)
 
     def get_card(self):
-        return self.deck.get_card()
+        card = self.deck.get_card()
+        #the deck may have been shuffled since the last card, even to deal this one
+        if self.deck.shuffles != self.shuffles:
+            self.shuffles = self.deck.shuffles
+            self.notify(settings.EVENT_SHUFFLE)
+        return card
 
     def is_over(self):
         return all([player.is_bankrupt() for player in self.players])
@@ -131,6 +317,11 @@ class Game(object):
                         break
             if finished_hands:
                 self.current_player.clean_hands(finished_hands)
+            if Game.is_busted(self.dealer):
+                #the dealer busted against a player before, the rest win too
+                if self.current_player.get_active_hand():
+                    self.blackjack_or_busted(self.dealer, self.current_player)
+                return
             while (not self.dealer.is_stand() and self.current_player.get_active_hand()):
                 self.process_turn(self.dealer)
                 if self.blackjack_or_busted(self.dealer, self.current_player):
@@ -147,21 +338,23 @@ class Game(object):
             self.winner = opponent
             self.set_state(settings.STATE_BLACKJACK)
         if isinstance(self.winner, Player):
-            self.winner.win_bet(hand)
+            payout = None
+            if self.state == settings.STATE_BLACKJACK:
+                payout = self.rules.blackjack_payout
+            self.winner.win_bet(hand, payout)
         return self.winner
 
     @staticmethod
     def is_blackjack(player):
-        return player.get_score() == settings.BLACKJACK and \
-             player.get_number_of_cards() == settings.CARDS_FOR_BLACKJACK
+        return player.get_active_hand().is_blackjack()
 
     @staticmethod
     def is_busted(player):
-        return player.get_score() > settings.BLACKJACK
+        return player.get_active_hand().is_busted()
 
     def check_winner(self, player):
         for hand in player.hands:
-            if player.get_score() >= self.dealer.get_score():
+            if hand.get_score() >= self.dealer.get_score():
                 player.win_bet(hand)
                 self.set_winner_bigger_score(player)
             else:
@@ -175,20 +368,67 @@ class Game(object):
         self.current_player.set_active_hand(hand)
         self.set_state(settings.STATE_ACTIVE_HAND)
 
+    def finish_round(self):
+        """Every player has played the round"""
+        self.notify(settings.EVENT_ROUND_OVER)
+        self.backend.flush()
+
+    def notify(self, event, hand=None, value=0):
+        for observer in self.observers:
+            observer.event(self, event, hand, value)
+
     def set_state(self, new_state):
         self.state = new_state
         self.renderer.render(self)
+        for observer in self.observers:
+            observer.update(self)
+
+class Shoe(Game):
+    """The decks are shuffled together and dealt round after round until
+       the cut card comes out, only then they're shuffled again."""
+
+    def __init__(self, users, decks=settings.SHOE_DECKS,
+                 penetration=settings.SHOE_PENETRATION, renderer=None, rng=None,
+                 backend=None, rules=None):
+        """:param decks: number of decks in the shoe.
+           :param penetration: the fraction of the shoe dealt before
+                the cut card comes out.
+           :param rng (optional): the random.Random to shuffle with."""
+        super(Shoe, self).__init__(users, renderer, backend, rules)
+        self.penetration = penetration
+        self.deck = Deck.create(decks, rng, self.backend)
+        self.deck.shuffle()
+
+    def init_game(self):
+        for player in self.players:
+            player.clean_hands()
+        self.dealer.clean_hands()
+        if self.deck.penetration() >= self.penetration:
+            self.deck.shuffle()
+        else:
+            self.deck.discard()
+        super(Shoe, self).init_game()
+
+class SingleDeck(Shoe):
+    """A single deck shuffled before every round"""
 
-class SingleDeck(Game):
+    def __init__(self, users, renderer=None, rng=None, backend=None, rules=None):
+        super(SingleDeck, self).__init__(users, 1, 0, renderer, rng, backend, rules)
 
-    def __init__(self, users):
-        super(SingleDeck, self).__init__(users)
-        self.deck = None
+class ContinuousShoe(Game):
+    """The cards are dealt from a continuous shuffling machine, the ones
+       of a round go back in when the next one starts."""
+
+    def __init__(self, users, decks=settings.SHOE_DECKS, renderer=None, rng=None,
+                 backend=None, rules=None):
+        """:param decks: number of decks in the machine.
+           :param rng (optional): the random.Random to draw with."""
+        super(ContinuousShoe, self).__init__(users, renderer, backend, rules)
+        self.deck = ContinuousDeck(decks, rng=rng, backend=self.backend)
 
     def init_game(self):
-        self.deck = Deck.create(1)
-        self.deck.shuffle()
         for player in self.players:
             player.clean_hands()
         self.dealer.clean_hands()
-        super(SingleDeck, self).init_game()
+        self.deck.discard()
+        super(ContinuousShoe, self).init_game()
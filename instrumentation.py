@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Where the time of a round goes.
+
+While it's enabled, the hot paths of the game are wrapped to count the
+calls and time them:
+
+ - set_state: Game.set_state, by state.
+ - process_turn: Game.process_turn, by type of participant.
+ - turn: Participant.turn, by type of participant.
+ - get_card: Deck.get_card and ContinuousDeck.get_card, by type of deck.
+ - render: the render method of every renderer, by renderer.
+
+Times include everything called from inside, so the time of set_state
+includes rendering it. Latencies go to histograms with logarithmic
+buckets, so the percentiles are as precise as the buckets are wide.
+
+Disabling it puts the original methods back, so it costs nothing at all
+when it's off:
+
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    ...
+    print instrumentation.dump()
+    instrumentation.disable()
+"""
+import math
+import threading
+import BaseHTTPServer
+from timeit import default_timer as clock
+import settings
+import renderers
+from game import Game, Deck, ContinuousDeck
+from participants import Participant, Player, Dealer
+
+#buckets go from a microsecond up, each one GROWTH times wider
+MIN_LATENCY = 1e-6
+GROWTH = 1.2
+QUANTILES = (0.5, 0.9, 0.99)
+
+STATES = dict((getattr(settings, name), name[len("STATE_"):].lower())
+              for name in dir(settings) if name.startswith("STATE_"))
+
+def participant_type(participant):
+    return type(participant).__name__.lower()
+
+#what is wrapped: the class, the method, its hook and what it's timed by
+HOOKS = [(Game, "set_state", "set_state", lambda game, state: STATES.get(state, str(state))),
+         (Game, "process_turn", "process_turn", lambda game, player: participant_type(player)),
+         (Deck, "get_card", "get_card", lambda deck: "deck"),
+         (ContinuousDeck, "get_card", "get_card", lambda deck: "continuous")]
+HOOKS += [(cls, "turn", "turn", lambda participant, game: participant_type(participant))
+          for cls in (Participant, Player, Dealer)]
+HOOKS += [(cls, "render", "render", lambda renderer, *args: type(renderer).__name__)
+          for cls in vars(renderers).values()
+          if isinstance(cls, type) and issubclass(cls, renderers.Render) and "render" in vars(cls)]
+
+class Histogram(object):
+    """The number of calls and the latencies of something"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        bucket = 0
+        if seconds > MIN_LATENCY:
+            bucket = int(math.ceil(math.log(seconds / MIN_LATENCY, GROWTH)))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, quantile):
+        """The upper bound of the bucket the quantile falls in"""
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= quantile * self.count:
+                return MIN_LATENCY * GROWTH ** bucket
+        return 0.0
+
+class Instrumentation(object):
+    """It keeps a Histogram for every hook and key. Only one of them can
+       be enabled at a time."""
+
+    enabled = None
+
+    def __init__(self):
+        self.histograms = {}
+        self.originals = []
+        self.lock = threading.Lock()
+
+    def record(self, hook, key, seconds):
+        with self.lock:
+            histogram = self.histograms.get((hook, key))
+            if histogram is None:
+                histogram = self.histograms[(hook, key)] = Histogram()
+            histogram.add(seconds)
+
+    def wrap(self, method, hook, key):
+        record = self.record
+        def timed(*args):
+            start = clock()
+            try:
+                return method(*args)
+            finally:
+                record(hook, key(*args), clock() - start)
+        timed.__name__ = method.__name__
+        timed.__doc__ = method.__doc__
+        return timed
+
+    def enable(self):
+        if Instrumentation.enabled is self:
+            return
+        if Instrumentation.enabled is not None:
+            raise RuntimeError("Another instrumentation is enabled")
+        for cls, name, hook, key in HOOKS:
+            method = vars(cls)[name]
+            self.originals.append((cls, name, method))
+            setattr(cls, name, self.wrap(method, hook, key))
+        Instrumentation.enabled = self
+
+    def disable(self):
+        for cls, name, method in reversed(self.originals):
+            setattr(cls, name, method)
+        self.originals = []
+        if Instrumentation.enabled is self:
+            Instrumentation.enabled = None
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def stats(self):
+        """A dict with the count, the total seconds and the percentiles of
+           every (hook, key)"""
+        with self.lock:
+            stats = {}
+            for name, histogram in self.histograms.items():
+                stats[name] = dict(("p%g" % (100 * quantile), histogram.percentile(quantile))
+                                   for quantile in QUANTILES)
+                stats[name].update(count=histogram.count, total=histogram.total)
+            return stats
+
+    def dump(self):
+        """Everything recorded, in the Prometheus text format"""
+        lines = []
+        for (hook, key), stats in sorted(self.stats().items()):
+            labels = 'hook="%s",key="%s"' % (hook, key)
+            lines.append("blackjack_calls_total{%s} %d" % (labels, stats["count"]))
+            lines.append("blackjack_seconds_total{%s} %.9f" % (labels, stats["total"]))
+            for quantile in QUANTILES:
+                lines.append('blackjack_seconds{%s,quantile="%g"} %.9f' %
+                             (labels, quantile, stats["p%g" % (100 * quantile)]))
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=0, host="127.0.0.1"):
+        """It serves the dump over HTTP from another thread and returns the
+           server, server.server_address tells the port."""
+        instrumentation = self
+        class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = instrumentation.dump()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+        server = BaseHTTPServer.HTTPServer((host, port), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
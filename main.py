@@ -7,7 +7,7 @@ __email__ = "hola@flopezluis"
 
 import settings
 from participants import Player
-from game import Game, SingleDeck
+from game import SingleDeck
 
 def game_logic(players):
     game = SingleDeck(players)
@@ -16,8 +16,11 @@ def game_logic(players):
         print "\n ======= New Game ======= \n"
         game.init_game()
         for player in players:
+            if not player.hands:
+                continue
             game.set_current_player(player)
             game.process_hand()
+        game.finish_round()
 
 def ask_players():
     players = []
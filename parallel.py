@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Headless simulations split across processes.
+
+Every worker shuffles with its own random.Random, seeded from the master
+seed, and plays its share of the rounds. The statistics of the workers
+are merged in order, so the same seed and number of workers always give
+the same result.
+
+Usage:
+    python parallel.py [rounds] [workers] [seed]
+"""
+import sys
+import time
+import random
+import multiprocessing
+from simulation import Simulation, Statistics, DEFAULT_BET
+
+def worker_seeds(seed, workers):
+    """The seed of every worker, drawn from the master seed"""
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(workers)]
+
+def split_rounds(rounds, workers):
+    """The rounds each worker plays, the first ones play the remainder"""
+    share, remainder = divmod(rounds, workers)
+    return [share + (1 if i < remainder else 0) for i in range(workers)]
+
+class Table(object):
+    """It sets up the simulation of a worker, it's sent to the other
+       processes so everything in it must be picklable."""
+
+    def __init__(self, players=1, bet=DEFAULT_BET, strategy=None, decks=None,
+                 penetration=None, rules=None):
+        self.players = players
+        self.bet = bet
+        self.strategy = strategy
+        self.decks = decks
+        self.penetration = penetration
+        self.rules = rules
+
+    def __call__(self, rng):
+        return Simulation.create(self.players, self.bet, self.strategy,
+                                 decks=self.decks, rng=rng, rules=self.rules,
+                                 penetration=self.penetration)
+
+def _run_worker(job):
+    table, rounds, seed = job
+    simulation = table(random.Random(seed))
+    simulation.run(rounds)
+    return simulation.stats
+
+class ParallelSimulation(object):
+    """It plays the rounds of a table in a pool of processes."""
+
+    def __init__(self, table=None, workers=None, seed=0):
+        """:param table: it creates the simulation of every worker.
+           :param workers: number of processes, by default one per cpu.
+           :param seed: the master seed."""
+        self.table = table or Table()
+        self.workers = workers or multiprocessing.cpu_count()
+        self.seed = seed
+        self.elapsed = 0.0
+        self.stats = None
+
+    def jobs(self, rounds):
+        return zip([self.table] * self.workers,
+                   split_rounds(rounds, self.workers),
+                   worker_seeds(self.seed, self.workers))
+
+    def run(self, rounds):
+        start = time.time()
+        pool = multiprocessing.Pool(self.workers)
+        try:
+            results = pool.map(_run_worker, self.jobs(rounds))
+        finally:
+            pool.close()
+            pool.join()
+        self.stats = reduce(Statistics.merge, results, Statistics())
+        self.elapsed = time.time() - start
+        return self.stats
+
+    def hands_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.stats.hands / self.elapsed
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    simulation = ParallelSimulation(Table(decks=6), workers, seed)
+    print simulation.run(rounds)
+    print "%d workers: %.0f hands/sec" % (simulation.workers,
+                                          simulation.hands_per_second())
@@ -1,7 +1,11 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import settings
-from renderers import ParticipantTextRender, HandTextRender
+import cards
+from cards import FACES
+from renderers import DEFAULT_BACKEND
+from rules import DEFAULT_RULES
+from strategies import InputStrategy, InputBetting
 
 HITTING = "HITTING"
 STAND = "STAND"
@@ -10,14 +14,20 @@ SPLIT = "SPLIT"
 class Participant(object):
     """Base class for every participant in the blackjack game"""
 
-    def __init__(self, name, money, renderer = None):
+    def __init__(self, name, money, renderer = None, backend = None, rules = None):
         """ A participant has to be created with these parameters
             :param name: the name of the participant.
             :param money: the money to start with.
-            :param render (optional): the type of render to draw it."""
+            :param render (optional): the type of render to draw it.
+            :param backend (optional): it creates the renderers of the
+                participant and its hands, see renderers.py
+            :param rules (optional): the Ruleset of its hands, the game
+                sets the one of the table."""
         self.name = name
         self.hands = []
-        self.renderer = renderer or ParticipantTextRender()
+        self.rules = rules or DEFAULT_RULES
+        self.backend = backend or DEFAULT_BACKEND
+        self.renderer = renderer or self.backend.participant()
         self.active_hand = None
         self.money = money
 
@@ -27,13 +37,20 @@ class Participant(object):
     def render_active_hand(self):
         self.renderer.render_active_hand(self)
 
+    def set_backend(self, backend):
+        """Render the participant and its hands with another backend"""
+        self.backend = backend
+        self.renderer = backend.participant()
+        for hand in self.hands:
+            hand.set_backend(backend)
+
     def is_valid_bet(self, bet):
         return bet > 0 and bet <= self.get_money()
 
     def new_hand(self, bet=None):
         """Add a new hand to the participant and the bet for it.
            :param bet: The bet is optional, the dealer doesn't need to bet"""
-        hand = Hand(bet)
+        hand = Hand(bet, backend=self.backend, rules=self.rules)
         self.hands.append(hand)
         if not self.active_hand:
             self.active_hand = hand
@@ -103,6 +120,14 @@ class Participant(object):
 
 class Player(Participant):
 
+    def __init__(self, name, money, renderer=None, strategy=None, betting=None,
+                 backend=None, rules=None):
+        """ :param strategy (optional): who chooses the actions, the user by default.
+            :param betting (optional): who chooses the bets, the user by default."""
+        super(Player, self).__init__(name, money, renderer, backend, rules)
+        self.strategy = strategy or InputStrategy()
+        self.betting = betting or InputBetting()
+
     def allowed_actions(self):
         hand = self.get_active_hand()
         actions = [self.hit, self.stand]
@@ -118,8 +143,7 @@ class Player(Participant):
         return False
 
     def turn(self, game):
-        self.renderer.render_options(self)
-        option = int(input(""))
+        option = self.strategy.choose(self, game)
         actions = self.allowed_actions()
         actions[option](game)
 
@@ -131,17 +155,21 @@ class Player(Participant):
     def is_bankrupt(self):
         return self.money == 0
 
-    def win_bet(self, hand = None):
+    def win_bet(self, hand = None, payout = None):
+        """:param payout (optional): what every chip bet gets back, the
+                one of the rules for a winning hand by default."""
+        if payout is None:
+            payout = self.rules.payout
         hands = [hand] if hand else self.hands
         for h in hands:
-            self.add_money(h.bet*2)
+            self.add_money(h.bet*payout)
             h.reset_bet()
 
 class Dealer(Participant):
 
     def turn(self, game):
-        self.get_active_hand().reveal()
-        if self.get_score() < settings.DEALER_MIN_SCORE:
+        self.get_active_hand().reveal(game)
+        if self.get_score() < game.rules.dealer_min_score:
             self.hit(game)
         else:
             self.stand(game)
@@ -149,20 +177,30 @@ class Dealer(Participant):
     def allowed_actions(self):
         return [self.hit, self.stand]
 
+    def upcard(self):
+        """The card everybody can see"""
+        return self.get_active_hand().cards[0]
+
     def hit(self, game):
         hand = self.get_active_hand()
-        added_card = hand.hit(game)
-
-        if hand.get_len() == 2:
-            added_card.hidden = True
+        #the second card is the hole card
+        hand.hit(game, hand.get_len() == 1)
 
 class Hand(object):
+    """The cards of a hand are kept encoded, see cards.py.
+        The score is kept up to date as the cards come and go: the hard
+        total counts the aces as 1 and any of them can be soft."""
 
-    def __init__(self, bet=0, renderer=None):
+    def __init__(self, bet=0, renderer=None, backend=None, rules=None):
+        """:param rules (optional): the Ruleset it's scored with."""
+        self.rules = rules or DEFAULT_RULES
         self.cards = []
+        self.hard = 0
+        self.aces = 0
         self._bet = bet
         self.status = None
-        self.renderer = renderer or HandTextRender()
+        self.backend = backend or DEFAULT_BACKEND
+        self.renderer = renderer or self.backend.hand()
 
     def is_stand(self):
         return self.status == STAND
@@ -172,29 +210,58 @@ class Hand(object):
 
     def add_card(self, card):
         self.cards.append(card)
-
-    def reveal(self):
-        for card in self.cards:
-            card.hidden = False
+        self.hard += self.rules.hard_values[card]
+        self.aces += self.rules.aces[card]
+
+    def set_backend(self, backend):
+        self.backend = backend
+        self.renderer = backend.hand()
+
+    def get_cards(self):
+        return [FACES[card] for card in self.cards]
+
+    def hide(self, index):
+        card = self.cards[index]
+        self.hard -= self.rules.hard_values[card]
+        self.aces -= self.rules.aces[card]
+        self.cards[index] = cards.hide(card)
+
+    def reveal(self, game=None):
+        """:param game (optional): it's told about every card revealed"""
+        for index, card in enumerate(self.cards):
+            if cards.is_hidden(card):
+                card = cards.reveal(card)
+                self.cards[index] = card
+                self.hard += self.rules.hard_values[card]
+                self.aces += self.rules.aces[card]
+                if game:
+                    game.notify(settings.EVENT_REVEAL, self, card)
 
     def split(self, game):
         card = self.cards.pop()
+        self.hard -= self.rules.hard_values[card]
+        self.aces -= self.rules.aces[card]
         self._bet /= 2
-        hand = Hand(self._bet)
+        hand = Hand(self._bet, backend=self.backend, rules=self.rules)
         hand.add_card(card)
+        game.notify(settings.EVENT_SPLIT, self, hand)
         return hand
 
     def stand(self, game):
         self.status = STAND
+        game.notify(settings.EVENT_STAND, self)
 
     def can_do_split(self):
         return (len(self.cards) == 2 and \
-                all([card.value >= settings.MIN_CARD_TO_SPLIT for card in self.cards]))
+                all([self.rules.splittable[card] for card in self.cards]))
 
-    def hit(self, game):
+    def hit(self, game, hidden=False):
         card = game.get_card()
+        if hidden:
+            card = cards.hide(card)
         self.add_card(card)
         self.status = HITTING
+        game.notify(settings.EVENT_HIT, self, card)
         return card
 
     @property
@@ -207,5 +274,18 @@ class Hand(object):
     def get_len(self):
         return len(self.cards)
 
+    def is_soft(self):
+        """Whether an ace is counted as soft"""
+        return self.aces > 0 and self.hard <= self.rules.soft_limit
+
+    def is_blackjack(self):
+        return self.get_score() == self.rules.blackjack and \
+            len(self.cards) == self.rules.cards_for_blackjack
+
+    def is_busted(self):
+        return self.get_score() > self.rules.blackjack
+
     def get_score(self):
-        return sum([card.value for card in self.cards])
+        if self.aces and self.hard <= self.rules.soft_limit:
+            return self.hard + self.rules.soft_bonus
+        return self.hard
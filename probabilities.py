@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Exact probabilities of the dealer's final total.
+
+The dealer starts with the upcard, draws the hole card and keeps hitting
+while the score is under the minimum, so every possible sequence of cards
+left in the shoe is followed. Compositions are tuples with the number of
+cards of each value, see cards.composition."""
+from cards import SOFT_BONUS, VALUE_RANKS
+from rules import DEFAULT_RULES
+
+BUST = "bust"
+
+def shoe_composition(decks=1):
+    """The composition of a full shoe"""
+    return (4 * decks,) * (VALUE_RANKS - 1) + (16 * decks,)
+
+class DealerTable(object):
+    """ It calculates the distribution of the dealer's final total for an
+        upcard and the cards left in the shoe. The results are kept by
+        (upcard, composition, rules), so asking the same table twice
+        costs nothing."""
+
+    def __init__(self, min_score=None, blackjack=None, cache=None, rules=None):
+        """:param min_score: the dealer stands on it, by default the one in the rules.
+           :param blackjack: the score that busts over it.
+           :param cache (optional): where everything calculated is kept
+                instead, like a calculator.LRUCache to bound it.
+           :param rules (optional): the Ruleset, see rules.py, the one in
+                settings by default."""
+        rules = rules or DEFAULT_RULES
+        self.min_score = rules.dealer_min_score if min_score is None else min_score
+        self.blackjack = rules.blackjack if blackjack is None else blackjack
+        #what tells its results apart from the ones of other rules
+        self.key = (self.min_score, self.blackjack)
+        self._memo = {}
+        self._results = {}
+        if cache is not None:
+            #both are kept by the rules too, so tables with other rules
+            #can share it, and their keys are of different lengths
+            self._memo = self._results = cache
+
+    def final_totals(self, upcard, composition):
+        """It returns a dict with the probability of every final total
+           and of busting, under BUST.
+            :param upcard: the value of the upcard, 1 for an ace.
+            :param composition: the cards the hole card and the hits come
+                from, the upcard isn't in it. There must be enough of them
+                for the dealer to finish."""
+        key = (upcard, composition, self.key)
+        totals = self._results.get(key)
+        if totals is None:
+            probabilities = self._play(upcard, upcard == 1, composition)
+            totals = dict(zip(self._outcomes(), probabilities))
+            self._results[key] = totals
+        return totals
+
+    def bust(self, upcard, composition):
+        return self.final_totals(upcard, composition)[BUST]
+
+    def _outcomes(self):
+        return range(min(self.min_score, self.blackjack + 1), self.blackjack + 1) + [BUST]
+
+    def _play(self, hard, soft, composition):
+        """The probabilities, in the order of _outcomes, of finishing from
+           a hand with that hard total and maybe an ace."""
+        key = (hard, soft, composition, self.key)
+        probabilities = self._memo.get(key)
+        if probabilities is not None:
+            return probabilities
+
+        outcomes = self._outcomes()
+        score = hard
+        if soft and hard + SOFT_BONUS <= self.blackjack:
+            score += SOFT_BONUS
+        probabilities = [0.0] * len(outcomes)
+        if score > self.blackjack:
+            probabilities[-1] = 1.0
+        elif score >= self.min_score:
+            probabilities[outcomes.index(score)] = 1.0
+        else:
+            left = float(sum(composition))
+            counts = list(composition)
+            for index, count in enumerate(composition):
+                if not count:
+                    continue
+                counts[index] -= 1
+                value = index + 1
+                drawn = self._play(hard + value, soft or value == 1, tuple(counts))
+                counts[index] += 1
+                for outcome, probability in enumerate(drawn):
+                    probabilities[outcome] += count / left * probability
+        probabilities = tuple(probabilities)
+        self._memo[key] = probabilities
+        return probabilities
+
+    def clear(self):
+        """Forget everything calculated so far, by every table sharing
+           the cache if there's one"""
+        self._memo.clear()
+        self._results.clear()
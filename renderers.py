@@ -1,15 +1,36 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import sys
 import settings
+from StringIO import StringIO
 
 class Render(object):
 
     def render(self):
         raise NotImplementedError
 
+class NullRender(Render):
+    """It doesn't render anything, for games nobody is watching."""
+
+    def render(self, *args):
+        pass
+
+    def render_active_hand(self, *args):
+        pass
+
+    def render_options(self, *args):
+        pass
+
+NULL_RENDER = NullRender()
+
 class TextRender(Render):
 
+    def __init__(self, out=None):
+        """:param out (optional): the stream to write to, the standard
+                output by default."""
+        self.out = out
+
     def render(self):
         pass
 
@@ -18,40 +39,50 @@ class CardTextRender(TextRender):
     def render(self, card):
         """This method should render the card representation."""
         if card.hidden:
-            print "     [X] - hidden"
+            print >>self.out, "     [X] - hidden"
         else:
-            print "     %s - %s" % (card.representation, card.suit)
+            print >>self.out, "     %s - %s" % (card.representation, card.suit)
 
 class DeckTextRender(TextRender):
 
+    def __init__(self, out=None, card=None):
+        """:param card (optional): the renderer of the cards."""
+        super(DeckTextRender, self).__init__(out)
+        self.card = card or CardTextRender(out)
+
     def render(self, deck):
         """This method should render the card representation."""
-        for card in deck.deck:
-            print card.render()
+        for card in deck.get_cards():
+            self.card.render(card)
 
 class ParticipantTextRender(TextRender):
 
     def render(self, player):
         """This method should render the participant representation."""
         hand = player.get_active_hand()
-        print "%s cards:" % player.name
+        print >>self.out, "%s cards:" % player.name
         hand.render()
-        print "Score %s" % player.get_score()
+        print >>self.out, "Score %s" % player.get_score()
 
     def render_active_hand(self, player):
-        print "Hand: %d" % player.hands.index(player.get_active_hand())
+        print >>self.out, "Hand: %d" % player.hands.index(player.get_active_hand())
 
     def render_options(self, player):
-        print "What do you want to do?"
+        print >>self.out, "What do you want to do?"
         for i, action in enumerate(player.allowed_actions()):
-            print " %d - %s" % (i, action.im_func.__name__)
+            print >>self.out, " %d - %s" % (i, action.im_func.__name__)
 
 class HandTextRender(TextRender):
 
+    def __init__(self, out=None, card=None):
+        """:param card (optional): the renderer of the cards."""
+        super(HandTextRender, self).__init__(out)
+        self.card = card or CardTextRender(out)
+
     def render(self, hand):
         """This method should render the hand representation."""
-        for card in hand.cards:
-            card.render()
+        for card in hand.get_cards():
+            self.card.render(card)
 
 class GameTextRender(TextRender):
 
@@ -83,24 +114,91 @@ class GameTextRender(TextRender):
         busted = game.dealer
         if game.winner == game.dealer:
             busted = game.current_player
-        print "-" * 30
-        print "Sorry %s you're Busted!\n" % (busted)
+        print >>self.out, "-" * 30
+        print >>self.out, "Sorry %s you're Busted!\n" % (busted)
         busted.render()
-        print "-" * 30
+        print >>self.out, "-" * 30
 
     def render_blackjack(self, game):
-        print "-" * 30
-        print "Blackjack for %s!!\n" % (game.winner)
+        print >>self.out, "-" * 30
+        print >>self.out, "Blackjack for %s!!\n" % (game.winner)
         game.winner.render()
-        print "-" * 30
+        print >>self.out, "-" * 30
 
     def render_turn(self, player):
-        print "=" * 30
-        print " %s is playing" % player.name
-        print "=" * 30
+        print >>self.out, "=" * 30
+        print >>self.out, " %s is playing" % player.name
+        print >>self.out, "=" * 30
 
     def render_winner(self, player):
-        print "-" * 30
-        print "Winner => %s\n" % (player)
+        print >>self.out, "-" * 30
+        print >>self.out, "Winner => %s\n" % (player)
         player.render()
-        print "-" * 30
+        print >>self.out, "-" * 30
+
+class TextBackend(object):
+    """It has the text renderers of everything in a game, all of them
+       writing to the same stream. Renderers don't keep anything of what
+       they render, so there's one of each kind for everything."""
+
+    def __init__(self, out=None):
+        """:param out (optional): the stream, the standard output by default."""
+        self.out = out
+        self._card = CardTextRender(out)
+        self._game = GameTextRender(out)
+        self._participant = ParticipantTextRender(out)
+        self._hand = HandTextRender(out, self._card)
+        self._deck = DeckTextRender(out, self._card)
+
+    def game(self):
+        return self._game
+
+    def participant(self):
+        return self._participant
+
+    def hand(self):
+        return self._hand
+
+    def card(self):
+        return self._card
+
+    def deck(self):
+        return self._deck
+
+    def flush(self):
+        """A round is over"""
+        pass
+
+class BufferedBackend(TextBackend):
+    """The text of a round is kept in memory and written at once when
+       the round is over."""
+
+    def __init__(self, stream=None):
+        """:param stream (optional): where the rounds are written, the
+                standard output by default."""
+        super(BufferedBackend, self).__init__(StringIO())
+        self.stream = stream
+
+    def flush(self):
+        text = self.out.getvalue()
+        if not text:
+            return
+        stream = self.stream or sys.stdout
+        if isinstance(text, unicode):
+            text = text.encode(getattr(stream, "encoding", None) or "utf-8")
+        stream.write(text)
+        self.out.seek(0)
+        self.out.truncate()
+
+class NullBackend(object):
+    """Nothing is rendered at all"""
+
+    def game(self):
+        return NULL_RENDER
+
+    participant = hand = card = deck = game
+
+    def flush(self):
+        pass
+
+DEFAULT_BACKEND = TextBackend()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""The outcome of every seat in every round, stored by columns.
+
+Every column is a file of fixed size numbers in a directory, next to a
+columns.json with their types and how many rows there are. The files grow
+a chunk at a time and they're written and read as memory maps, so a
+reader gets numpy arrays straight from the files without building any
+Python object per row:
+
+    simulation.game.observers.append(ResultsWriter(directory))
+    ...
+    results = Results(directory)
+    results["payout"][results["upcard"] >> 2 == 0].mean()
+
+The columns of a row are:
+
+ - round: the number of the round, the first one is 0.
+ - seat: the position of the player at the table.
+ - first, second: the first two cards of the player, see cards.py.
+ - upcard: the card of the dealer everybody sees.
+ - actions: a bit, 1 << settings.OPTION_*, for every option played.
+ - payout: the chips the player won or lost in the round, a float, as a
+   blackjack paying 3:2 can win half a chip.
+
+Usage:
+    python results.py directory [rounds] [players] [decks]
+"""
+import os
+import sys
+import json
+from array import array
+import numpy
+import settings
+from game import Observer
+
+#the name, the type in the files and the type of the array it's kept in
+#until it's written
+COLUMNS = (("round", "<u8", "L"),
+           ("seat", "u1", "B"),
+           ("first", "u1", "B"),
+           ("second", "u1", "B"),
+           ("upcard", "u1", "B"),
+           ("actions", "u1", "B"),
+           ("payout", "<f8", "d"))
+META = "columns.json"
+CHUNK = 1 << 20
+BATCH = 10000
+
+def column_path(directory, name):
+    return os.path.join(directory, name + ".bin")
+
+def read_meta(directory):
+    with open(os.path.join(directory, META)) as meta:
+        return json.load(meta)
+
+class Row(object):
+    """What happened to a seat in the round being played"""
+
+    def __init__(self, seat, money):
+        self.seat = seat
+        self.money = money
+        self.cards = []
+        self.actions = 0
+        self.splitting = False
+
+class ResultsWriter(Observer):
+    """It appends a row for every seat that plays a round. Rows are kept
+       in memory by batches and the files grow by chunks of rows."""
+
+    def __init__(self, directory, chunk=CHUNK, batch=BATCH):
+        """:param directory: where the columns are, the rows are appended
+                to the ones already there.
+           :param chunk: rows the files grow by when they're full.
+           :param batch: rows kept in memory before writing them."""
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+        self.chunk = chunk
+        self.batch = batch
+        self.length = 0
+        self.round = -1
+        if os.path.exists(os.path.join(directory, META)):
+            meta = read_meta(directory)
+            if [tuple(column) for column in meta["columns"]] != \
+                    [(name, dtype) for name, dtype, _ in COLUMNS]:
+                raise ValueError("The columns in %s aren't the ones written now" % directory)
+            self.length = meta["length"]
+            self.round = meta["rounds"] - 1
+        self.buffers = dict((name, array(code)) for name, _, code in COLUMNS)
+        self.capacity = 0
+        self.columns = {}
+        self._grow(self.length)
+        self.rows = {}
+        self.hands = {}
+        self.upcard = 0
+
+    def _grow(self, capacity):
+        """Every file has room for at least capacity rows"""
+        capacity = -(-capacity // self.chunk) * self.chunk
+        if capacity <= self.capacity and self.columns:
+            return
+        capacity = max(capacity, self.chunk)
+        for name, dtype, _ in COLUMNS:
+            column = self.columns.pop(name, None)
+            if column is not None:
+                column.flush()
+                del column
+            path = column_path(self.directory, name)
+            with open(path, "ab") as column_file:
+                column_file.truncate(capacity * numpy.dtype(dtype).itemsize)
+            self.columns[name] = numpy.memmap(path, dtype, "r+", shape=(capacity,))
+        self.capacity = capacity
+
+    def append(self, round, seat, first, second, upcard, actions, payout):
+        for name, value in zip([name for name, _, _ in COLUMNS],
+                               (round, seat, first, second, upcard, actions, payout)):
+            self.buffers[name].append(value)
+        if len(self.buffers["round"]) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        """The rows in memory are written to the files"""
+        rows = len(self.buffers["round"])
+        if rows:
+            self._grow(self.length + rows)
+            for name, dtype, code in COLUMNS:
+                buffer = self.buffers[name]
+                self.columns[name][self.length:self.length + rows] = \
+                    numpy.frombuffer(buffer, numpy.dtype(code))
+                self.buffers[name] = array(code)
+            self.length += rows
+        for column in self.columns.values():
+            column.flush()
+        self._write_meta()
+
+    def _write_meta(self):
+        meta = {"length": self.length, "rounds": self.round + 1,
+                "columns": [[name, dtype] for name, dtype, _ in COLUMNS]}
+        with open(os.path.join(self.directory, META), "w") as meta_file:
+            json.dump(meta, meta_file)
+
+    def close(self):
+        """The files are cut down to the rows written"""
+        self.flush()
+        self.columns.clear()
+        for name, dtype, _ in COLUMNS:
+            with open(column_path(self.directory, name), "ab") as column_file:
+                column_file.truncate(self.length * numpy.dtype(dtype).itemsize)
+        self.capacity = 0
+
+    def event(self, game, event, hand, value):
+        if event == settings.EVENT_HIT:
+            row = self.rows.get(self.hands.get(id(hand)))
+            if row is not None:
+                if len(row.cards) < 2:
+                    row.cards.append(value)
+                elif row.splitting:
+                    #the card for the first hand of a split
+                    row.splitting = False
+                else:
+                    row.actions |= 1 << settings.OPTION_HIT
+            elif hand in game.dealer.hands and len(hand.cards) == 1:
+                self.upcard = value
+        elif event == settings.EVENT_STAND:
+            row = self.rows.get(self.hands.get(id(hand)))
+            if row is not None:
+                row.actions |= 1 << settings.OPTION_STAND
+        elif event == settings.EVENT_SPLIT:
+            seat = self.hands[id(hand)]
+            self.hands[id(value)] = seat
+            self.rows[seat].actions |= 1 << settings.OPTION_SPLIT
+            self.rows[seat].splitting = True
+        elif event == settings.EVENT_BET:
+            seat = [i for i, player in enumerate(game.players) if hand in player.hands][0]
+            self.hands[id(hand)] = seat
+            self.rows[seat] = Row(seat, game.players[seat].get_money() + value)
+        elif event == settings.EVENT_ROUND:
+            self.round += 1
+            self.rows.clear()
+            self.hands.clear()
+            self.upcard = 0
+        elif event == settings.EVENT_ROUND_OVER:
+            for seat in sorted(self.rows):
+                row = self.rows[seat]
+                cards = row.cards + [0] * (2 - len(row.cards))
+                self.append(self.round, seat, cards[0], cards[1], self.upcard,
+                            row.actions, game.players[seat].get_money() - row.money)
+
+class Results(object):
+    """The columns written by a ResultsWriter, as read only numpy arrays
+       mapped to the files."""
+
+    def __init__(self, directory):
+        meta = read_meta(directory)
+        self.length = meta["length"]
+        self.rounds = meta["rounds"]
+        self.columns = {}
+        for name, dtype in meta["columns"]:
+            if self.length:
+                self.columns[name] = numpy.memmap(column_path(directory, name), dtype,
+                                                  "r", shape=(self.length,))
+            else:
+                self.columns[name] = numpy.zeros(0, dtype)
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.length
+
+    def names(self):
+        return [name for name, _, _ in COLUMNS if name in self.columns]
+
+if __name__ == '__main__':
+    from simulation import Simulation
+    directory = sys.argv[1]
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    players = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    decks = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    simulation = Simulation.create(players, decks=decks)
+    writer = ResultsWriter(directory)
+    simulation.game.observers.append(writer)
+    simulation.run(rounds)
+    writer.close()
+    results = Results(directory)
+    print "%d rows of %d rounds in %s" % (len(results), results.rounds, directory)
+    print "Mean payout: %.4f" % results["payout"].mean()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""The rules of a table.
+
+A Ruleset is compiled once, from settings and whatever is overridden,
+into the numbers and tables the game looks up all the time. It can't be
+changed, so a game can keep using it safely and tables with different
+rules can play in the same process:
+
+    game = Shoe(players, rules=Ruleset(dealer_min_score=18))
+"""
+from array import array
+import settings
+from cards import RANKS, DECK_SIZE, HIDDEN, rank_of
+
+#what a Ruleset is made of, the rest is compiled from them
+RULES = ("dealer_min_score", "blackjack", "cards_for_blackjack", "min_card_to_split",
+         "payout", "blackjack_payout")
+
+class Ruleset(object):
+    """ The rules of a game and what comes out of them. The tables are
+        indexed by card code, see cards.py, hidden cards are worth 0."""
+
+    __slots__ = ("dealer_min_score", "blackjack", "cards_for_blackjack",
+                 "min_card_to_split", "payout", "blackjack_payout",
+                 "values", "hard_values", "aces", "soft_bonus", "soft_limit",
+                 "rank_values", "splittable")
+
+    def __init__(self, dealer_min_score=None, blackjack=None, cards_for_blackjack=None,
+                 min_card_to_split=None, payout=2, blackjack_payout=2):
+        """Every rule left out is the one in settings. The cards are worth
+            what settings.DECK_CONF says, the solver, the counts and the
+            rest of the tables can't take other values.
+            :param payout: what a winning hand gets back per chip bet.
+            :param blackjack_payout: the same for a blackjack."""
+        set_rule = super(Ruleset, self).__setattr__
+        def rule(value, default):
+            return default if value is None else value
+        set_rule("dealer_min_score", rule(dealer_min_score, settings.DEALER_MIN_SCORE))
+        set_rule("blackjack", rule(blackjack, settings.BLACKJACK))
+        set_rule("cards_for_blackjack", rule(cards_for_blackjack, settings.CARDS_FOR_BLACKJACK))
+        set_rule("min_card_to_split", rule(min_card_to_split, settings.MIN_CARD_TO_SPLIT))
+        set_rule("payout", payout)
+        set_rule("blackjack_payout", blackjack_payout)
+
+        card_values = settings.DECK_CONF['cards']
+        rank_values = array('B', [card_values[rank] for rank in RANKS])
+        values = array('B', [0] * (HIDDEN << 1))
+        aces = array('B', [0] * (HIDDEN << 1))
+        for code in range(DECK_SIZE):
+            values[code] = rank_values[rank_of(code)]
+            aces[code] = RANKS[rank_of(code)] == "A"
+        soft_bonus = card_values["A"] - 1
+        set_rule("rank_values", rank_values)
+        set_rule("values", values)
+        set_rule("aces", aces)
+        set_rule("soft_bonus", soft_bonus)
+        set_rule("hard_values", array('B', [value - soft_bonus * ace
+                                            for value, ace in zip(values, aces)]))
+        #an ace can be soft while the hard total is up to it
+        set_rule("soft_limit", self.blackjack - soft_bonus)
+        set_rule("splittable", array('B', [value >= self.min_card_to_split and value > 0
+                                           for value in values]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("A ruleset can't be changed")
+
+    def rules(self):
+        """The rules it was made with, by name"""
+        return dict((name, getattr(self, name)) for name in RULES)
+
+    def replace(self, **rules):
+        """A new ruleset with these rules changed"""
+        current = self.rules()
+        current.update(rules)
+        return Ruleset(**current)
+
+    def __reduce__(self):
+        #it can't be unpickled attribute by attribute, it's compiled again
+        return (_compile, (self.rules(),))
+
+    def key(self):
+        """The rules themselves, to tell rulesets apart"""
+        return (self.dealer_min_score, self.blackjack, self.cards_for_blackjack,
+                self.min_card_to_split, self.payout, self.blackjack_payout)
+
+    def __eq__(self, other):
+        return isinstance(other, Ruleset) and self.key() == other.key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return ("Ruleset(dealer_min_score=%d, blackjack=%d, min_card_to_split=%d, "
+                "payout=%r, blackjack_payout=%r)" % (
+                    self.dealer_min_score, self.blackjack, self.min_card_to_split,
+                    self.payout, self.blackjack_payout))
+
+def _compile(rules):
+    return Ruleset(**rules)
+
+#the rules in settings, compiled when this is first imported
+DEFAULT_RULES = Ruleset()
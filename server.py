@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Many tables in one process, played over TCP.
+
+Every table plays its rounds in its own thread and every connection has
+its own thread too, so a slow client only keeps its own table waiting,
+and not longer than the timeout: then it stands or bets the minimum.
+
+The protocol is a line of text each way. The server sends:
+
+    WELCOME <table> <seat> <chips>
+    BET <chips>                           -> answer with the bet
+    TURN <cards> <score> <upcard> <options>   -> answer with an option,
+                                             by name or by number
+    DEALER <cards> <score>
+    RESULT <net> <chips>
+    BYE <reason>
+
+Cards are written as the rank and the first letter of the suit, joined
+by commas, e.g. "KH,7C". Options are joined by commas too.
+
+Usage:
+    python server.py [port] [seats per table]
+"""
+import sys
+import Queue
+import socket
+import threading
+import SocketServer
+import settings
+from cards import RANKS, SUITS, rank_of, suit_of, is_hidden
+from game import Shoe
+from participants import Player
+from renderers import NullBackend
+from strategies import Strategy, Betting
+
+SEATS = 7
+TIMEOUT = 30
+MIN_BET = 1
+
+def format_cards(codes):
+    return ",".join("X" if is_hidden(code) else
+                    RANKS[rank_of(code)] + SUITS[suit_of(code)][0]
+                    for code in codes)
+
+class Seat(object):
+    """A connected player: the server reads its answers and the table
+       waits for them."""
+
+    def __init__(self, connection, timeout=TIMEOUT):
+        self.connection = connection
+        self.timeout = timeout
+        self.answers = Queue.Queue()
+        self.connected = True
+        self.lock = threading.Lock()
+
+    def send(self, *words):
+        line = " ".join(str(word) for word in words) + "\n"
+        with self.lock:
+            try:
+                self.connection.sendall(line)
+            except IOError:
+                self.connected = False
+
+    def ask(self, *words):
+        """It returns the answer, or None if it doesn't come in time"""
+        if not self.connected:
+            return None
+        #a late answer to the last question isn't the answer to this one
+        while True:
+            try:
+                if self.answers.get_nowait() is None:
+                    return None
+            except Queue.Empty:
+                break
+        self.send(*words)
+        try:
+            return self.answers.get(timeout=self.timeout)
+        except Queue.Empty:
+            return None
+
+    def answer(self, line):
+        self.answers.put(line.strip())
+
+    def leave(self):
+        self.connected = False
+        self.answers.put(None)
+
+class RemoteStrategy(Strategy):
+    """It asks the client of the seat, standing if there is no answer"""
+
+    def __init__(self, seat):
+        self.seat = seat
+
+    def choose(self, player, game):
+        hand = player.get_active_hand()
+        names = [action.im_func.__name__ for action in player.allowed_actions()]
+        answer = self.seat.ask("TURN", format_cards(hand.cards), hand.get_score(),
+                               format_cards([game.dealer.upcard()]), ",".join(names))
+        if answer in names:
+            return names.index(answer)
+        if answer and answer.isdigit() and int(answer) < len(names):
+            return int(answer)
+        return settings.OPTION_STAND
+
+class RemoteBetting(Betting):
+    """It asks the client of the seat, betting the minimum if there is
+       no valid answer"""
+
+    def __init__(self, seat):
+        self.seat = seat
+
+    def bet(self, player, game):
+        answer = self.seat.ask("BET", player.get_money())
+        if answer and answer.isdigit() and player.is_valid_bet(int(answer)):
+            return int(answer)
+        return min(MIN_BET, player.get_money())
+
+class Table(threading.Thread):
+    """It plays rounds while there is someone seated"""
+
+    def __init__(self, number, seats=SEATS, decks=settings.SHOE_DECKS):
+        super(Table, self).__init__(name="Table %d" % number)
+        self.daemon = True
+        self.number = number
+        self.seats = seats
+        self.game = Shoe([], decks, backend=NullBackend())
+        self.joining = Queue.Queue()
+        self.seated = {}
+        self.reserved = 0
+        self.lock = threading.Lock()
+        self.running = True
+
+    def reserve(self):
+        """It takes a seat if there is a free one"""
+        with self.lock:
+            if self.reserved >= self.seats:
+                return False
+            self.reserved += 1
+            return True
+
+    def join(self, seat, name):
+        """The seat plays from the next round on"""
+        self.joining.put((seat, name))
+
+    def seat_players(self, wait):
+        while True:
+            try:
+                seat, name = self.joining.get(timeout=wait if not self.seated else 0.01)
+            except Queue.Empty:
+                return
+            wait = 0
+            player = Player(name, settings.PLAYER_CHIPS, None, RemoteStrategy(seat),
+                            RemoteBetting(seat), NullBackend())
+            self.seated[player] = seat
+            self.game.players.append(player)
+            seat.send("WELCOME", self.number, len(self.game.players) - 1, player.get_money())
+
+    def unseat(self, player, reason):
+        self.seated.pop(player).send("BYE", reason)
+        self.game.players.remove(player)
+        with self.lock:
+            self.reserved -= 1
+
+    def play_round(self):
+        game = self.game
+        money = dict((player, player.get_money()) for player in game.players)
+        game.init_game()
+        seated = [player for player in game.players if player.hands]
+        for player in seated:
+            game.set_current_player(player)
+            game.process_hand()
+        dealer = game.dealer.get_active_hand()
+        for player in seated:
+            seat = self.seated[player]
+            seat.send("DEALER", format_cards(dealer.cards), dealer.get_score())
+            seat.send("RESULT", player.get_money() - money[player], player.get_money())
+        game.finish_round()
+
+    def run(self):
+        while self.running:
+            self.seat_players(wait=0.1)
+            for player, seat in self.seated.items():
+                if not seat.connected:
+                    self.unseat(player, "disconnected")
+                elif player.is_bankrupt():
+                    self.unseat(player, "bankrupt")
+            if self.game.players:
+                self.play_round()
+
+    def stop(self):
+        self.running = False
+
+class Handler(SocketServer.StreamRequestHandler):
+
+    def handle(self):
+        seat = Seat(self.connection, self.server.timeout)
+        name = "Player %s:%s" % self.client_address
+        self.server.sit(seat, name)
+        try:
+            for line in self.rfile:
+                seat.answer(line)
+        except socket.error:
+            #the client went away without closing the connection
+            pass
+        finally:
+            seat.leave()
+
+class Server(SocketServer.ThreadingTCPServer):
+    """It hosts the tables, opening a new one when the others are full"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, seats=SEATS, timeout=TIMEOUT):
+        SocketServer.ThreadingTCPServer.__init__(self, address, Handler)
+        self.seats = seats
+        self.timeout = timeout
+        self.tables = []
+        self.lock = threading.Lock()
+
+    def sit(self, seat, name):
+        with self.lock:
+            table = None
+            for candidate in self.tables:
+                if candidate.reserve():
+                    table = candidate
+                    break
+            if table is None:
+                table = Table(len(self.tables), self.seats)
+                table.reserve()
+                self.tables.append(table)
+                table.start()
+        table.join(seat, name)
+        return table
+
+    def server_close(self):
+        for table in self.tables:
+            table.stop()
+        SocketServer.ThreadingTCPServer.server_close(self)
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8021
+    seats = int(sys.argv[2]) if len(sys.argv) > 2 else SEATS
+    server = Server(("127.0.0.1", port), seats)
+    print "Serving blackjack tables on port %d" % port
+    server.serve_forever()
@@ -5,6 +5,9 @@ CARDS_FOR_BLACKJACK = 2
 MIN_CARD_TO_SPLIT = 10
 PLAYER_CHIPS = 100
 DEALER_CHIPS = 100000
+SHOE_DECKS = 6
+#fraction of the shoe dealt before the cut card comes out
+SHOE_PENETRATION = 0.75
 #key is the representation and value is the real value
 DECK_CONF = {
         "cards" : {
@@ -37,3 +40,18 @@ STATE_ACTIVE_HAND = 3
 STATE_NEXT_TURN = 4
 STATE_PLAYER_TURN = 5
 STATE_DEALER_TURN = 6
+
+#options of Player.allowed_actions
+OPTION_HIT = 0
+OPTION_STAND = 1
+OPTION_SPLIT = 2
+
+#events the observers of a game are told about
+EVENT_ROUND = 0
+EVENT_BET = 1
+EVENT_HIT = 2
+EVENT_STAND = 3
+EVENT_SPLIT = 4
+EVENT_ROUND_OVER = 5
+EVENT_SHUFFLE = 6
+EVENT_REVEAL = 7
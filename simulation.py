@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Headless games: rounds are played by strategies and nothing is rendered,
+so they run as fast as the game logic allows.
+
+Usage:
+    python simulation.py [rounds] [players] [decks]
+"""
+import sys
+import math
+import time
+import settings
+from game import SingleDeck, Shoe, ContinuousShoe, Observer
+from participants import Player
+from renderers import NullBackend
+from strategies import StandOnStrategy, FlatBetting
+
+DEFAULT_BET = 10
+
+class Statistics(Observer):
+    """What happened to the hands played. It observes the game to count
+       the blackjacks and busts, the rest comes from the chips won or
+       lost by each player in every round.
+       Nothing is kept per hand: the mean and the variance of the net
+       result are updated hand by hand (Welford), and so is the drawdown
+       of the bankroll of all the players together."""
+
+    FIELDS = ("hands", "wins", "losses", "pushes", "net", "blackjacks", "busts")
+    #the sum of the squared differences to the mean, the highest and the
+    #lowest net so far and the biggest fall from a high
+    MOMENTS = ("mean", "m2", "peak", "trough", "drawdown")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.peak = 0
+        self.trough = 0
+        self.drawdown = 0
+
+    def update(self, game):
+        if game.state == settings.STATE_BLACKJACK and game.winner != game.dealer:
+            self.blackjacks += 1
+        elif game.state == settings.STATE_BUSTED and game.winner == game.dealer:
+            self.busts += 1
+
+    def settle(self, net):
+        """A player won or lost net chips in a round"""
+        self.hands += 1
+        self.net += net
+        if net > 0:
+            self.wins += 1
+        elif net < 0:
+            self.losses += 1
+        else:
+            self.pushes += 1
+        delta = net - self.mean
+        self.mean += delta / self.hands
+        self.m2 += delta * (net - self.mean)
+        self.peak = max(self.peak, self.net)
+        self.trough = min(self.trough, self.net)
+        self.drawdown = max(self.drawdown, self.peak - self.net)
+
+    def merge(self, other):
+        """The hands of the other ones are played after these"""
+        hands = self.hands + other.hands
+        if hands:
+            delta = other.mean - self.mean
+            self.mean += delta * other.hands / hands
+            self.m2 += other.m2 + delta * delta * self.hands * other.hands / hands
+        self.drawdown = max(self.drawdown, other.drawdown,
+                            self.peak - (self.net + other.trough))
+        self.peak = max(self.peak, self.net + other.peak)
+        self.trough = min(self.trough, self.net + other.trough)
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def variance(self):
+        """The sample variance of the net result of a hand"""
+        if self.hands < 2:
+            return 0.0
+        return self.m2 / (self.hands - 1)
+
+    def confidence_interval(self, z=1.96):
+        """The interval of the mean net result of a hand, 95% by default"""
+        if not self.hands:
+            return (0.0, 0.0)
+        margin = z * math.sqrt(self.variance() / self.hands)
+        return (self.mean - margin, self.mean + margin)
+
+    def frequencies(self):
+        """How often every outcome happens per hand"""
+        hands = float(self.hands or 1)
+        return dict((field, getattr(self, field) / hands)
+                    for field in ("wins", "losses", "pushes", "blackjacks", "busts"))
+
+    def snapshot(self):
+        """Everything known so far, as a dict"""
+        snapshot = self.as_dict()
+        snapshot.update(variance=self.variance(),
+                        confidence_interval=self.confidence_interval(),
+                        frequencies=self.frequencies())
+        return snapshot
+
+    def as_dict(self):
+        return dict((field, getattr(self, field)) for field in self.FIELDS + self.MOMENTS)
+
+    @classmethod
+    def from_dict(cls, values):
+        """The statistics as_dict returned"""
+        stats = cls()
+        for field in cls.FIELDS + cls.MOMENTS:
+            setattr(stats, field, values[field])
+        return stats
+
+    def __eq__(self, other):
+        return isinstance(other, Statistics) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "Statistics(%s, mean=%.4f, drawdown=%d)" % (
+            ", ".join("%s=%d" % (field, getattr(self, field)) for field in self.FIELDS),
+            self.mean, self.drawdown)
+
+class Simulation(object):
+    """It plays rounds of a game without the user.
+        Every player must have a strategy and a betting system that
+        don't need the user."""
+
+    @classmethod
+    def create(cls, players=1, bet=DEFAULT_BET, strategy=None, chips=None,
+               decks=None, rng=None, continuous=False, rules=None, penetration=None):
+        """A game with silent players betting always the same.
+            :param players: number of players.
+            :param bet: the flat bet of every player.
+            :param strategy (optional): by default they play like the dealer.
+            :param chips (optional): the chips to start with.
+            :param decks (optional): the decks of a shoe, by default a
+                single deck shuffled every round.
+            :param rng (optional): the random.Random to shuffle with.
+            :param continuous (optional): the decks are in a continuous
+                shuffling machine instead of a shoe.
+            :param rules (optional): the Ruleset of the table, see rules.py.
+            :param penetration (optional): how much of a shoe is dealt
+                before shuffling it, the one in settings by default."""
+        chips = chips or settings.PLAYER_CHIPS
+        users = [Player("Bot %d" % (i + 1), chips, None,
+                        strategy or StandOnStrategy(), FlatBetting(bet))
+                 for i in range(players)]
+        if continuous:
+            return cls(ContinuousShoe(users, decks or 1, rng=rng, backend=NullBackend(),
+                                      rules=rules))
+        if penetration is None:
+            penetration = settings.SHOE_PENETRATION
+        if decks:
+            return cls(Shoe(users, decks, penetration, rng=rng, backend=NullBackend(),
+                            rules=rules))
+        return cls(SingleDeck(users, rng=rng, backend=NullBackend(), rules=rules))
+
+    def __init__(self, game, rebuy=True):
+        """:param game: it should have a renderer that doesn't print.
+           :param rebuy: bankrupt players get their initial chips back
+                so the game can go on forever."""
+        self.game = game
+        self.rebuy = rebuy
+        self.chips = dict((player, player.get_money()) for player in game.players)
+        self.rounds = 0
+        self.elapsed = 0.0
+        self.stats = Statistics()
+        game.observers.append(self.stats)
+
+    @property
+    def hands(self):
+        return self.stats.hands
+
+    def play_round(self):
+        game = self.game
+        if self.rebuy:
+            for player in game.players:
+                if player.is_bankrupt():
+                    player.add_money(self.chips[player])
+        money = dict((player, player.get_money()) for player in game.players)
+        game.init_game()
+        seated = [player for player in game.players if player.hands]
+        for player in seated:
+            game.set_current_player(player)
+            game.process_hand()
+        for player in seated:
+            self.stats.settle(player.get_money() - money[player])
+        game.finish_round()
+        self.rounds += 1
+
+    def run(self, rounds):
+        """Play the rounds, or until every player is bankrupt when
+           they can't rebuy."""
+        start = time.time()
+        for _ in xrange(rounds):
+            if not self.rebuy and self.game.is_over():
+                break
+            self.play_round()
+        self.elapsed += time.time() - start
+        return self
+
+    def snapshots(self, rounds, every):
+        """Play the rounds like run, yielding Statistics.snapshot every
+           so many rounds and at the end"""
+        for start in xrange(0, rounds, every):
+            played = self.rounds
+            batch = min(every, rounds - start)
+            self.run(batch)
+            yield self.stats.snapshot()
+            if self.rounds - played < batch:
+                #every player is bankrupt
+                break
+
+    def hands_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.hands / self.elapsed
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    decks = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    simulation = Simulation.create(players, decks=decks).run(rounds)
+    print "%d hands in %.2f seconds: %.0f hands/sec" % (
+        simulation.hands, simulation.elapsed, simulation.hands_per_second())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Basic strategy: the option with the best expected value for every hand
+against every upcard, under the rules of this game.
+
+ - A win pays what the payout of the rules says and the ties go to the
+   player.
+ - A split halves the bet between both hands, the first one gets a card
+   right away and the second one is played afterwards. A hand of a split
+   that makes a blackjack with its second card is paid as one.
+
+The cards are drawn from a fixed composition, without taking out the
+ones already in the hands, as usual for a basic strategy. Expected
+values are in units of the initial bet."""
+import settings
+from cards import SOFT_BONUS, VALUE_RANKS, encode, RANKS
+from rules import DEFAULT_RULES
+from probabilities import DealerTable, BUST, shoe_composition
+from strategies import StrategyTable
+
+class Solver(object):
+    """ It works out the expected value of every option by dynamic
+        programming over (hard total, soft, upcard), remembering every
+        hand already solved."""
+
+    def __init__(self, composition=None, dealer=None, rules=None):
+        """:param composition: the cards in the shoe, by default a full
+                shoe of settings.SHOE_DECKS.
+           :param dealer: the DealerTable with the dealer's rules.
+           :param rules (optional): the Ruleset of the game, see rules.py."""
+        self.rules = rules or DEFAULT_RULES
+        self.composition = composition or shoe_composition(settings.SHOE_DECKS)
+        self.dealer = dealer or DealerTable(rules=self.rules)
+        self.blackjack = self.dealer.blackjack
+        #what a win and a blackjack add to the bet, a loss takes it all
+        self.win = self.rules.payout - 1
+        self.blackjack_win = self.rules.blackjack_payout - 1
+        left = float(sum(self.composition))
+        self.draws = [(index + 1, count / left)
+                      for index, count in enumerate(self.composition) if count]
+        self._values = {}
+        self._dealer = {}
+
+    def score(self, hard, soft):
+        if soft and hard + SOFT_BONUS <= self.blackjack:
+            return hard + SOFT_BONUS
+        return hard
+
+    def is_blackjack(self, hard, soft):
+        """Whether a hand of two cards scoring that is a blackjack"""
+        return self.rules.cards_for_blackjack == 2 and self.score(hard, soft) == self.blackjack
+
+    def dealer_totals(self, upcard):
+        totals = self._dealer.get(upcard)
+        if totals is None:
+            composition = list(self.composition)
+            composition[upcard - 1] -= 1
+            totals = self.dealer.final_totals(upcard, tuple(composition))
+            self._dealer[upcard] = totals
+        return totals
+
+    def stand(self, hard, soft, upcard):
+        score = self.score(hard, soft)
+        value = 0.0
+        for total, probability in self.dealer_totals(upcard).iteritems():
+            if total == BUST or total <= score:
+                value += probability * self.win
+            else:
+                value -= probability
+        return value
+
+    def hit(self, hard, soft, upcard, single=False):
+        """:param single (optional): the hand has a single card, the one
+                drawn may make a blackjack."""
+        value = 0.0
+        for card, probability in self.draws:
+            if hard + card > self.blackjack:
+                value -= probability
+            elif single and self.is_blackjack(hard + card, soft or card == 1):
+                value += probability * self.blackjack_win
+            else:
+                value += probability * self.value(hard + card, soft or card == 1, upcard)
+        return value
+
+    def split(self, card, upcard):
+        """Each hand plays half the bet: the first one is hit right away,
+           the second one starts with a single card."""
+        soft = card == 1
+        first = self.hit(card, soft, upcard, True)
+        second = max(self.stand(card, soft, upcard), first)
+        return 0.5 * first + 0.5 * second
+
+    def value(self, hard, soft, upcard):
+        """The expected value of the hand playing the best option"""
+        key = (hard, soft, upcard)
+        value = self._values.get(key)
+        if value is None:
+            value = max(self.stand(hard, soft, upcard), self.hit(hard, soft, upcard))
+            self._values[key] = value
+        return value
+
+    def options(self, hard, soft, upcard, pair=False):
+        """The expected value of every option, by option"""
+        values = {settings.OPTION_HIT: self.hit(hard, soft, upcard),
+                  settings.OPTION_STAND: self.stand(hard, soft, upcard)}
+        if pair:
+            values[settings.OPTION_SPLIT] = self.split(hard / 2, upcard)
+        return values
+
+    def best(self, hard, soft, upcard, pair=False):
+        values = self.options(hard, soft, upcard, pair)
+        return max(sorted(values), key=values.get)
+
+    def solve(self):
+        """It returns the StrategyTable with the best option for everything"""
+        table = StrategyTable()
+        for upcard in range(1, VALUE_RANKS + 1):
+            for hard in range(2, self.blackjack + 1):
+                table.set(table.HARD, hard, upcard, self.best(hard, False, upcard))
+            for hard in range(1, self.blackjack - SOFT_BONUS + 1):
+                table.set(table.SOFT, hard + SOFT_BONUS, upcard,
+                          self.best(hard, True, upcard))
+            for card in range(1, VALUE_RANKS + 1):
+                pair = self.rules.splittable[encode(RANKS[card - 1])]
+                table.set(table.PAIR, card, upcard,
+                          self.best(2 * card, card == 1, upcard, pair))
+        return table
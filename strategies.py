@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Decision makers for the players.
+
+A strategy chooses what a player does on each turn and a betting system
+how much to bet before each round. The default ones ask the user, so
+any other can be plugged to play without anybody typing."""
+import settings
+from array import array
+from cards import HARD_VALUES
+
+class Strategy(object):
+    """Base class for every playing strategy"""
+
+    def choose(self, player, game):
+        """ It must return the option to perform, that is, the index
+            of the action in player.allowed_actions()"""
+        raise NotImplementedError
+
+class InputStrategy(Strategy):
+    """The user chooses the option."""
+
+    def choose(self, player, game):
+        player.renderer.render_options(player)
+        return int(input(""))
+
+class StandOnStrategy(Strategy):
+    """It hits until the score is reached, as the dealer does."""
+
+    def __init__(self, score=None):
+        """:param score: the minimum score to stand on, by default the
+            dealer's one in the rules of the game."""
+        self.score = score
+
+    def choose(self, player, game):
+        score = game.rules.dealer_min_score if self.score is None else self.score
+        if player.get_score() < score:
+            return settings.OPTION_HIT
+        return settings.OPTION_STAND
+
+class StrategyTable(object):
+    """The option to perform for every hand against every upcard, kept
+       in an array of bytes. A hand is looked up by its score in the HARD
+       or the SOFT section or, if it can be split, by the value of its
+       cards in the PAIR section. Upcards go by their hard value."""
+
+    HARD = 0
+    SOFT = 1
+    PAIR = 2
+    SCORES = settings.BLACKJACK + 1
+    UPCARDS = 11
+
+    def __init__(self, options=None):
+        size = 3 * self.SCORES * self.UPCARDS
+        self.options = options or array('B', [settings.OPTION_STAND] * size)
+
+    def index(self, section, score, upcard):
+        return (section * self.SCORES + score) * self.UPCARDS + upcard
+
+    def get(self, section, score, upcard):
+        return self.options[(section * self.SCORES + score) * self.UPCARDS + upcard]
+
+    def set(self, section, score, upcard, option):
+        self.options[self.index(section, score, upcard)] = option
+
+class TableStrategy(Strategy):
+    """It plays what a StrategyTable says."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def choose(self, player, game):
+        hand = player.get_active_hand()
+        upcard = HARD_VALUES[game.dealer.upcard()]
+        if hand.can_do_split():
+            return self.table.get(StrategyTable.PAIR, HARD_VALUES[hand.cards[0]], upcard)
+        section = StrategyTable.SOFT if hand.is_soft() else StrategyTable.HARD
+        return self.table.get(section, hand.get_score(), upcard)
+
+class Betting(object):
+    """Base class for every betting system"""
+
+    def bet(self, player, game):
+        """ It must return how much the player bets in the next round"""
+        raise NotImplementedError
+
+class InputBetting(Betting):
+    """The user chooses the bet."""
+
+    def bet(self, player, game):
+        print "Player %s has %d chips" % (player, player.money)
+        return int(input("How much do you want to bet? \n"))
+
+class FlatBetting(Betting):
+    """It always bets the same, or everything left if it's not enough."""
+
+    def __init__(self, amount):
+        self.amount = amount
+
+    def bet(self, player, game):
+        return min(self.amount, player.get_money())
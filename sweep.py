@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""The house edge and the variance of a grid of rule variants.
+
+Every point of the grid is a table with its own number of decks,
+penetration and Ruleset, see rules.py, and it's simulated headless in a
+pool of processes. All the points play from the same seed.
+
+Finished points are kept in a directory, one json file per point, named
+after everything the result depends on: the rules, the table, the
+strategy, the seed and the rounds. Running a grid again with one more
+value in an axis only simulates the new points:
+
+    sweep = Sweep({"decks": [1, 6], "dealer_min_score": [17, 18]}, 100000)
+    for point, stats in sweep.run():
+        ...
+
+Usage:
+    python sweep.py [rounds] [cache directory] [workers]
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import random
+import hashlib
+import itertools
+import multiprocessing
+import settings
+from parallel import Table
+from rules import Ruleset, RULES
+from simulation import Statistics, DEFAULT_BET
+
+#the axes that aren't rules
+TABLE_AXES = ("decks", "penetration")
+CACHE_DIRECTORY = ".sweep_cache"
+
+def grid(axes):
+    """Every combination of the values of the axes, as dicts, with the
+       last axis by name changing fastest"""
+    names = sorted(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*[axes[name] for name in names])]
+
+def strategy_key(strategy):
+    """What tells a strategy apart from another one: its class and its
+       attributes"""
+    if strategy is None:
+        return None
+    state = (type(strategy).__name__, sorted(vars(strategy).items()))
+    return hashlib.sha1(pickle.dumps(state, 2)).hexdigest()
+
+class Point(object):
+    """A point of the grid and the table it's played on"""
+
+    def __init__(self, values, players=1, bet=DEFAULT_BET, strategy=None):
+        """:param values: a value by axis, decks, penetration or any of
+                the rules in rules.RULES, the rest are the default ones."""
+        unknown = set(values) - set(TABLE_AXES) - set(RULES)
+        if unknown:
+            raise ValueError("Unknown axes: %s" % ", ".join(sorted(unknown)))
+        self.values = values
+        self.decks = values.get("decks", settings.SHOE_DECKS)
+        self.penetration = values.get("penetration", settings.SHOE_PENETRATION)
+        self.rules = Ruleset(**dict((name, value) for name, value in values.items()
+                                    if name in RULES))
+        self.table = Table(players, bet, strategy, self.decks, self.penetration,
+                           self.rules)
+
+    def key(self, seed, rounds):
+        """The name of its result in the cache"""
+        key = {"rules": self.rules.key(), "decks": self.decks,
+               "penetration": self.penetration, "players": self.table.players,
+               "bet": self.table.bet, "strategy": strategy_key(self.table.strategy),
+               "seed": seed, "rounds": rounds}
+        return hashlib.sha1(json.dumps(key, sort_keys=True)).hexdigest()
+
+class ResultCache(object):
+    """The statistics of the points already played, one file each"""
+
+    def __init__(self, directory=CACHE_DIRECTORY):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self.directory = directory
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        try:
+            with open(self.path(key)) as result:
+                return Statistics.from_dict(json.load(result)["stats"])
+        except (IOError, ValueError, KeyError):
+            return None
+
+    def put(self, key, values, stats):
+        #written aside and renamed, so a sweep killed halfway never
+        #leaves a broken file
+        path = self.path(key)
+        with open(path + ".tmp", "w") as result:
+            json.dump({"values": values, "stats": stats.as_dict()}, result,
+                      sort_keys=True)
+        os.rename(path + ".tmp", path)
+
+def _run_point(job):
+    index, table, rounds, seed = job
+    simulation = table(random.Random(seed)).run(rounds)
+    return index, simulation.stats
+
+class Sweep(object):
+    """It plays every point of a grid that isn't in the cache yet."""
+
+    def __init__(self, axes, rounds, players=1, bet=DEFAULT_BET, strategy=None,
+                 seed=0, workers=None, cache=None):
+        """:param axes: the values of every axis, by name, see Point.
+           :param rounds: the rounds played at every point.
+           :param strategy (optional): it must be picklable, by default the
+                players play like the dealer.
+           :param workers: number of processes, by default one per cpu.
+           :param cache (optional): the ResultCache, by default the one in
+                CACHE_DIRECTORY."""
+        self.points = [Point(values, players, bet, strategy) for values in grid(axes)]
+        self.rounds = rounds
+        self.bet = bet
+        self.seed = seed
+        self.workers = workers or multiprocessing.cpu_count()
+        self.cache = cache or ResultCache()
+        self.computed = 0
+        self.elapsed = 0.0
+
+    def run(self):
+        """It returns a (point, Statistics) for every point of the grid"""
+        start = time.time()
+        keys = [point.key(self.seed, self.rounds) for point in self.points]
+        results = [self.cache.get(key) for key in keys]
+        jobs = [(index, point.table, self.rounds, self.seed)
+                for index, point in enumerate(self.points) if results[index] is None]
+        if jobs:
+            pool = multiprocessing.Pool(min(self.workers, len(jobs)))
+            try:
+                for index, stats in pool.imap_unordered(_run_point, jobs):
+                    self.cache.put(keys[index], self.points[index].values, stats)
+                    results[index] = stats
+            finally:
+                pool.close()
+                pool.join()
+        self.computed = len(jobs)
+        self.elapsed = time.time() - start
+        return zip(self.points, results)
+
+    def house_edge(self, stats):
+        """What the house wins per chip bet, the first bet of the hand"""
+        return -stats.mean / self.bet
+
+    def report(self, results):
+        lines = []
+        for point, stats in results:
+            values = ", ".join("%s=%s" % (name, point.values[name])
+                               for name in sorted(point.values))
+            lines.append("%s: house edge %+.4f%%, variance %.4f per hand" % (
+                values, 100 * self.house_edge(stats), stats.variance() / self.bet ** 2))
+        return "\n".join(lines)
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    directory = sys.argv[2] if len(sys.argv) > 2 else CACHE_DIRECTORY
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    axes = {"decks": [1, 2, 6, 8],
+            "dealer_min_score": [17, 18],
+            "blackjack_payout": [2, 2.5],
+            "penetration": [0.5, 0.75]}
+    sweep = Sweep(axes, rounds, workers=workers, cache=ResultCache(directory))
+    results = sweep.run()
+    print sweep.report(results)
+    print "%d of %d points simulated in %.1f seconds" % (
+        sweep.computed, len(results), sweep.elapsed)
@@ -0,0 +1,88 @@
+import unittest
+import numpy
+from bankroll import (BankrollSimulator, OutcomeDistribution, EngineStream, FlatSpread,
+                      CountSpread, Progression, value_tags)
+from counting import HI_LO
+from vectorized import VectorizedEngine
+
+class OutcomeDistributionTest(unittest.TestCase):
+
+    def test_from_nets(self):
+        distribution = OutcomeDistribution.from_nets([10, -10, -10, 20], bet=10)
+        assert list(distribution.values) == [-1, 1, 2]
+        assert abs(distribution.mean() - 0.25) < 1e-9
+        outcomes, counts = distribution.draw(numpy.random.RandomState(1), 10000)
+        assert counts is None
+        assert abs((outcomes == -1).mean() - 0.5) < 0.03
+
+class BettingTest(unittest.TestCase):
+
+    def test_count_spread(self):
+        spread = CountSpread([(2, 4), (1, 2)])
+        bankroll = numpy.full(4, 100.0)
+        assert list(spread.bet(bankroll, numpy.array([-1, 1, 1.5, 3]))) == [1, 2, 2, 4]
+        assert list(spread.bet(bankroll, None)) == [1, 1, 1, 1]
+
+    def test_martingale(self):
+        martingale = Progression.martingale(2)
+        martingale.reset(3)
+        playing = numpy.ones(3, bool)
+        for outcomes in ([-1, 1, 0], [-1, -1, 0], [-1, 1, -1]):
+            martingale.settle(numpy.array(outcomes), playing)
+        #the last step is kept, a win starts over and a push doesn't move
+        assert list(martingale.bet(None, None)) == [4, 1, 2]
+
+class BankrollSimulatorTest(unittest.TestCase):
+
+    def test_always_losing(self):
+        simulator = BankrollSimulator(OutcomeDistribution([-1]), FlatSpread(1), bankroll=5,
+                                      trajectories=10)
+        report = simulator.run(100)
+        assert report.risk_of_ruin() == 1.0
+        assert report.median_time_to_ruin() == 4
+        assert (report.bankrolls == 0).all()
+        assert report.drawdown_quantiles()[0.5] == 5
+
+    def test_always_winning(self):
+        simulator = BankrollSimulator(OutcomeDistribution([1]), FlatSpread(2), bankroll=5,
+                                      trajectories=10)
+        report = simulator.run(10)
+        assert report.risk_of_ruin() == 0.0
+        assert report.median_time_to_ruin() is None
+        assert (report.bankrolls == 25).all()
+        assert report.drawdown_quantiles()[0.99] == 0
+
+    def test_bets_are_capped(self):
+        simulator = BankrollSimulator(OutcomeDistribution([-1, 1]), Progression.martingale(),
+                                      bankroll=10, trajectories=1000, seed=3)
+        report = simulator.run(500)
+        assert (report.bankrolls >= 0).all()
+        assert 0 < report.risk_of_ruin() < 1
+
+    def test_bigger_bankroll_safer(self):
+        distribution = OutcomeDistribution([-1, 1], [0.52, 0.48])
+        risks = [BankrollSimulator(distribution, FlatSpread(1), bankroll, 2000, seed=1)
+                 .run(1000).risk_of_ruin() for bankroll in (10, 40)]
+        assert risks[0] > risks[1]
+
+class EngineStreamTest(unittest.TestCase):
+
+    def test_true_counts(self):
+        engine = VectorizedEngine(lanes=3, decks=1, seed=1)
+        stream = EngineStream(engine)
+        assert list(stream.true_counts()) == [0, 0, 0]
+        #four tens are out of the first shoe
+        engine.shoes.counts[0, 9] -= 4
+        engine.shoes.left[0] -= 4
+        assert stream.true_counts()[0] == -4 / (48 / 52.0)
+        assert value_tags(HI_LO)[0] == -1
+
+    def test_simulator(self):
+        engine = VectorizedEngine(lanes=200, decks=2, seed=1)
+        simulator = BankrollSimulator(EngineStream(engine), CountSpread([(2, 4)]),
+                                      bankroll=50, trajectories=200, seed=1)
+        report = simulator.run(100)
+        assert engine.rounds == 100
+        assert 0 <= report.risk_of_ruin() <= 1
+        with self.assertRaises(ValueError):
+            BankrollSimulator(EngineStream(engine), FlatSpread(), trajectories=10).run(1)
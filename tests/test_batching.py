@@ -0,0 +1,70 @@
+import random
+import unittest
+import numpy
+import settings
+from batching import (BatchedTables, BatchedStrategy, DecisionScheduler, TablePolicy,
+                      FEATURES, features)
+from simulation import Simulation
+from solver import Solver
+from strategies import TableStrategy
+
+TABLE = Solver().solve()
+
+def stand_on(score):
+    def policy(features, allowed):
+        return numpy.where(features[:, FEATURES.index("score")] < score,
+                           settings.OPTION_HIT, settings.OPTION_STAND)
+    return policy
+
+class DecisionSchedulerTest(unittest.TestCase):
+
+    def test_batches(self):
+        batched = BatchedTables.create(stand_on(17), tables=8, seed=3)
+        stats = batched.run(50)
+        scheduler = batched.scheduler
+        assert stats.hands == 400
+        assert scheduler.decisions > 400
+        assert scheduler.batches < scheduler.decisions
+        assert scheduler.batch_size() > 1
+        assert scheduler.playing == 0
+
+    def test_max_batch(self):
+        batched = BatchedTables.create(stand_on(17), tables=8, seed=3, max_batch=3)
+        batched.run(20)
+        assert batched.scheduler.batch_size() <= 3
+
+    def test_invalid_option_stands(self):
+        scheduler = DecisionScheduler(lambda features, allowed: allowed + 5)
+        scheduler.join()
+        assert scheduler.decide((12, 12, 0, 0, 2, 10), 2) == settings.OPTION_STAND
+
+    def test_policy_error(self):
+        def policy(features, allowed):
+            raise ValueError("broken model")
+        batched = BatchedTables.create(policy, tables=2)
+        with self.assertRaises(ValueError):
+            batched.run(5)
+
+class TablePolicyTest(unittest.TestCase):
+
+    def test_same_as_table_strategy(self):
+        """The same seeds give the same hands, however they're batched"""
+        batched = BatchedTables.create(TablePolicy(TABLE), tables=4, players=2, seed=9)
+        batched.run(100)
+        rng = random.Random(9)
+        for simulation in batched.simulations:
+            sequential = Simulation.create(2, strategy=TableStrategy(TABLE),
+                                           rng=random.Random(rng.getrandbits(64)))
+            sequential.run(100)
+            assert sequential.stats == simulation.stats
+
+    def test_features(self):
+        simulation = Simulation.create(1, strategy=BatchedStrategy(None))
+        game = simulation.game
+        game.init_game()
+        player = game.players[0]
+        row = features(player, game)
+        hand = player.get_active_hand()
+        assert len(row) == len(FEATURES)
+        assert row[FEATURES.index("score")] == hand.get_score()
+        assert row[FEATURES.index("cards")] == 2
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from benchmark import BENCHMARKS, CALIBRATION, run, compare, load, save, median
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_run(self):
+        results = run(BENCHMARKS, repeat=1, scale=0.001)
+        assert sorted(results) == sorted([CALIBRATION] + [name for name, _, _ in BENCHMARKS])
+        assert all(seconds > 0 for seconds in results.values())
+
+    def test_compare(self):
+        baseline = {"fast": 1.0, "slow": 1.0, "gone": 1.0}
+        results = {"fast": 0.5, "slow": 1.5, "new": 9.0}
+        assert compare(results, baseline, 0.25) == [("slow", 1.0, 1.5)]
+        assert compare(results, baseline, 0.6) == []
+
+    def test_compare_calibrated(self):
+        """The machine going twice as slow doesn't make a regression"""
+        baseline = {CALIBRATION: 1.0, "same": 1.0, "slow": 1.0}
+        results = {CALIBRATION: 2.0, "same": 2.0, "slow": 3.0}
+        assert compare(results, baseline, 0.25) == [("slow", 2.0, 3.0)]
+
+    def test_median(self):
+        assert median([3, 1, 2]) == 2
+        assert median([4, 1, 3, 2]) == 2.5
+
+    def test_save(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            save({"deck_shuffle": 0.5}, path)
+            assert load(path) == {"deck_shuffle": 0.5}
+        finally:
+            os.remove(path)
@@ -0,0 +1,112 @@
+import random
+import unittest
+import settings
+from calculator import LRUCache, EVCalculator, unseen
+from cards import encode
+from participants import Hand
+from probabilities import DealerTable, BUST, shoe_composition
+from renderers import NullBackend
+from rules import Ruleset
+from simulation import Simulation
+from solver import Solver
+
+def hand_of(*representations):
+    hand = Hand(backend=NullBackend())
+    for representation in representations:
+        hand.add_card(encode(representation))
+    return hand
+
+def without(composition, *values):
+    counts = list(composition)
+    for value in values:
+        counts[value - 1] -= 1
+    return tuple(counts)
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1
+        cache["c"] = 3
+        assert "b" not in cache
+        assert sorted(cache) == ["a", "c"]
+        assert cache.get("b") is None
+        assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+    def test_unbounded(self):
+        cache = LRUCache(None)
+        for key in range(1000):
+            cache[key] = key
+        assert len(cache) == 1000
+
+    def test_shared_by_dealer_tables(self):
+        cache = LRUCache(None)
+        composition = shoe_composition(1)
+        seventeen = DealerTable(17, 21, cache=cache).final_totals(6, composition)
+        eighteen = DealerTable(18, 21, cache=cache).final_totals(6, composition)
+        assert eighteen == DealerTable(18, 21).final_totals(6, composition)
+        assert eighteen[BUST] > seventeen[BUST]
+        assert 17 not in eighteen
+
+class EVCalculatorTest(unittest.TestCase):
+
+    def test_stand_like_solver(self):
+        shoe = shoe_composition(6)
+        calculator = EVCalculator()
+        solver = Solver(shoe)
+        for upcard in (1, 6, 10):
+            assert abs(calculator.stand(17, False, upcard, without(shoe, upcard)) -
+                       solver.stand(17, False, upcard)) < 1e-12
+
+    def test_close_to_solver(self):
+        shoe = shoe_composition(8)
+        calculator = EVCalculator()
+        values = calculator.options(hand_of("10", "6"), encode("10"), without(shoe, 10, 10, 6))
+        solved = Solver(shoe).options(16, False, 10)
+        for option in values:
+            assert abs(values[option] - solved[option]) < 0.01
+
+    def test_composition(self):
+        calculator = EVCalculator()
+        tens = (0,) * 9 + (20,)
+        values = calculator.options(hand_of("10", "2"), encode("K"), tens)
+        assert values[settings.OPTION_HIT] == -1
+        #the dealer gets 20 and a 12 loses
+        assert values[settings.OPTION_STAND] == -1
+        values = calculator.options(hand_of("10", "Q"), encode("K"), tens)
+        assert values[settings.OPTION_STAND] == 1
+        assert calculator.best(hand_of("10", "Q"), encode("K"), tens) == settings.OPTION_STAND
+
+    def test_payouts(self):
+        tens = (0,) * 9 + (20,)
+        calculator = EVCalculator(rules=Ruleset(payout=3, blackjack_payout=2.5))
+        assert calculator.options(hand_of("10", "Q"), encode("K"), tens)[
+            settings.OPTION_STAND] == 2
+        #both aces get a ten, a blackjack each
+        assert calculator.split(1, 10, tens) == 1.5
+        assert EVCalculator().split(1, 10, tens) == 1
+
+    def test_bounded(self):
+        shoe = without(shoe_composition(1), 10, 7, 9)
+        hand = hand_of("10", "7")
+        bounded = EVCalculator(size=50)
+        values = bounded.options(hand, encode("9"), shoe)
+        assert len(bounded.cache) <= 50
+        assert len(bounded.dealer._memo) <= 50
+        assert values == EVCalculator(size=None).options(hand, encode("9"), shoe)
+
+    def test_reuse(self):
+        shoe = shoe_composition(2)
+        calculator = EVCalculator()
+        calculator.options(hand_of("10", "4"), encode("6"), without(shoe, 10, 4, 6))
+        misses = calculator.cache.misses
+        calculator.options(hand_of("10", "5"), encode("6"), without(shoe, 10, 4, 6, 10, 5))
+        assert calculator.cache.misses - misses < misses
+
+    def test_unseen(self):
+        game = Simulation.create(2, decks=2, rng=random.Random(3)).game
+        game.init_game()
+        left = sum(game.deck.composition())
+        assert sum(unseen(game)) == left + 1
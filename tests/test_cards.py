@@ -0,0 +1,67 @@
+import unittest
+import settings
+import cards
+from cards import Card, encode, VALUES, DECK
+from participants import Player
+from game import Game, Deck
+from mock import Mock
+
+class CodeTest(unittest.TestCase):
+
+    def test_deck_codes(self):
+        assert len(DECK) == 52
+        assert len(set(DECK)) == 52
+        assert sorted(VALUES[code] for code in DECK) == \
+            sorted(settings.DECK_CONF['cards'].values() * 4)
+
+    def test_encode(self):
+        code = encode("Q", "Hearts")
+        assert cards.RANKS[cards.rank_of(code)] == "Q"
+        assert cards.SUITS[cards.suit_of(code)] == "Hearts"
+        assert VALUES[code] == 10
+
+    def test_hidden(self):
+        code = cards.hide(encode("7"))
+        assert cards.is_hidden(code)
+        assert VALUES[code] == 0
+        assert cards.rank_of(code) == cards.RANKS.index("7")
+        assert cards.reveal(code) == encode("7")
+
+    def test_from_code(self):
+        card = Card.from_code(cards.hide(encode("A", "Spades")))
+        assert card.hidden
+        assert card.value == 0
+        card = Card.from_code(encode("A", "Spades"))
+        assert not card.hidden
+        assert card.value == 11
+        assert card.representation == "A"
+        assert card.suit == settings.DECK_CONF['suits']['Spades']
+
+    def test_shared(self):
+        card = Card.from_code(encode("Q"))
+        assert Card.from_code(encode("Q")) is card
+        assert Deck.create(2).get_cards()[encode("Q")] is card
+        self.assertRaises(AttributeError, setattr, card, "hidden", True)
+        self.assertRaises(AttributeError, setattr, card, "color", "red")
+        assert not hasattr(card, "__dict__")
+
+class EncodedDeckTest(unittest.TestCase):
+
+    def test_create(self):
+        deck = Deck.create(2)
+        assert len(deck.deck) == 104
+        assert len(deck.get_cards()) == 104
+
+    def test_dealer_hides_second_card(self):
+        player = Player("Foo", 100)
+        game = Game([player])
+        game.get_card = Mock(side_effect=[encode("5"), encode("K")])
+        game.dealer.new_hand()
+        game.dealer.hit(game)
+        game.dealer.hit(game)
+        hand = game.dealer.get_active_hand()
+        assert not cards.is_hidden(hand.cards[0])
+        assert cards.is_hidden(hand.cards[1])
+        assert hand.get_score() == 5
+        hand.reveal()
+        assert hand.get_score() == 15
@@ -0,0 +1,70 @@
+import random
+import unittest
+from cards import encode, hide, composition, is_hidden
+from counting import CardCounter, TagSystem, HI_LO, OMEGA_II, KO, HI_OPT_I
+from simulation import Simulation
+
+class TagSystemTest(unittest.TestCase):
+
+    def test_balanced(self):
+        assert HI_LO.is_balanced()
+        assert OMEGA_II.is_balanced()
+        assert HI_OPT_I.is_balanced()
+        assert not KO.is_balanced()
+
+    def test_tags(self):
+        assert HI_LO.tags[encode("5", "Hearts")] == 1
+        assert HI_LO.tags[encode("K", "Club")] == -1
+        assert HI_LO.tags[encode("8")] == 0
+
+class CardCounterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.counter = CardCounter([HI_LO, TagSystem("Tens", {"10": 1})])
+        self.counter.reset(1)
+
+    def test_running_count(self):
+        for representation in ("2", "5", "K", "9"):
+            self.counter.see(encode(representation))
+        assert self.counter.running_count() == 1
+        assert self.counter.running_count(HI_LO) == 1
+        assert self.counter.running_count(self.counter.systems[1]) == 0
+        assert self.counter.remaining("K") == 3
+        assert self.counter.remaining("A") == 4
+        assert self.counter.composition() == (4, 3, 4, 4, 3, 4, 4, 4, 3, 15)
+
+    def test_true_count(self):
+        self.counter.reset(2)
+        for _ in range(26):
+            self.counter.see(encode("3"))
+        assert self.counter.decks_left() == 1.5
+        assert self.counter.true_count() == 26 / 1.5
+
+    def test_hidden(self):
+        game = Simulation.create(rng=random.Random(0)).game
+        self.counter.reset(1)
+        self.counter.event(game, 2, None, hide(encode("2")))
+        assert self.counter.running_count() == 0
+        self.counter.event(game, 7, None, encode("2"))
+        assert self.counter.running_count() == 1
+
+    def test_game(self):
+        simulation = Simulation.create(3, decks=2, rng=random.Random(4))
+        game = simulation.game
+        counter = CardCounter([HI_LO, OMEGA_II])
+        game.observers.append(counter)
+        #hole cards that were never shown are still unseen after the round
+        unseen = []
+        for _ in range(60):
+            shuffles = game.deck.shuffles
+            simulation.play_round()
+            if game.deck.shuffles != shuffles:
+                unseen = []
+            hidden = [card for participant in game.players + [game.dealer]
+                      for hand in participant.hands for card in hand.cards
+                      if is_hidden(card)]
+            deck = game.deck
+            left = composition(list(deck.deck[deck.position:]) + hidden + unseen)
+            assert counter.composition() == left
+            assert counter.left == sum(left)
+            unseen += hidden
@@ -0,0 +1,69 @@
+import random
+import unittest
+from evaluation import AlphaSpending, DifferenceEvaluation, IntervalEvaluation, \
+    normal_quantile, BETTER, WORSE, EQUIVALENT, INSIDE, OUTSIDE, INCONCLUSIVE
+from experiment import Arm, Experiment
+from simulation import Simulation
+from strategies import StandOnStrategy
+
+class AlphaSpendingTest(unittest.TestCase):
+
+    def test_quantile(self):
+        assert abs(normal_quantile(0.975) - 1.959964) < 1e-5
+        assert abs(normal_quantile(0.5)) < 1e-9
+
+    def test_spending(self):
+        spending = AlphaSpending(0.05, 1000)
+        zs = [spending.look(rounds) for rounds in range(100, 1001, 100)]
+        assert abs(spending.spent - 0.05) < 1e-9
+        #the first looks are much stricter than the last ones
+        assert zs[0] > 4
+        assert zs[-1] < 3
+        assert spending.look(1000) == float("inf")
+
+class EvaluationTest(unittest.TestCase):
+
+    def test_worse(self):
+        arms = [Arm("Dealer"), Arm("Always hit", StandOnStrategy(22))]
+        evaluation = DifferenceEvaluation(Experiment(arms, seed=1), batch=50, max_rounds=5000)
+        result = evaluation.run()
+        assert result.decision == WORSE
+        assert result.rounds < 5000
+        assert result.interval[1] < 0
+
+    def test_better(self):
+        arms = [Arm("Always hit", StandOnStrategy(22)), Arm("Dealer")]
+        result = DifferenceEvaluation(Experiment(arms, seed=1), batch=50,
+                                      max_rounds=5000).run()
+        assert result.decision == BETTER
+
+    def test_equivalent(self):
+        arms = [Arm("Dealer"), Arm("Dealer too")]
+        result = DifferenceEvaluation(Experiment(arms, seed=1), margin=1, batch=10,
+                                      max_rounds=1000).run()
+        assert result.decision == EQUIVALENT
+        assert result.rounds < 1000
+
+    def test_inconclusive(self):
+        arms = [Arm("Dealer"), Arm("Dealer too")]
+        result = DifferenceEvaluation(Experiment(arms, seed=1), batch=10,
+                                      max_rounds=30).run()
+        assert result.decision == INCONCLUSIVE
+        assert (result.rounds, result.looks) == (30, 3)
+
+    def test_interval(self):
+        simulation = Simulation.create(strategy=StandOnStrategy(22), rng=random.Random(2))
+        result = IntervalEvaluation(simulation, (-10, -8), batch=100, max_rounds=10000).run()
+        assert result.decision == INSIDE
+        assert result.rounds < 10000
+        simulation = Simulation.create(strategy=StandOnStrategy(22), rng=random.Random(2))
+        result = IntervalEvaluation(simulation, (-1, 1), batch=100, max_rounds=10000).run()
+        assert result.decision == OUTSIDE
+
+    def test_no_more_rounds(self):
+        simulation = Simulation(Simulation.create(strategy=StandOnStrategy(22), chips=30,
+                                                  rng=random.Random(2)).game, rebuy=False)
+        result = IntervalEvaluation(simulation, (-1, 1), batch=100, max_rounds=10000).run()
+        assert result.decision == INCONCLUSIVE
+        assert result.rounds < 100
+        assert result.looks == 1
@@ -0,0 +1,134 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import warnings
+import settings
+from cards import encode, is_hidden
+from events import EventRecorder, EventLog, RECORD
+from game import Game
+from participants import Player
+from rules import Ruleset
+from simulation import Simulation
+
+class LastRound(object):
+    """It keeps the cards of every seat as the round goes"""
+
+    def __init__(self):
+        self.cards = {}
+
+    def update(self, game):
+        pass
+
+    def event(self, game, event, hand, value):
+        if event == settings.EVENT_ROUND:
+            self.cards = {}
+        elif event == settings.EVENT_ROUND_OVER:
+            self.dealer = list(game.dealer.get_active_hand().cards)
+            self.money = [player.get_money() for player in game.players]
+        elif event == settings.EVENT_HIT and hand not in game.dealer.hands:
+            self.cards.setdefault(id(hand), []).append(value)
+
+class EventRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "events.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_buffered(self):
+        simulation = Simulation.create(players=2, rng=random.Random(1))
+        recorder = EventRecorder(self.path, batch=10)
+        simulation.game.observers.append(recorder)
+        simulation.run(9)
+        assert os.path.getsize(self.path) == 0
+        simulation.run(1)
+        size = os.path.getsize(self.path)
+        assert size > 0
+        assert size % RECORD.size == 0
+        simulation.run(5)
+        recorder.close()
+        assert os.path.getsize(self.path) > size
+        assert len(EventLog(self.path)) == 15
+
+    def test_sessions(self):
+        nets = []
+        for seed in (1, 2):
+            simulation = Simulation.create(players=2, rng=random.Random(seed))
+            recorder = EventRecorder(self.path)
+            simulation.game.observers.append(recorder)
+            simulation.run(5)
+            recorder.close()
+            nets.append(simulation.stats.net)
+        log = EventLog(self.path)
+        assert len(log) == 10
+        assert sum(sum(log.replay(i).net.values()) for i in range(5)) == nets[0]
+        assert sum(sum(log.replay(i).net.values()) for i in range(5, 10)) == nets[1]
+
+    def test_fractional_payouts(self):
+        simulation = Simulation.create(players=3, decks=2, rng=random.Random(2),
+                                       rules=Ruleset(blackjack_payout=2.25))
+        recorder = EventRecorder(self.path)
+        simulation.game.observers.append(recorder)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            simulation.run(200)
+            recorder.close()
+        log = EventLog(self.path)
+        nets = [net for i in range(200) for net in log.replay(i).net.values()]
+        #a blackjack of a bet of 10 wins 12.5
+        assert 12.5 in nets
+        assert sum(nets) == simulation.stats.net
+
+    def test_replay(self):
+        simulation = Simulation.create(players=3, decks=2, rng=random.Random(2))
+        recorder = EventRecorder(self.path, batch=7)
+        last = LastRound()
+        simulation.game.observers.extend([recorder, last])
+        simulation.run(50)
+        recorder.close()
+
+        log = EventLog(self.path)
+        assert len(log) == 50
+        assert sum(sum(log.replay(i).net.values()) for i in range(50)) == simulation.stats.net
+        assert log.replay(0).seeds
+
+        played = log.replay(49)
+        assert [card for card in played.dealer.cards if not is_hidden(card)]
+        assert [c & ~0x40 for c in played.dealer.cards] == [c & ~0x40 for c in last.dealer]
+        replayed = sorted(hand.cards for seat in range(3) for hand in played.get_hands(seat))
+        assert replayed == sorted(last.cards.values())
+        for seat in range(3):
+            assert played.get_hands(seat)[0].bet in (10, 5)
+
+    def test_split(self):
+        player = Player("Foo", 100)
+        game = Game([player])
+        recorder = EventRecorder(self.path)
+        game.observers.append(recorder)
+        game.notify(settings.EVENT_ROUND)
+        player.make_bet(40)
+        game.notify(settings.EVENT_BET, player.get_active_hand(), 40)
+        cards = iter([encode("K"), encode("Q"), encode("5"), encode("9")])
+        game.get_card = lambda: next(cards)
+        game.deck = None
+        player.hit(game)
+        player.hit(game)
+        player.split(game)
+        player.stand(game)
+        player.set_active_hand(player.hands[1])
+        player.hit(game)
+        player.stand(game)
+        game.finish_round()
+        recorder.close()
+
+        played = EventLog(self.path).replay(0)
+        first, second = played.get_hands(0)
+        assert first.cards == [encode("K"), encode("5")]
+        assert second.cards == [encode("Q"), encode("9")]
+        assert first.bet == second.bet == 20
+        assert first.is_stand() and second.is_stand()
+        assert played.net == {0: -40}
@@ -0,0 +1,72 @@
+import random
+import unittest
+from cards import encode
+from game import Deck
+from experiment import AntitheticDeck, Arm, Experiment, Difference, OPPOSITES
+from strategies import StandOnStrategy, FlatBetting
+
+class AntitheticDeckTest(unittest.TestCase):
+
+    def test_opposites(self):
+        assert OPPOSITES[encode("A", "Hearts")] == encode("K", "Hearts")
+        assert OPPOSITES[encode("7")] == encode("7")
+        assert sorted(OPPOSITES) == range(52)
+
+    def test_shuffle(self):
+        deck = Deck.create(2, random.Random(5))
+        antithetic = AntitheticDeck.create(2, random.Random(5))
+        deck.shuffle()
+        antithetic.shuffle()
+        assert list(antithetic.deck) == [OPPOSITES[card] for card in deck.deck]
+        assert antithetic.composition() == deck.composition()
+
+    def test_shuffles_in_a_row(self):
+        deck = Deck.create(2, random.Random(5))
+        antithetic = AntitheticDeck.create(2, random.Random(5))
+        for _ in range(5):
+            deck.shuffle()
+            antithetic.shuffle()
+            assert list(antithetic.deck) == [OPPOSITES[card] for card in deck.deck]
+
+class ExperimentTest(unittest.TestCase):
+
+    def test_same_shoes(self):
+        arms = [Arm("Stand on 17"), Arm("Stand on 12", StandOnStrategy(12))]
+        experiment = Experiment(arms, players=2, decks=2, seed=3)
+        for _ in range(20):
+            experiment.play_round()
+            first, second = [simulations[0].game.deck for simulations in experiment.tables]
+            assert first.deck == second.deck
+            assert first.seed == second.seed
+
+    def test_antithetic_shoes(self):
+        experiment = Experiment([Arm("A")], decks=2, seed=3, antithetic=True)
+        for _ in range(6):
+            experiment.play_round()
+            deck, antithetic = [simulation.game.deck for simulation in experiment.tables[0]]
+            assert list(antithetic.deck) == [OPPOSITES[card] for card in deck.deck]
+
+    def test_identical_arms(self):
+        experiment = Experiment([Arm("A"), Arm("B")], seed=1, antithetic=True).run(50)
+        difference = experiment.differences[0]
+        assert difference.samples == 50
+        assert difference.mean == 0
+        assert difference.confidence_interval() == (0, 0)
+
+    def test_variance_reduction(self):
+        arms = [Arm("Flat 10"), Arm("Flat 20", betting=FlatBetting(20))]
+        experiment = Experiment(arms, seed=2).run(200)
+        difference = experiment.differences[0]
+        #doubling every bet doubles every result
+        assert abs(difference.mean - difference.means[2]) < 1e-9
+        assert difference.reduction() > 4
+        assert "Flat 20 - Flat 10" in experiment.report()
+
+class DifferenceTest(unittest.TestCase):
+
+    def test_add(self):
+        difference = Difference()
+        for arm, baseline in [(10, 0), (0, -10), (20, 10), (-10, -10)]:
+            difference.add(arm, baseline)
+        assert difference.mean == 7.5
+        assert abs(difference.variance() - 25) < 1e-9
@@ -1,18 +1,27 @@
-import pytest
 import unittest
-import settings
+from cards import encode, DECK
 from participants import Player, Hand
-from game import Game, Deck, SingleDeck
+import random
+from game import Game, Deck, SingleDeck, Shoe, ContinuousDeck, ContinuousShoe
+from renderers import NullRender
+from rules import Ruleset
+from strategies import FlatBetting, StandOnStrategy
 import __builtin__
 from mock import Mock
-from mock import ANY
-from mock import patch
 
 #This allows us to monkeypatch the builtin input
 original_input = __builtin__.input
 def back_to_normal_input():
     __builtin__.input = original_input
 
+def rig_hand(player, *representations):
+    """Replace the player's active hand by one with these cards"""
+    hand = Hand(player.get_active_hand().bet)
+    for representation in representations:
+        hand.add_card(encode(representation))
+    player.hands[player.hands.index(player.get_active_hand())] = hand
+    player.set_active_hand(hand)
+
 class CardTest(unittest.TestCase):
 
     def test_shuffle(self):
@@ -23,13 +32,23 @@ class CardTest(unittest.TestCase):
 
     def test_is_empty(self):
         deck = Deck.create(1)
-        cards = list(deck.deck)
         assert not deck.is_empty()
-        try:
-            while True:
-                deck.get_card()
-        except:
-            assert deck.is_empty()
+        for _ in range(52):
+            deck.get_card()
+        assert deck.is_empty()
+
+    def test_new_deck_when_all_in_play(self):
+        deck = Deck.create(1)
+        deck.shuffle()
+        in_play = [deck.get_card() for _ in range(52)]
+        card = deck.get_card()
+        assert len(deck) == 104
+        assert list(deck.deck[:52]) == in_play
+        assert sorted(deck.deck) == sorted(Deck.create(2).deck)
+        assert card == deck.deck[52]
+        deck.shuffle()
+        assert len(deck) == 52
+        assert sorted(deck.deck) == sorted(DECK)
 
 class GameTest(unittest.TestCase):
 
@@ -96,13 +115,12 @@ class GameTest(unittest.TestCase):
         game = SingleDeck([player])
         game.init_game()
         game.set_current_player(player)
-        player.hands[0].cards[0]._value = 10
-        player.hands[0].cards[1]._value = 11
+        rig_hand(player, "10", "A")
         player.win_bet = Mock()
         assert player == game.blackjack_or_busted(player, game.dealer)
-        player.win_bet.assert_called_with(None)
+        player.win_bet.assert_called_with(None, game.rules.blackjack_payout)
 
-        player.hands[0].cards[0]._value = 11
+        rig_hand(player, "10", "9", "5")
         assert game.dealer == game.blackjack_or_busted(player, game.dealer)
 
     def test_process_hand_player_busted(self):
@@ -113,11 +131,12 @@ class GameTest(unittest.TestCase):
         game = SingleDeck([player])
         game.init_game()
         game.set_current_player(player)
-        player.hands[0].cards[0]._value = 10
-        player.hands[0].cards[1]._value = 9
+        rig_hand(player, "10", "9")
 
+        #it hits on 21 too: standing on a 21 drawn by chance, 19 and a
+        #two, would leave the test without a bust now and then
         def fake_input_option_hit(a):
-            if game.players[0].get_score() < 21:
+            if game.players[0].get_score() <= 21:
                 return 0
             else:
                 return 1
@@ -133,19 +152,120 @@ class GameTest(unittest.TestCase):
         def fake_input(a):
             return 40
         __builtin__.input = fake_input
-        game = SingleDeck([player])
+        game = SingleDeck([player], rules=Ruleset(dealer_min_score=22))
         game.init_game()
         game.set_current_player(player)
-        player.hands[0].cards[0]._value = 10
-        player.hands[0].cards[1]._value = 9
+        rig_hand(player, "10", "9")
 
         def fake_input_option_hit(a):
             return 1
         __builtin__.input = fake_input_option_hit
 
-        settings.DEALER_MIN_SCORE = 22
         game.renderer.render_busted = Mock()
         game.set_current_player(player)
         game.process_hand()
         game.renderer.render_busted.assert_called_with(game)
         assert game.winner == player
+
+    def test_process_hand_dealer_busted_every_seat(self):
+        """The dealer busts against the first seat, the others win too"""
+        players = [Player("Foo%d" % seat, 100, betting=FlatBetting(10),
+                          strategy=StandOnStrategy(2)) for seat in range(3)]
+        game = SingleDeck(players, renderer=NullRender(), rules=Ruleset(dealer_min_score=22))
+        game.init_game()
+        hand = Hand(rules=game.rules)
+        for representation in ("10", "6"):
+            hand.add_card(encode(representation))
+        game.dealer.hands = [hand]
+        game.dealer.set_active_hand(hand)
+        for player in players:
+            player.set_active_hand(player.hands[0])
+            rig_hand(player, "10", "9")
+            game.set_current_player(player)
+            game.process_hand()
+            assert game.winner == player
+        assert [player.get_money() for player in players] == [110, 110, 110]
+
+class ShoeTest(unittest.TestCase):
+
+    def test_deck_created_once(self):
+        player = Player("Foo", 100, betting=FlatBetting(10), strategy=StandOnStrategy())
+        game = Shoe([player], decks=6, penetration=0.75, renderer=NullRender())
+        deck = game.deck
+        storage = game.deck.deck
+        assert len(storage) == 312
+        game.init_game()
+        dealt = game.deck.position
+        game.init_game()
+        assert game.deck is deck
+        assert game.deck.deck is storage
+        assert game.deck.position == dealt + 4
+
+    def test_shuffle_on_cut_card(self):
+        player = Player("Foo", 100, betting=FlatBetting(10), strategy=StandOnStrategy())
+        game = Shoe([player], decks=1, penetration=0.5, renderer=NullRender())
+        game.deck.position = 30
+        game.init_game()
+        assert game.deck.position == 4
+        assert game.deck.discarded == 0
+
+    def test_discards_reshuffled_when_dry(self):
+        deck = Deck.create(1)
+        deck.shuffle()
+        for _ in range(40):
+            deck.get_card()
+        deck.discard()
+        in_play = [deck.get_card() for _ in range(12)]
+        assert deck.is_empty()
+        card = deck.get_card()
+        assert card not in in_play
+        assert list(deck.deck[:12]) == in_play
+        assert sorted(deck.deck) == sorted(Deck.create(1).deck)
+        while not deck.is_empty():
+            assert deck.get_card() not in in_play
+
+    def test_penetration(self):
+        deck = Deck.create(2)
+        assert deck.penetration() == 0
+        for _ in range(26):
+            deck.get_card()
+        assert deck.penetration() == 0.25
+
+class ContinuousShoeTest(unittest.TestCase):
+
+    def test_draws(self):
+        deck = ContinuousDeck(2, rng=random.Random(0))
+        cards = sorted(deck.get_card() for _ in range(104))
+        assert cards == sorted(Deck.create(2).deck)
+        assert deck.is_empty()
+        deck.discard()
+        assert deck.left == 104
+        assert deck.composition() == Deck.create(2).composition()
+
+    def test_new_deck_when_all_out(self):
+        deck = ContinuousDeck(1, rng=random.Random(0))
+        for _ in range(53):
+            deck.get_card()
+        assert len(deck) == 104
+        deck.discard()
+        assert len(deck) == 52
+        assert deck.left == 52
+        assert deck.composition() == Deck.create(1).composition()
+
+    def test_counts(self):
+        deck = ContinuousDeck(8, rng=random.Random(1))
+        dealt = [deck.get_card() for _ in range(50)]
+        assert len(deck) == 416
+        assert deck.penetration() == 50 / 416.0
+        assert sum(deck.counts) == 416 - 50
+        assert all(deck.counts[card] < 8 for card in dealt)
+        assert len(deck.get_cards()) == 416 - 50
+
+    def test_cards_back_every_round(self):
+        player = Player("Foo", 100, betting=FlatBetting(10), strategy=StandOnStrategy())
+        game = ContinuousShoe([player], decks=8, renderer=NullRender(),
+                              rng=random.Random(2))
+        for _ in range(5):
+            game.init_game()
+            assert game.deck.left == 416 - 4
+            assert len(game.deck.dealt) == 4
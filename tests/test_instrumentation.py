@@ -0,0 +1,72 @@
+import random
+import urllib2
+import unittest
+from game import Game, Deck
+from instrumentation import Instrumentation, Histogram
+from simulation import Simulation
+
+class HistogramTest(unittest.TestCase):
+
+    def test_percentile(self):
+        histogram = Histogram()
+        for _ in range(90):
+            histogram.add(0.001)
+        for _ in range(10):
+            histogram.add(0.1)
+        assert histogram.count == 100
+        assert 0.001 <= histogram.percentile(0.5) < 0.0013
+        assert 0.1 <= histogram.percentile(0.99) < 0.13
+
+class InstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.instrumentation = Instrumentation()
+
+    def tearDown(self):
+        self.instrumentation.disable()
+
+    def test_disabled(self):
+        set_state = Game.__dict__["set_state"]
+        self.instrumentation.enable()
+        assert Game.__dict__["set_state"] is not set_state
+        self.instrumentation.disable()
+        assert Game.__dict__["set_state"] is set_state
+        assert Deck.get_card.__name__ == "get_card"
+
+    def test_rounds(self):
+        simulation = Simulation.create(2, rng=random.Random(1))
+        self.instrumentation.enable()
+        simulation.run(20)
+        stats = self.instrumentation.stats()
+        assert stats[("turn", "dealer")]["count"] > 0
+        assert stats[("process_turn", "player")]["count"] > 0
+        assert stats[("set_state", "next_turn")]["count"] > 0
+        assert stats[("render", "NullRender")]["count"] > 0
+        assert stats[("get_card", "deck")]["count"] >= 20 * 6
+        get_card = stats[("get_card", "deck")]
+        assert get_card["p50"] <= get_card["p99"]
+
+    def test_continuous(self):
+        simulation = Simulation.create(2, rng=random.Random(1), continuous=True)
+        self.instrumentation.enable()
+        simulation.run(20)
+        stats = self.instrumentation.stats()
+        assert stats[("get_card", "continuous")]["count"] >= 20 * 6
+        assert ("get_card", "deck") not in stats
+
+    def test_one_enabled(self):
+        self.instrumentation.enable()
+        self.assertRaises(RuntimeError, Instrumentation().enable)
+
+    def test_serve(self):
+        self.instrumentation.enable()
+        Simulation.create(rng=random.Random(1)).run(5)
+        server = self.instrumentation.serve()
+        try:
+            url = "http://127.0.0.1:%d/metrics" % server.server_address[1]
+            body = urllib2.urlopen(url).read()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'blackjack_calls_total{hook="get_card",key="deck"}' in body
+        assert 'quantile="0.99"' in body
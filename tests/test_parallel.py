@@ -0,0 +1,70 @@
+import random
+import unittest
+from game import Deck
+from parallel import ParallelSimulation, Table, worker_seeds, split_rounds
+from simulation import Simulation, Statistics
+
+class SeedTest(unittest.TestCase):
+
+    def test_worker_seeds(self):
+        assert worker_seeds(7, 4) == worker_seeds(7, 4)
+        assert len(set(worker_seeds(7, 4))) == 4
+        assert worker_seeds(7, 4) != worker_seeds(8, 4)
+
+    def test_split_rounds(self):
+        assert split_rounds(10, 3) == [4, 3, 3]
+        assert sum(split_rounds(1001, 8)) == 1001
+
+    def test_deck_rng(self):
+        first = Deck.create(1, random.Random(3))
+        second = Deck.create(1, random.Random(3))
+        first.shuffle()
+        second.shuffle()
+        assert first.deck == second.deck
+
+class StatisticsTest(unittest.TestCase):
+
+    def test_settle(self):
+        stats = Statistics()
+        stats.settle(10)
+        stats.settle(-10)
+        stats.settle(0)
+        assert (stats.hands, stats.wins, stats.losses, stats.pushes, stats.net) == \
+            (3, 1, 1, 1, 0)
+
+    def test_merge(self):
+        first = Statistics()
+        first.settle(10)
+        second = Statistics()
+        second.settle(-5)
+        second.busts = 1
+        first.merge(second)
+        assert first.hands == 2
+        assert first.net == 5
+        assert first.busts == 1
+
+    def test_simulation(self):
+        simulation = Simulation.create(players=2, rng=random.Random(1)).run(300)
+        stats = simulation.stats
+        assert stats.hands == 600
+        assert stats.wins + stats.losses + stats.pushes == 600
+        assert stats.busts > 0
+        assert stats.blackjacks > 0
+
+class ParallelSimulationTest(unittest.TestCase):
+
+    def test_reproducible(self):
+        first = ParallelSimulation(Table(players=2, decks=2), workers=2, seed=11).run(500)
+        second = ParallelSimulation(Table(players=2, decks=2), workers=2, seed=11).run(500)
+        other = ParallelSimulation(Table(players=2, decks=2), workers=2, seed=12).run(500)
+        assert first == second
+        assert first != other
+        assert first.hands == 1000
+
+    def test_same_as_sequential(self):
+        seeds = worker_seeds(5, 2)
+        expected = Statistics()
+        for rounds, seed in zip(split_rounds(301, 2), seeds):
+            simulation = Table()(random.Random(seed)).run(rounds)
+            expected.merge(simulation.stats)
+        assert ParallelSimulation(Table(), workers=2, seed=5).run(301) == expected
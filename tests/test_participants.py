@@ -1,12 +1,9 @@
-import pytest
-import settings
 import unittest
-from participants import Participant, Player, Dealer, Hand
+from cards import VALUES, encode, hide, is_hidden
+from participants import Participant, Player, Hand
 from game import Game, Deck, SingleDeck
 from renderers import ParticipantTextRender, HandTextRender
 from mock import Mock
-from mock import ANY
-from mock import patch
 
 class ParticipantTest(unittest.TestCase):
 
@@ -106,12 +103,11 @@ class HandTest(unittest.TestCase):
         hand = Hand()
         deck = Deck.create(1)
         card = deck.get_card()
-        card.hidden = True
-        hand.add_card(card)
+        hand.add_card(hide(card))
         hand.add_card(deck.get_card())
-        assert any([card.hidden for card in hand.cards])
+        assert any([is_hidden(code) for code in hand.cards])
         hand.reveal()
-        assert all([not card.hidden for card in hand.cards])
+        assert all([not is_hidden(code) for code in hand.cards])
 
     def test_split(self):
         hand = Hand(60)
@@ -136,7 +132,7 @@ class HandTest(unittest.TestCase):
         deck = Deck.create(1)
         while (len(hand.cards) < 2 and not deck.is_empty()):
             card = deck.get_card()
-            if card.value > 9:
+            if VALUES[card] > 9:
                 hand.add_card(card)
         assert hand.can_do_split()
 
@@ -158,10 +154,51 @@ class HandTest(unittest.TestCase):
 
     def test_get_score(self):
         hand = Hand(60)
-        deck = Deck.create(1)
-        card1 = deck.get_card()
-        card2 = deck.get_card()
+        card1 = encode("K")
+        card2 = encode("7")
         hand.add_card(card1)
         hand.add_card(card2)
 
-        assert hand.get_score() == card1.value + card2.value
+        assert hand.get_score() == VALUES[card1] + VALUES[card2]
+
+    def test_soft_score(self):
+        hand = Hand(60)
+        hand.add_card(encode("A"))
+        hand.add_card(encode("6"))
+        assert hand.get_score() == 17
+        assert hand.is_soft()
+        hand.add_card(encode("9"))
+        assert hand.get_score() == 16
+        assert not hand.is_soft()
+
+    def test_two_aces(self):
+        hand = Hand(60)
+        hand.add_card(encode("A"))
+        hand.add_card(encode("A"))
+        assert hand.get_score() == 12
+        assert hand.is_soft()
+        hand.split(Game([]))
+        assert hand.get_score() == 11
+        assert hand.get_len() == 1
+
+    def test_blackjack(self):
+        hand = Hand(60)
+        hand.add_card(encode("A"))
+        hand.add_card(encode("K"))
+        assert hand.is_blackjack()
+        hand = Hand(60)
+        for representation in ("7", "4", "K"):
+            hand.add_card(encode(representation))
+        assert hand.get_score() == 21
+        assert not hand.is_blackjack()
+
+    def test_hidden_score(self):
+        hand = Hand()
+        hand.add_card(encode("9"))
+        hand.add_card(encode("A"))
+        hand.hide(1)
+        assert hand.get_score() == 9
+        assert not hand.is_soft()
+        hand.reveal()
+        assert hand.get_score() == 20
+        assert hand.is_soft()
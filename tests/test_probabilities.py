@@ -0,0 +1,67 @@
+import unittest
+from cards import encode
+from game import Deck
+from probabilities import DealerTable, BUST, shoe_composition
+from rules import Ruleset
+
+def compo(**counts):
+    """A composition from the values, e.g. compo(ten=2, seven=1)"""
+    names = ["ace", "two", "three", "four", "five", "six", "seven", "eight",
+             "nine", "ten"]
+    return tuple(counts.get(name, 0) for name in names)
+
+class DealerTableTest(unittest.TestCase):
+
+    def test_hole_card(self):
+        table = DealerTable(17, 21)
+        totals = table.final_totals(10, compo(ten=1, seven=1))
+        assert totals[20] == 0.5
+        assert totals[17] == 0.5
+        assert totals[BUST] == 0
+
+    def test_bust(self):
+        table = DealerTable(17, 21)
+        assert table.bust(6, compo(ten=2)) == 1.0
+
+    def test_soft_seventeen_stands(self):
+        table = DealerTable(17, 21)
+        totals = table.final_totals(1, compo(six=1, ten=3))
+        assert totals[17] == 0.25
+        assert totals[21] == 0.75
+
+    def test_min_score(self):
+        table = DealerTable(22, 21)
+        assert table.bust(10, compo(ten=1, seven=1)) == 1.0
+        totals = DealerTable(rules=Ruleset(dealer_min_score=18)).final_totals(
+            10, compo(ten=1, eight=1))
+        assert sorted(totals.keys()) == [18, 19, 20, 21, BUST]
+        assert totals[20] == 0.5
+        assert totals[18] == 0.5
+
+    def test_full_shoe(self):
+        table = DealerTable(17, 21)
+        shoe = list(shoe_composition(6))
+        shoe[5] -= 1
+        totals = table.final_totals(6, tuple(shoe))
+        assert abs(sum(totals.values()) - 1) < 1e-9
+        assert abs(totals[BUST] - 0.4228) < 1e-4
+
+    def test_cached(self):
+        table = DealerTable(17, 21)
+        totals = table.final_totals(9, shoe_composition(1))
+        assert table.final_totals(9, shoe_composition(1)) is totals
+        #every table keeps its own, unless they're given the same cache
+        assert DealerTable(17, 21).final_totals(9, shoe_composition(1)) is not totals
+        cache = {}
+        totals = DealerTable(17, 21, cache).final_totals(9, shoe_composition(1))
+        assert DealerTable(17, 21, cache).final_totals(9, shoe_composition(1)) is totals
+        assert DealerTable(18, 21, cache).final_totals(9, shoe_composition(1)) is not totals
+        table.clear()
+        assert not table._results and not table._memo
+
+    def test_deck_composition(self):
+        deck = Deck.create(1)
+        assert deck.composition() == shoe_composition(1)
+        card = deck.get_card()
+        assert card == encode("A", "Club")
+        assert deck.composition()[0] == 3
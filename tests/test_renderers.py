@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import sys
+import unittest
+from StringIO import StringIO
+from cards import Card, encode
+from participants import Player, Hand
+from game import SingleDeck
+from renderers import TextBackend, BufferedBackend, NullBackend, NullRender
+from strategies import StandOnStrategy, FlatBetting
+from mock import Mock
+from mock import patch
+
+def bots(number):
+    return [Player("Bot %d" % i, 100, strategy=StandOnStrategy(), betting=FlatBetting(10))
+            for i in range(number)]
+
+def play_round(game):
+    game.init_game()
+    for player in game.players:
+        game.set_current_player(player)
+        game.process_hand()
+    game.finish_round()
+
+class TextBackendTest(unittest.TestCase):
+
+    def test_stream(self):
+        out = StringIO()
+        hand = Hand(backend=TextBackend(out))
+        hand.add_card(encode("K", "Hearts"))
+        hand.render()
+        assert out.getvalue() == u"     K - ♥ (red)\n"
+
+    def test_flows_down(self):
+        out = StringIO()
+        game = SingleDeck(bots(2), backend=TextBackend(out))
+        with patch.object(sys, 'stdout', StringIO()) as stdout:
+            play_round(game)
+        assert stdout.getvalue() == ""
+        assert "Dealer cards:" in out.getvalue()
+        assert "Bot 1 cards:" in out.getvalue()
+
+    def test_shared_renderers(self):
+        backend = TextBackend(StringIO())
+        game = SingleDeck(bots(2), backend=backend)
+        assert game.players[0].renderer is game.players[1].renderer
+        assert game.players[0].renderer is game.dealer.renderer
+        assert Hand(backend=backend).renderer is Hand(backend=backend).renderer
+        assert backend.hand().card is backend.card()
+
+class BufferedBackendTest(unittest.TestCase):
+
+    def test_one_write_per_round(self):
+        stream = Mock(spec=["write"])
+        game = SingleDeck(bots(3), backend=BufferedBackend(stream))
+        game.init_game()
+        for player in game.players:
+            game.set_current_player(player)
+            game.process_hand()
+        assert not stream.write.called
+        game.finish_round()
+        assert stream.write.call_count == 1
+        assert "Dealer cards:" in stream.write.call_args[0][0]
+        game.finish_round()
+        assert stream.write.call_count == 1
+
+    def test_encoded(self):
+        stream = StringIO()
+        backend = BufferedBackend(stream)
+        Card.from_code(encode("A", "Spades")).render(backend.card())
+        backend.flush()
+        assert stream.getvalue() == u"     A - ♠ (black)\n".encode("utf-8")
+
+class NullBackendTest(unittest.TestCase):
+
+    def test_nothing_rendered(self):
+        game = SingleDeck(bots(2), backend=NullBackend())
+        assert isinstance(game.renderer, NullRender)
+        assert isinstance(game.dealer.renderer, NullRender)
+        assert isinstance(game.players[0].renderer, NullRender)
+        with patch.object(sys, 'stdout', StringIO()) as stdout:
+            play_round(game)
+            game.dealer.render()
+            game.deck.render()
+        assert stdout.getvalue() == ""
+        assert isinstance(game.dealer.get_active_hand().renderer, NullRender)
@@ -0,0 +1,77 @@
+import os
+import json
+import shutil
+import random
+import tempfile
+import unittest
+import numpy
+import settings
+from results import ResultsWriter, Results, META
+from rules import Ruleset
+from simulation import Simulation
+from strategies import StandOnStrategy
+
+class ResultsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def simulate(self, rounds, players=2, chunk=64, batch=10, strategy=None, rules=None):
+        simulation = Simulation.create(players, decks=2, rng=random.Random(7),
+                                       strategy=strategy, rules=rules)
+        writer = ResultsWriter(self.directory, chunk, batch)
+        simulation.game.observers.append(writer)
+        simulation.run(rounds)
+        writer.close()
+        return simulation
+
+    def test_rows(self):
+        simulation = self.simulate(150)
+        results = Results(self.directory)
+        assert len(results) == 300
+        assert results.rounds == 150
+        assert isinstance(results["payout"], numpy.memmap)
+        assert results["payout"].sum() == simulation.stats.net
+        assert list(results["round"][:4]) == [0, 0, 1, 1]
+        assert set(results["seat"]) == set([0, 1])
+        assert (results["first"] < 52).all() and (results["upcard"] < 52).all()
+        assert (results["actions"] < 8).all()
+
+    def test_actions(self):
+        self.simulate(50, strategy=StandOnStrategy(22))
+        results = Results(self.directory)
+        hits = results["actions"] & (1 << settings.OPTION_HIT) != 0
+        #busted players always hit and lose, unless they had a blackjack
+        assert ((results["payout"] > 0) == ~hits).all()
+        assert ((results["actions"] & (1 << settings.OPTION_STAND)) == 0).all()
+
+    def test_append(self):
+        self.simulate(30)
+        self.simulate(20)
+        results = Results(self.directory)
+        assert len(results) == 100
+        assert results["round"][-1] == 49
+        assert (numpy.diff(results["round"].astype(int)) >= 0).all()
+
+    def test_fractional_payouts(self):
+        simulation = self.simulate(300, rules=Ruleset(blackjack_payout=2.5))
+        results = Results(self.directory)
+        #a blackjack of a bet of 10 wins 15
+        assert (results["payout"] == 15).any()
+        assert results["payout"].sum() == simulation.stats.net
+
+    def test_other_columns(self):
+        self.simulate(5)
+        with open(os.path.join(self.directory, META)) as meta:
+            columns = json.load(meta)
+        columns["columns"][-1][1] = "<i4"
+        with open(os.path.join(self.directory, META), "w") as meta:
+            json.dump(columns, meta)
+        self.assertRaises(ValueError, ResultsWriter, self.directory)
+
+    def test_empty(self):
+        ResultsWriter(self.directory).close()
+        assert len(Results(self.directory)["payout"]) == 0
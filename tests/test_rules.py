@@ -0,0 +1,95 @@
+import unittest
+import settings
+from cards import encode
+from participants import Player, Hand
+from game import SingleDeck
+from rules import Ruleset, DEFAULT_RULES
+from simulation import Simulation
+from strategies import FlatBetting, StandOnStrategy
+
+def hand_of(rules, *ranks):
+    hand = Hand(10, rules=rules)
+    for rank in ranks:
+        hand.add_card(encode(rank))
+    return hand
+
+class RulesetTest(unittest.TestCase):
+
+    def test_defaults(self):
+        assert DEFAULT_RULES.dealer_min_score == settings.DEALER_MIN_SCORE
+        assert DEFAULT_RULES.blackjack == settings.BLACKJACK
+        assert DEFAULT_RULES == Ruleset()
+        assert hash(DEFAULT_RULES) == hash(Ruleset())
+
+    def test_frozen(self):
+        with self.assertRaises(AttributeError):
+            DEFAULT_RULES.dealer_min_score = 18
+        with self.assertRaises(AttributeError):
+            DEFAULT_RULES.anything = 1
+
+    def test_replace(self):
+        rules = DEFAULT_RULES.replace(dealer_min_score=18, blackjack_payout=2.5)
+        assert rules.dealer_min_score == 18
+        assert rules.blackjack_payout == 2.5
+        assert rules.blackjack == DEFAULT_RULES.blackjack
+        assert rules != DEFAULT_RULES
+        assert DEFAULT_RULES.dealer_min_score == settings.DEALER_MIN_SCORE
+
+    def test_explicit_zero(self):
+        """A rule given as 0 is 0, not the default"""
+        rules = Ruleset(dealer_min_score=0, blackjack_payout=0)
+        assert rules.dealer_min_score == 0
+        player = Player("Foo", 100, betting=FlatBetting(10), strategy=StandOnStrategy(0),
+                        rules=rules)
+        game = SingleDeck([player], rules=rules)
+        game.init_game()
+        assert player.strategy.choose(player, game) == settings.OPTION_STAND
+        player.win_bet(player.hands[0], rules.blackjack_payout)
+        assert player.get_money() == 90
+
+    def test_tables(self):
+        rules = Ruleset()
+        assert rules.values[encode("A")] == 11
+        assert rules.hard_values[encode("A")] == 1
+        assert rules.aces[encode("A")] == 1
+        assert rules.hard_values[encode("K")] == 10
+        assert rules.splittable[encode("10")]
+        assert not rules.splittable[encode("9")]
+        assert rules.soft_limit == 11
+
+    def test_split_rule(self):
+        rules = Ruleset(min_card_to_split=2)
+        assert hand_of(rules, "8", "8").can_do_split()
+        assert not hand_of(DEFAULT_RULES, "8", "8").can_do_split()
+
+    def test_mixed_tables(self):
+        """Games with different rules play in the same process"""
+        games = []
+        for min_score in (17, 22):
+            player = Player("Foo", 100, betting=FlatBetting(10),
+                            strategy=StandOnStrategy(30))
+            games.append(SingleDeck([player], rules=Ruleset(dealer_min_score=min_score)))
+        for game in games:
+            assert game.players[0].rules is game.rules
+            assert game.dealer.rules is game.rules
+            game.init_game()
+            game.set_current_player(game.players[0])
+            assert game.players[0].hands[0].rules is game.rules
+        assert games[0].rules.dealer_min_score == 17
+        assert games[1].rules.dealer_min_score == 22
+
+    def test_blackjack_payout(self):
+        rules = Ruleset(blackjack_payout=3)
+        hand = hand_of(rules, "A", "K")
+        assert hand.is_blackjack()
+        player = Player("Foo", 100, rules=rules)
+        player.hands.append(hand)
+        player.add_money(-10)
+        player.win_bet(hand, rules.blackjack_payout)
+        assert player.get_money() == 120
+
+    def test_simulation(self):
+        simulation = Simulation.create(2, rules=Ruleset(payout=3))
+        assert simulation.game.rules.payout == 3
+        simulation.run(50)
+        assert simulation.rounds == 50
@@ -0,0 +1,106 @@
+import socket
+import threading
+import time
+import unittest
+from cards import encode, hide
+from server import Server, Seat, format_cards
+
+class Client(object):
+
+    def __init__(self, server):
+        self.socket = socket.create_connection(server.server_address)
+        self.lines = self.socket.makefile("r")
+
+    def read(self, *commands):
+        """The words of the first line with one of the commands"""
+        while True:
+            words = self.lines.readline().split()
+            if words and words[0] in commands:
+                return words
+
+    def send(self, line):
+        self.socket.sendall(line + "\n")
+
+    def play_round(self, bet=10):
+        words = self.read("BET")
+        self.send(str(bet))
+        while True:
+            words = self.read("TURN", "RESULT")
+            if words[0] == "RESULT":
+                return int(words[1]), int(words[2])
+            self.send("stand")
+
+    def close(self):
+        self.socket.close()
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(("127.0.0.1", 0), seats=2, timeout=5)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def connect(self):
+        client = Client(self.server)
+        self.clients.append(client)
+        return client
+
+    def test_format_cards(self):
+        assert format_cards([encode("K", "Hearts"), encode("7", "Club")]) == "KH,7C"
+        assert format_cards([hide(encode("A"))]) == "X"
+
+    def test_round(self):
+        client = self.connect()
+        assert client.read("WELCOME")[1:3] == ["0", "0"]
+        net, chips = client.play_round()
+        assert net in (-10, 0, 10)
+        assert chips == 100 + net
+
+    def test_tables(self):
+        clients = [self.connect() for _ in range(3)]
+        tables = [client.read("WELCOME")[1] for client in clients]
+        assert sorted(tables) == ["0", "0", "1"]
+        assert len(self.server.tables) == 2
+
+    def test_slow_client(self):
+        slow = self.connect()
+        slow.read("WELCOME")
+        self.connect().read("WELCOME")
+        #the third player gets a table of their own
+        client = self.connect()
+        assert client.read("WELCOME")[1] == "1"
+        start = time.time()
+        for _ in range(3):
+            client.play_round()
+        assert time.time() - start < self.server.timeout
+
+class Connection(object):
+    """It answers every question with the next answer, if any"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.seat = None
+
+    def sendall(self, line):
+        if self.answers:
+            self.seat.answer(self.answers.pop(0))
+
+class SeatTest(unittest.TestCase):
+
+    def test_late_answer(self):
+        connection = Connection([])
+        seat = Seat(connection, timeout=0.05)
+        connection.seat = seat
+        assert seat.ask("BET", 100) is None
+        #the bet comes after the timeout, the next question must not take it
+        seat.answer("25")
+        connection.answers.append("stand")
+        assert seat.ask("TURN") == "stand"
@@ -0,0 +1,124 @@
+import sys
+import unittest
+import settings
+from StringIO import StringIO
+from participants import Player
+from game import Game, SingleDeck
+from renderers import NullRender
+from simulation import Simulation, Statistics
+from strategies import StandOnStrategy, FlatBetting
+from mock import Mock
+from mock import patch
+
+class StrategyTest(unittest.TestCase):
+
+    def test_flat_betting(self):
+        player = Player("Foo", 100)
+        betting = FlatBetting(30)
+        assert betting.bet(player, None) == 30
+        player.money = 20
+        assert betting.bet(player, None) == 20
+
+    def test_stand_on(self):
+        player = Player("Foo", 100)
+        player.get_score = Mock(return_value=16)
+        strategy = StandOnStrategy(17)
+        assert strategy.choose(player, None) == settings.OPTION_HIT
+        player.get_score = Mock(return_value=17)
+        assert strategy.choose(player, None) == settings.OPTION_STAND
+
+    def test_player_turn_uses_strategy(self):
+        strategy = Mock()
+        strategy.choose = Mock(return_value=settings.OPTION_STAND)
+        player = Player("Foo", 100, strategy=strategy)
+        game = Game([player])
+        player.new_hand(10)
+        player.turn(game)
+        strategy.choose.assert_called_with(player, game)
+        assert player.is_stand()
+
+    def test_ask_bet_uses_betting(self):
+        player = Player("Foo", 100, betting=FlatBetting(25))
+        game = Game([player])
+        game.ask_bet(player)
+        assert player.get_active_hand().bet == 25
+        assert player.money == 75
+
+class SimulationTest(unittest.TestCase):
+
+    def test_run(self):
+        simulation = Simulation.create(players=3)
+        with patch.object(sys, 'stdout', StringIO()) as out:
+            simulation.run(200)
+        assert out.getvalue() == ""
+        assert simulation.rounds == 200
+        assert simulation.hands == 600
+        assert simulation.hands_per_second() > 0
+
+    def test_no_rebuy(self):
+        #it always busts unless it gets a blackjack
+        player = Player("Foo", 10, NullRender(), StandOnStrategy(22), FlatBetting(10))
+        simulation = Simulation(SingleDeck([player], NullRender()), rebuy=False)
+        simulation.run(1000)
+        assert simulation.game.is_over()
+        assert simulation.rounds < 1000
+
+    def test_bankrupt_player_sits_out(self):
+        rich = Player("Foo", 100, NullRender(), StandOnStrategy(), FlatBetting(10))
+        poor = Player("Bar", 0, NullRender(), StandOnStrategy(), FlatBetting(10))
+        simulation = Simulation(SingleDeck([rich, poor], NullRender()), rebuy=False)
+        simulation.play_round()
+        assert simulation.hands == 1
+        assert poor.hands == []
+
+    def test_shoe(self):
+        simulation = Simulation.create(players=7, decks=6)
+        simulation.run(300)
+        assert simulation.hands == 2100
+
+    def test_continuous(self):
+        simulation = Simulation.create(players=7, decks=8, continuous=True)
+        simulation.run(300)
+        assert simulation.hands == 2100
+        assert simulation.game.deck.left > 416 - 52
+
+class StatisticsTest(unittest.TestCase):
+
+    def test_moments(self):
+        stats = Statistics()
+        for net in (10, -10, 20, 0, -10):
+            stats.settle(net)
+        assert stats.mean == 2
+        assert abs(stats.variance() - 170) < 1e-9
+        low, high = stats.confidence_interval()
+        assert low < 2 < high
+        assert stats.frequencies()["wins"] == 0.4
+
+    def test_drawdown(self):
+        stats = Statistics()
+        for net in (10, 20, -10, -15, 5, -10, 30):
+            stats.settle(net)
+        assert (stats.peak, stats.trough, stats.drawdown) == (30, 0, 30)
+
+    def test_merge(self):
+        nets = [10, -10, 20, 0, -10, -10, -10, 5, 15, -20]
+        whole = Statistics()
+        for net in nets:
+            whole.settle(net)
+        first, second = Statistics(), Statistics()
+        for net in nets[:4]:
+            first.settle(net)
+        for net in nets[4:]:
+            second.settle(net)
+        first.merge(second)
+        assert abs(first.mean - whole.mean) < 1e-12
+        assert abs(first.variance() - whole.variance()) < 1e-9
+        assert (first.peak, first.trough, first.drawdown) == \
+            (whole.peak, whole.trough, whole.drawdown)
+        assert Statistics().merge(whole) == whole
+
+    def test_snapshots(self):
+        simulation = Simulation.create(players=2, decks=2)
+        snapshots = list(simulation.snapshots(250, 100))
+        assert [snapshot["hands"] for snapshot in snapshots] == [200, 400, 500]
+        assert "confidence_interval" in snapshots[-1]
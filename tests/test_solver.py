@@ -0,0 +1,91 @@
+import unittest
+import settings
+from cards import encode
+from participants import Player
+from game import Game
+from probabilities import DealerTable, shoe_composition
+from rules import Ruleset
+from simulation import Simulation
+from solver import Solver
+from strategies import StrategyTable, TableStrategy
+
+HIT = settings.OPTION_HIT
+STAND = settings.OPTION_STAND
+SPLIT = settings.OPTION_SPLIT
+
+class SolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.solver = Solver(shoe_composition(6), DealerTable(17, 21))
+        self.table = self.solver.solve()
+
+    def test_never_bust(self):
+        for upcard in range(1, 11):
+            for hard in range(4, 12):
+                assert self.table.get(StrategyTable.HARD, hard, upcard) == HIT
+            assert self.table.get(StrategyTable.HARD, 21, upcard) == STAND
+            assert self.table.get(StrategyTable.SOFT, 21, upcard) == STAND
+
+    def test_split_aces(self):
+        for upcard in range(1, 11):
+            assert self.table.get(StrategyTable.PAIR, 1, upcard) == SPLIT
+
+    def test_only_pairs_split(self):
+        for upcard in range(1, 11):
+            for card in range(2, 10):
+                assert self.table.get(StrategyTable.PAIR, card, upcard) != SPLIT
+
+    def test_options(self):
+        options = self.solver.options(20, False, 10)
+        assert options[STAND] > options[HIT]
+        assert -1 <= options[HIT] <= 1
+        assert SPLIT not in options
+
+    def test_payouts(self):
+        """A win pays the payout of the rules, a split blackjack the
+           blackjack one"""
+        paying = Solver(shoe_composition(6), rules=Ruleset(payout=3, blackjack_payout=3))
+        for upcard in (1, 6, 10):
+            even = self.solver.stand(18, False, upcard)
+            wins = (1 + even) / 2
+            assert abs(paying.stand(18, False, upcard) - (2 * wins - (1 - wins))) < 1e-12
+        three_two = Solver(shoe_composition(6), rules=Ruleset(blackjack_payout=2.5))
+        assert three_two.split(1, 10) > self.solver.split(1, 10)
+        assert three_two.split(8, 10) == self.solver.split(8, 10)
+
+    def test_memoized(self):
+        self.solver.value(12, False, 10)
+        assert (12, False, 10) in self.solver._values
+
+class TableStrategyTest(unittest.TestCase):
+
+    def make_game(self, *representations):
+        player = Player("Foo", 100)
+        game = Game([player])
+        game.dealer.new_hand()
+        game.dealer.get_active_hand().add_card(encode("6"))
+        player.new_hand(10)
+        for representation in representations:
+            player.get_active_hand().add_card(encode(representation))
+        return player, game
+
+    def test_lookup(self):
+        table = StrategyTable()
+        table.set(StrategyTable.HARD, 12, 6, HIT)
+        table.set(StrategyTable.SOFT, 18, 6, HIT)
+        table.set(StrategyTable.PAIR, 10, 6, SPLIT)
+        strategy = TableStrategy(table)
+        player, game = self.make_game("7", "5")
+        assert strategy.choose(player, game) == HIT
+        player, game = self.make_game("A", "7")
+        assert strategy.choose(player, game) == HIT
+        player, game = self.make_game("K", "Q")
+        assert strategy.choose(player, game) == SPLIT
+        player, game = self.make_game("9", "4")
+        assert strategy.choose(player, game) == STAND
+
+    def test_simulation(self):
+        strategy = TableStrategy(Solver().solve())
+        simulation = Simulation.create(players=2, strategy=strategy, decks=6)
+        simulation.run(200)
+        assert simulation.hands == 400
@@ -0,0 +1,74 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+from rules import Ruleset
+from strategies import StandOnStrategy
+from sweep import Sweep, Point, ResultCache, grid, strategy_key
+
+class GridTest(unittest.TestCase):
+
+    def test_grid(self):
+        points = grid({"decks": [1, 6], "dealer_min_score": [17, 18, 19]})
+        assert len(points) == 6
+        assert points[0] == {"decks": 1, "dealer_min_score": 17}
+        assert points[1] == {"decks": 6, "dealer_min_score": 17}
+
+    def test_point(self):
+        point = Point({"decks": 2, "dealer_min_score": 18, "blackjack_payout": 2.5})
+        assert point.decks == 2
+        assert point.rules == Ruleset(dealer_min_score=18, blackjack_payout=2.5)
+        with self.assertRaises(ValueError):
+            Point({"surrender": True})
+        #the values of the cards aren't a rule, nothing else could play them
+        with self.assertRaises(ValueError):
+            Point({"card_values": {"A": 1}})
+
+    def test_key(self):
+        point = Point({"decks": 2})
+        assert point.key(0, 100) == Point({"decks": 2}).key(0, 100)
+        assert point.key(0, 100) != point.key(1, 100)
+        assert point.key(0, 100) != point.key(0, 200)
+        assert point.key(0, 100) != Point({"decks": 2, "dealer_min_score": 18}).key(0, 100)
+        assert point.key(0, 100) != Point({"decks": 2}, strategy=StandOnStrategy(15)).key(0, 100)
+
+    def test_strategy_key(self):
+        assert strategy_key(StandOnStrategy(15)) == strategy_key(StandOnStrategy(15))
+        assert strategy_key(StandOnStrategy(15)) != strategy_key(StandOnStrategy(16))
+
+    def test_pickle_rules(self):
+        rules = Ruleset(dealer_min_score=18)
+        assert pickle.loads(pickle.dumps(rules, 2)) == rules
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cached(self):
+        axes = {"decks": [1, 2], "dealer_min_score": [17]}
+        cache = ResultCache(self.directory)
+        sweep = Sweep(axes, 200, workers=2, cache=cache)
+        first = sweep.run()
+        assert sweep.computed == 2
+        assert all(stats.hands == 200 for _, stats in first)
+
+        axes["dealer_min_score"].append(18)
+        sweep = Sweep(axes, 200, workers=2, cache=cache)
+        second = sweep.run()
+        assert sweep.computed == 2
+        assert len(second) == 4
+        cached = dict((tuple(sorted(point.values.items())), stats) for point, stats in second)
+        for point, stats in first:
+            assert cached[tuple(sorted(point.values.items()))] == stats
+
+    def test_reproducible(self):
+        axes = {"decks": [2], "penetration": [0, 0.5]}
+        first = Sweep(axes, 300, workers=2, cache=ResultCache(self.directory)).run()
+        shutil.rmtree(self.directory)
+        second = Sweep(axes, 300, workers=1, cache=ResultCache(self.directory)).run()
+        assert [stats for _, stats in first] == [stats for _, stats in second]
+        assert "house edge" in Sweep(axes, 300, cache=ResultCache(self.directory)).report(first)
@@ -0,0 +1,76 @@
+import math
+import random
+import unittest
+import numpy
+import settings
+from rules import Ruleset
+from simulation import Simulation, Statistics
+from strategies import StrategyTable
+from vectorized import (VectorizedEngine, Shoes, batch_statistics, shoe_counts,
+                        stand_on_table)
+
+TENS = [0] * 9 + [52]
+
+class ShoesTest(unittest.TestCase):
+
+    def test_counts(self):
+        counts = shoe_counts(2, Ruleset())
+        assert counts.sum() == 104
+        assert counts[0] == 8
+        assert counts[9] == 32
+
+    def test_draw(self):
+        shoes = Shoes(50, 1, rng=numpy.random.RandomState(3))
+        lanes = numpy.arange(50)
+        drawn = numpy.array([shoes.draw(lanes) for _ in range(52)]).T
+        for cards in drawn:
+            assert list(numpy.bincount(cards, minlength=11)[1:]) == list(shoe_counts(1, Ruleset()))
+        assert (shoes.left == 0).all()
+        shoes.draw(lanes)
+        assert shoes.shuffles == 50
+
+class VectorizedEngineTest(unittest.TestCase):
+
+    def test_ties_go_to_the_player(self):
+        engine = VectorizedEngine(lanes=20, counts=TENS, seed=1)
+        nets = engine.play_round()
+        assert (nets == engine.bet).all()
+
+    def test_split(self):
+        table = stand_on_table(17)
+        for upcard in range(StrategyTable.UPCARDS):
+            table.set(table.PAIR, 10, upcard, settings.OPTION_SPLIT)
+        engine = VectorizedEngine(table, lanes=20, counts=TENS, seed=1)
+        nets = engine.play_round()
+        assert engine.splits == 20
+        #both halves are a 20 against a 20
+        assert (nets == engine.bet).all()
+
+    def test_rules(self):
+        engine = VectorizedEngine(lanes=10, counts=TENS, rules=Ruleset(payout=3))
+        assert (engine.play_round() == 2 * engine.bet).all()
+        engine = VectorizedEngine(stand_on_table(17), lanes=10, counts=TENS,
+                                  rules=Ruleset(dealer_min_score=21))
+        #the dealer busts every time, with a 30
+        assert (engine.play_round() == engine.bet).all()
+
+    def test_batch_statistics(self):
+        nets = [10, -10, 0, 20, -10, -10, 5]
+        expected = Statistics()
+        for net in nets:
+            expected.settle(net)
+        stats = batch_statistics(numpy.array(nets), 0, 0)
+        for field in Statistics.FIELDS + ("peak", "trough", "drawdown"):
+            assert getattr(stats, field) == getattr(expected, field)
+        assert abs(stats.mean - expected.mean) < 1e-9
+        assert abs(stats.m2 - expected.m2) < 1e-9
+
+    def test_same_as_game(self):
+        """Both play like the dealer, so they must agree on the mean"""
+        engine = VectorizedEngine(lanes=20000, decks=6, seed=5)
+        engine.run(5)
+        simulation = Simulation.create(1, decks=6, rng=random.Random(5)).run(20000)
+        first, second = engine.stats, simulation.stats
+        error = math.sqrt(first.variance() / first.hands + second.variance() / second.hands)
+        assert abs(first.mean - second.mean) < 4 * error
+        assert abs(float(first.busts) / first.hands - float(second.busts) / second.hands) < 0.02
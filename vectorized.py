@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Rounds played by the thousand with numpy, one table per lane.
+
+Every lane is a shoe with a player playing a StrategyTable, and nothing
+but arrays is kept: the cards left of every value in every shoe, and
+the hard total, the aces and the cards of every hand. A round deals to
+all the lanes at once and then everybody hits, stands or splits at the
+same time, masking out the hands that are done. The dealer draws the
+same way and the bets are settled with array operations, under the same
+rules as Game:
+
+ - A blackjack is paid as soon as it's dealt, a busted hand loses at once.
+ - The dealer draws up to the rules' dealer_min_score.
+ - A hand that stands wins when its score isn't under the dealer's one.
+ - A split halves the bet and the first hand is hit right away.
+
+It's meant for studying rules and strategies, so a few things are
+simpler than in Game. There is a single player per table and no
+bankroll. A hand can only be split once: a split hand that is a pair
+again plays by its score. Every split hand is compared with the dealer
+by its own score.
+
+Usage:
+    python vectorized.py [rounds] [lanes] [decks]
+"""
+import sys
+import time
+import numpy
+import settings
+from cards import RANKS, VALUE_RANKS
+from rules import DEFAULT_RULES
+from simulation import Statistics, DEFAULT_BET
+from strategies import StrategyTable
+
+#what a hand of a lane is doing
+EMPTY = 0
+PLAYING = 1
+STOOD = 2
+FINISHED = 3
+
+def shoe_counts(decks, rules):
+    """The cards of every hard value, an ace is 1, in a full shoe"""
+    counts = numpy.zeros(VALUE_RANKS, numpy.int32)
+    for rank, value in enumerate(rules.rank_values):
+        ace = RANKS[rank] == "A"
+        counts[value - rules.soft_bonus * ace - 1] += 4 * decks
+    return counts
+
+def stand_on_table(score):
+    """The StrategyTable of a StandOnStrategy"""
+    table = StrategyTable()
+    for upcard in range(StrategyTable.UPCARDS):
+        for total in range(StrategyTable.SCORES):
+            for section in (table.HARD, table.SOFT):
+                table.set(section, total, upcard,
+                          settings.OPTION_HIT if total < score else settings.OPTION_STAND)
+        for card in range(1, VALUE_RANKS + 1):
+            #a pair of aces is a soft 12
+            total = 12 if card == 1 else 2 * card
+            table.set(table.PAIR, card, upcard,
+                      settings.OPTION_HIT if total < score else settings.OPTION_STAND)
+    return table
+
+def batch_statistics(nets, blackjacks, busts):
+    """The Statistics of hands played in the order of nets"""
+    stats = Statistics()
+    if not len(nets):
+        return stats
+    stats.hands = len(nets)
+    stats.wins = int((nets > 0).sum())
+    stats.losses = int((nets < 0).sum())
+    stats.pushes = stats.hands - stats.wins - stats.losses
+    stats.blackjacks = int(blackjacks)
+    stats.busts = int(busts)
+    total = nets.sum()
+    stats.net = int(total) if total == int(total) else float(total)
+    stats.mean = float(nets.mean())
+    stats.m2 = float(((nets - stats.mean) ** 2).sum())
+    bankroll = numpy.cumsum(nets)
+    peaks = numpy.maximum.accumulate(numpy.maximum(bankroll, 0))
+    stats.peak = max(0, bankroll.max().item())
+    stats.trough = min(0, bankroll.min().item())
+    stats.drawdown = max(0, (peaks - bankroll).max().item())
+    return stats
+
+class Shoes(object):
+    """The cards left in the shoe of every lane, by hard value"""
+
+    def __init__(self, lanes, decks=settings.SHOE_DECKS, rules=None, rng=None,
+                 counts=None):
+        """:param counts (optional): the cards of a full shoe by hard value,
+                by default the ones of the decks."""
+        self.full = numpy.array(counts if counts is not None else
+                                shoe_counts(decks, rules or DEFAULT_RULES), numpy.int32)
+        self.size = self.full.sum()
+        self.rng = rng or numpy.random.RandomState()
+        self.counts = numpy.tile(self.full, (lanes, 1))
+        self.left = numpy.full(lanes, self.size, numpy.int32)
+        self.shuffles = 0
+
+    def shuffle(self, lanes):
+        """All the cards go back to the shoes of the lanes, a bool mask"""
+        self.counts[lanes] = self.full
+        self.left[lanes] = self.size
+        self.shuffles += int(lanes.sum())
+
+    def penetration(self):
+        return 1 - self.left / float(self.size)
+
+    def draw(self, lanes):
+        """A card from the shoe of every lane, by index. It returns their
+           hard values"""
+        empty = self.left[lanes] == 0
+        if empty.any():
+            mask = numpy.zeros(len(self.left), bool)
+            mask[lanes[empty]] = True
+            self.shuffle(mask)
+        counts = self.counts[lanes]
+        #the card is the first value whose running count is over a random
+        #position in the shoe
+        position = (self.rng.random_sample(len(lanes)) * self.left[lanes]).astype(numpy.int32)
+        index = (numpy.cumsum(counts, axis=1) <= position[:, None]).sum(axis=1)
+        self.counts[lanes, index] -= 1
+        self.left[lanes] -= 1
+        return index + 1
+
+class Hands(object):
+    """A hand for every lane, some of them EMPTY"""
+
+    def __init__(self, lanes):
+        self.hard = numpy.zeros(lanes, numpy.int32)
+        self.aces = numpy.zeros(lanes, numpy.int32)
+        self.cards = numpy.zeros(lanes, numpy.int32)
+        self.bet = numpy.zeros(lanes)
+        self.state = numpy.zeros(lanes, numpy.int8)
+
+    def add(self, lanes, values):
+        self.hard[lanes] += values
+        self.aces[lanes] += values == 1
+        self.cards[lanes] += 1
+
+    def soft(self, rules):
+        return (self.aces > 0) & (self.hard <= rules.soft_limit)
+
+    def score(self, rules):
+        return self.hard + self.soft(rules) * rules.soft_bonus
+
+class VectorizedEngine(object):
+    """ It plays rounds in every lane at once and keeps the Statistics of
+        all of them, hands of a round in lane order."""
+
+    def __init__(self, table=None, lanes=10000, decks=settings.SHOE_DECKS,
+                 penetration=settings.SHOE_PENETRATION, rules=None, bet=DEFAULT_BET,
+                 seed=None, counts=None):
+        """:param table (optional): the StrategyTable of the players, by
+                default they play like the dealer.
+           :param lanes: the tables played at once.
+           :param penetration: the shoe of a lane is shuffled when this
+                much of it is dealt, 0 to shuffle every round.
+           :param rules (optional): the Ruleset, see rules.py.
+           :param seed (optional): the seed of the cards.
+           :param counts (optional): the cards of a full shoe, see Shoes."""
+        self.rules = rules or DEFAULT_RULES
+        table = table or stand_on_table(self.rules.dealer_min_score)
+        self.options = numpy.frombuffer(table.options, numpy.uint8)
+        self.lanes = lanes
+        self.penetration = penetration
+        self.bet = bet
+        self.rng = numpy.random.RandomState(seed)
+        self.shoes = Shoes(lanes, decks, self.rules, self.rng, counts)
+        #whether a card can be split, by hard value
+        self.splittable = numpy.zeros(VALUE_RANKS + 1, bool)
+        for rank, value in enumerate(self.rules.rank_values):
+            hard = value - self.rules.soft_bonus * (RANKS[rank] == "A")
+            self.splittable[hard] = value >= self.rules.min_card_to_split
+        self.stats = Statistics()
+        self.rounds = 0
+        self.splits = 0
+        self.elapsed = 0.0
+
+    def _option(self, hand, lanes, upcard, pair):
+        """The option of the table for the hands of the lanes"""
+        soft = hand.soft(self.rules)[lanes]
+        score = hand.score(self.rules)[lanes]
+        section = numpy.where(pair > 0, StrategyTable.PAIR, soft)
+        score = numpy.where(pair > 0, pair, score)
+        return self.options[(section * StrategyTable.SCORES + score) *
+                            StrategyTable.UPCARDS + upcard[lanes]]
+
+    def _finish(self, hand, lanes, nets, counts):
+        """Busted hands lose and blackjacks are paid, right after a card"""
+        score = hand.score(self.rules)[lanes]
+        busted = lanes[score > self.rules.blackjack]
+        blackjack = lanes[(score == self.rules.blackjack) &
+                          (hand.cards[lanes] == self.rules.cards_for_blackjack)]
+        hand.state[busted] = FINISHED
+        hand.state[blackjack] = FINISHED
+        nets[blackjack] += hand.bet[blackjack] * self.rules.blackjack_payout
+        counts["busts"] += len(busted)
+        counts["blackjacks"] += len(blackjack)
+
+    def _play(self, hand, upcard, nets, counts, split=None, pairs=None):
+        """Every hand plays until it stands or is finished.
+            :param split (optional): the second hands, where split hands go.
+            :param pairs (optional): the first two cards, for the hands
+                that can be split."""
+        while True:
+            lanes = numpy.flatnonzero(hand.state == PLAYING)
+            if not len(lanes):
+                return
+            pair = numpy.zeros(len(lanes), numpy.int32)
+            if split is not None:
+                first, second = pairs[0][lanes], pairs[1][lanes]
+                can_split = (hand.cards[lanes] == 2) & (split.state[lanes] == EMPTY) & \
+                    self.splittable[first] & self.splittable[second]
+                pair = numpy.where(can_split, first, 0)
+            option = self._option(hand, lanes, upcard, pair)
+
+            standing = lanes[option == settings.OPTION_STAND]
+            hand.state[standing] = STOOD
+            splitting = lanes[(option == settings.OPTION_SPLIT) & (pair > 0)]
+            #an option that can't be played stands
+            hand.state[lanes[(option == settings.OPTION_SPLIT) & (pair == 0)]] = STOOD
+            if len(splitting):
+                self.splits += len(splitting)
+                second = pairs[1][splitting]
+                hand.hard[splitting] -= second
+                hand.aces[splitting] -= second == 1
+                hand.cards[splitting] -= 1
+                hand.bet[splitting] /= 2
+                split.bet[splitting] = hand.bet[splitting]
+                split.state[splitting] = PLAYING
+                split.add(splitting, second)
+            hitting = numpy.concatenate((lanes[option == settings.OPTION_HIT], splitting))
+            if len(hitting):
+                hand.add(hitting, self.shoes.draw(hitting))
+                self._finish(hand, hitting, nets, counts)
+
+    def play_round(self):
+        """It returns the net result of the player of every lane"""
+        lanes = numpy.arange(self.lanes)
+        self.shoes.shuffle(self.shoes.penetration() >= self.penetration)
+        nets = -numpy.ones(self.lanes) * self.bet
+        counts = {"busts": 0, "blackjacks": 0}
+
+        first, second = Hands(self.lanes), Hands(self.lanes)
+        first.bet[:] = self.bet
+        first.state[:] = PLAYING
+        cards = (self.shoes.draw(lanes), self.shoes.draw(lanes))
+        for values in cards:
+            first.add(lanes, values)
+        dealer = Hands(self.lanes)
+        upcard = self.shoes.draw(lanes)
+        dealer.add(lanes, upcard)
+        dealer.add(lanes, self.shoes.draw(lanes))
+
+        self._finish(first, lanes, nets, counts)
+        self._play(first, upcard, nets, counts, second, cards)
+        self._play(second, upcard, nets, counts)
+
+        #the dealer only plays for the hands still standing
+        playing = (first.state == STOOD) | (second.state == STOOD)
+        while True:
+            drawing = numpy.flatnonzero(playing &
+                                        (dealer.score(self.rules) < self.rules.dealer_min_score))
+            if not len(drawing):
+                break
+            dealer.add(drawing, self.shoes.draw(drawing))
+        dealer_score = dealer.score(self.rules)
+        dealer_busted = dealer_score > self.rules.blackjack
+        for hand in (first, second):
+            wins = (hand.state == STOOD) & \
+                (dealer_busted | (hand.score(self.rules) >= dealer_score))
+            nets[wins] += hand.bet[wins] * self.rules.payout
+
+        self.stats.merge(batch_statistics(nets, counts["blackjacks"], counts["busts"]))
+        self.rounds += 1
+        return nets
+
+    def run(self, rounds):
+        start = time.time()
+        for _ in xrange(rounds):
+            self.play_round()
+        self.elapsed += time.time() - start
+        return self.stats
+
+    def hands_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.stats.hands / self.elapsed
+
+if __name__ == '__main__':
+    from solver import Solver
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    lanes = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    decks = int(sys.argv[3]) if len(sys.argv) > 3 else settings.SHOE_DECKS
+    engine = VectorizedEngine(Solver().solve(), lanes, decks)
+    print engine.run(rounds)
+    print "%d lanes: %.0f rounds/sec, %.1f million a minute" % (
+        lanes, engine.hands_per_second(), engine.hands_per_second() * 60 / 1e6)